@@ -1,21 +1,231 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g, Response, stream_with_context, has_app_context
+from flask import before_render_template, template_rendered, has_request_context, send_from_directory, abort
+from flask import stream_template
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from flask_sqlalchemy.session import Session as SessaoFlask
+from flask_migrate import Migrate, upgrade
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
+from werkzeug.exceptions import ServiceUnavailable
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, attributes, InstrumentedAttribute, with_loader_criteria
+from collections import OrderedDict, namedtuple
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
 from datetime import datetime, timedelta
+import base64
+import bisect
+import codecs
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import logging
+import mimetypes
 import os
+import posixpath
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import zlib
+import click
 import pytz
 
-app = Flask(__name__)
+try:
+    import brotli
+except ImportError:
+    # Opcional: sem o módulo, as respostas e os arquivos estáticos usam só gzip
+    brotli = None
+
+class PortalFlask(Flask):
+    """Flask com cronometragem por requisição (hooks, view, SQL e templates) numa fração amostrada."""
+    
+    def full_dispatch_request(self):
+        if random.random() >= self.config['INSTRUMENTACAO_AMOSTRAGEM']:
+            return super().full_dispatch_request()
+        g.instrumentacao = {'inicio': time.perf_counter(), 'inicio_view': None, 'view': 0.0, 'sql': 0.0, 'render': 0.0}
+        resposta = super().full_dispatch_request()
+        registrar_instrumentacao(resposta)
+        return resposta
+    
+    def dispatch_request(self):
+        medicao = g.get('instrumentacao')
+        if medicao is None:
+            return super().dispatch_request()
+        medicao['inicio_view'] = time.perf_counter()
+        try:
+            return super().dispatch_request()
+        finally:
+            medicao['view'] += time.perf_counter() - medicao['inicio_view']
+
+app = PortalFlask(__name__)
 app.config['SECRET_KEY'] = os.urandom(24)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///portal_projetos.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db = SQLAlchemy()
+# Armazenamento: SQLite local por padrão ou um banco servidor via DATABASE_URL
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///portal_projetos.db').replace(
+    'postgres://', 'postgresql://', 1)
+# PRAGMAs aplicados a cada conexão SQLite
+app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+# Tamanho do cache de páginas; valores negativos são em KiB (padrão: 64 MiB)
+app.config['SQLITE_CACHE_SIZE'] = int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024))
+# Pool de conexões de escrita por processo (pequeno: o SQLite aceita um escritor por vez)
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 2))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 6))
+app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+# Banco das rotas somente leitura (réplica); vazio usa conexões mode=ro no mesmo arquivo SQLite
+app.config['LEITURA_DATABASE_URL'] = os.environ.get('LEITURA_DATABASE_URL', '').replace(
+    'postgres://', 'postgresql://', 1)
+# Pool de conexões de leitura por processo
+app.config['DB_LEITURA_POOL_SIZE'] = int(os.environ.get('DB_LEITURA_POOL_SIZE', 8))
+app.config['DB_LEITURA_MAX_OVERFLOW'] = int(os.environ.get('DB_LEITURA_MAX_OVERFLOW', 8))
+
+def opcoes_engine(uri, leitura=False):
+    if uri.startswith('sqlite'):
+        # O driver também espera pelo lock de escrita em vez de falhar com "database is locked"
+        opcoes = {'connect_args': {'timeout': app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}}
+        if uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri:
+            return opcoes
+    else:
+        opcoes = {'pool_pre_ping': True, 'pool_recycle': app.config['DB_POOL_RECYCLE']}
+    prefixo = 'DB_LEITURA' if leitura else 'DB'
+    opcoes.update(
+        pool_size=app.config[f'{prefixo}_POOL_SIZE'],
+        max_overflow=app.config[f'{prefixo}_MAX_OVERFLOW'],
+        pool_timeout=app.config['DB_POOL_TIMEOUT']
+    )
+    return opcoes
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opcoes_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+
+# Tempo (segundos) em que o snapshot do dashboard é reaproveitado; 0 desativa o cache
+app.config['DASHBOARD_CACHE_TTL'] = int(os.environ.get('DASHBOARD_CACHE_TTL', 10))
+# Intervalo (segundos) entre verificações/heartbeats do stream SSE e duração máxima de cada conexão
+app.config['DASHBOARD_SSE_INTERVALO'] = int(os.environ.get('DASHBOARD_SSE_INTERVALO', 15))
+app.config['DASHBOARD_SSE_DURACAO'] = int(os.environ.get('DASHBOARD_SSE_DURACAO', 60))
+# Streams SSE simultâneos por processo: cada um ocupa uma thread do worker síncrono durante toda a conexão.
+# Acima do limite a rota responde 204 e a página passa a consultar /api/dashboard/stats pelo ETag (0: sempre)
+app.config['DASHBOARD_SSE_MAX_CONEXOES'] = int(os.environ.get('DASHBOARD_SSE_MAX_CONEXOES', 2))
+# Limite de comandos SQL por requisição; em modo de teste, exceder o limite falha a requisição (0 desativa)
+app.config['QUERY_BUDGET'] = int(os.environ.get('QUERY_BUDGET', 0))
+# Paginação das listagens por cursor (keyset) em vez de OFFSET + COUNT(*)
+app.config['PAGINACAO_CURSOR'] = os.environ.get('PAGINACAO_CURSOR', '1') == '1'
+# Login automático do usuário "admin" (modo de desenvolvimento)
+app.config['AUTO_LOGIN_ADMIN'] = os.environ.get('AUTO_LOGIN_ADMIN', '1') == '1'
+# Cache em memória dos usuários autenticados: quantidade máxima e validade (segundos)
+app.config['IDENTIDADE_CACHE_TAMANHO'] = int(os.environ.get('IDENTIDADE_CACHE_TAMANHO', 256))
+app.config['IDENTIDADE_CACHE_TTL'] = int(os.environ.get('IDENTIDADE_CACHE_TTL', 60))
+# Política de hash de senhas (formato do werkzeug, ex.: scrypt:32768:8:1 ou pbkdf2:sha256:600000)
+app.config['SENHA_HASH_METODO'] = os.environ.get('SENHA_HASH_METODO', 'scrypt:32768:8:1')
+# Threads dedicadas ao hash de senhas e quantos pedidos podem aguardar na fila antes de responder 503
+app.config['SENHA_HASH_THREADS'] = int(os.environ.get('SENHA_HASH_THREADS', 2))
+app.config['SENHA_HASH_FILA'] = int(os.environ.get('SENHA_HASH_FILA', 8))
+# Registros inseridos por transação na importação em lote
+app.config['IMPORTACAO_LOTE'] = int(os.environ.get('IMPORTACAO_LOTE', 1000))
+# Linhas lidas do cursor (yield_per) e enviadas por bloco na exportação
+app.config['EXPORTACAO_LOTE'] = int(os.environ.get('EXPORTACAO_LOTE', 500))
+# Fração das requisições instrumentadas (0 a 1; 1% por padrão, o servidor de desenvolvimento usa 1) e onde
+# publicar as medições
+app.config['INSTRUMENTACAO_AMOSTRAGEM'] = float(os.environ.get('INSTRUMENTACAO_AMOSTRAGEM', 0.01))
+app.config['INSTRUMENTACAO_SERVER_TIMING'] = os.environ.get('INSTRUMENTACAO_SERVER_TIMING', '1') not in ('0', 'false', 'False', '')
+app.config['INSTRUMENTACAO_LOG'] = os.environ.get('INSTRUMENTACAO_LOG', '1') not in ('0', 'false', 'False', '')
+# Comandos SQL acima deste tempo (ms) vão para o log de consultas lentas com o plano de execução (0 desativa)
+app.config['CONSULTA_LENTA_MS'] = float(os.environ.get('CONSULTA_LENTA_MS', 100))
+# Arquivo do log de consultas lentas (relativo à pasta instance/) e sua rotação
+app.config['CONSULTAS_LENTAS_ARQUIVO'] = os.environ.get('CONSULTAS_LENTAS_ARQUIVO', 'consultas_lentas.log')
+app.config['CONSULTAS_LENTAS_MAX_BYTES'] = int(os.environ.get('CONSULTAS_LENTAS_MAX_BYTES', 5 * 1024 * 1024))
+app.config['CONSULTAS_LENTAS_BACKUPS'] = int(os.environ.get('CONSULTAS_LENTAS_BACKUPS', 3))
+# Compressão das respostas: tamanho mínimo (bytes; respostas em stream sempre), tipos e níveis (COMPRESSAO_MIN_BYTES=0 desativa)
+app.config['COMPRESSAO_MIN_BYTES'] = int(os.environ.get('COMPRESSAO_MIN_BYTES', 1024))
+app.config['COMPRESSAO_TIPOS'] = os.environ.get(
+    'COMPRESSAO_TIPOS', 'text/html,application/json,text/csv,application/x-ndjson,text/plain').split(',')
+app.config['COMPRESSAO_NIVEL_GZIP'] = int(os.environ.get('COMPRESSAO_NIVEL_GZIP', 6))
+app.config['COMPRESSAO_NIVEL_BROTLI'] = int(os.environ.get('COMPRESSAO_NIVEL_BROTLI', 4))
+# Páginas renderizadas em stream: bytes acumulados antes de cada envio ao navegador
+app.config['STREAM_BLOCO_BYTES'] = int(os.environ.get('STREAM_BLOCO_BYTES', 16 * 1024))
+# Cache de fragmentos de template (linhas das listas, seções do detalhe do projeto), por processo (FRAGMENTOS_CACHE_BYTES=0: só limite por itens)
+app.config['FRAGMENTOS_CACHE_ITENS'] = int(os.environ.get('FRAGMENTOS_CACHE_ITENS', 10000))
+app.config['FRAGMENTOS_CACHE_BYTES'] = int(os.environ.get('FRAGMENTOS_CACHE_BYTES', 16 * 1024 * 1024))
+app.config['FRAGMENTOS_CACHE_TTL'] = int(os.environ.get('FRAGMENTOS_CACHE_TTL', 3600))
+# Bytecode dos templates compilados, em disco (relativo a instance/; vazio desativa)
+app.config['TEMPLATES_BYTECODE_DIR'] = os.environ.get('TEMPLATES_BYTECODE_DIR', 'templates_bytecode')
+# Purga dos registros excluídos logicamente: linhas removidas por transação e pausa entre os lotes
+app.config['PURGA_LOTE'] = int(os.environ.get('PURGA_LOTE', 500))
+app.config['PURGA_PAUSA_MS'] = int(os.environ.get('PURGA_PAUSA_MS', 50))
+# Purga em segundo plano logo após cada exclusão (0: só pelo comando "flask exclusoes purgar")
+app.config['PURGA_AUTOMATICA'] = os.environ.get('PURGA_AUTOMATICA', '1') == '1'
+
+# Workers recém-criados (e reinícios) carregam os templates já compilados em vez de recompilá-los;
+# a chave inclui o checksum do fonte, então um template alterado é recompilado normalmente
+if app.config['TEMPLATES_BYTECODE_DIR']:
+    _pasta_bytecode = os.path.join(app.instance_path, app.config['TEMPLATES_BYTECODE_DIR'])
+    os.makedirs(_pasta_bytecode, exist_ok=True)
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(_pasta_bytecode)}
+
+class SessaoRoteada(SessaoFlask):
+    """Envia as consultas das rotas somente leitura para o engine de leitura; flushes continuam no de escrita."""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('somente_leitura'):
+            engine = engine_leitura()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
 db.init_app(app)
 
-migrate = Migrate(app, db)
+# Engine de leitura criado sob demanda, uma vez por processo
+_engine_leitura = {'criado': False, 'engine': None}
+_engine_leitura_lock = threading.Lock()
+ROTAS_SOMENTE_LEITURA = set()
+
+def engine_leitura():
+    if not _engine_leitura['criado']:
+        with _engine_leitura_lock:
+            if not _engine_leitura['criado']:
+                url = app.config['LEITURA_DATABASE_URL']
+                if not url and db.engine.dialect.name == 'sqlite':
+                    caminho = db.engine.url.database
+                    if caminho and caminho != ':memory:' and not caminho.startswith('file:'):
+                        url = f'sqlite:///file:{caminho}?mode=ro&uri=true'
+                if url:
+                    _engine_leitura['engine'] = create_engine(url, **opcoes_engine(url, leitura=True))
+                _engine_leitura['criado'] = True
+    return _engine_leitura['engine']
+
+def engine_consultas():
+    return engine_leitura() or db.engine
+
+def somente_leitura(view):
+    ROTAS_SOMENTE_LEITURA.add(view.__name__)
+    return view
+
+@app.before_request
+def rotear_sessao():
+    g.somente_leitura = request.method in ('GET', 'HEAD') and request.endpoint in ROTAS_SOMENTE_LEITURA
+
+def incluir_na_migracao(objeto, nome, tipo, refletido, comparado_com):
+    # Tabelas FTS5 (e suas tabelas internas) são criadas pelos listeners do índice de busca, fora dos modelos
+    if tipo == 'table' and refletido and comparado_com is None:
+        return not any(nome == tabela or nome.startswith(tabela + '_') for tabela, _ in INDICES_BUSCA.values())
+    return True
+
+migrate = Migrate(app, db, include_object=incluir_na_migracao)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -35,6 +245,12 @@ class Perfil(db.Model):
 
 class Usuario(UserMixin, db.Model):
     __tablename__ = 'Usuarios'
+    # Índices das listagens: cada filtro seguido da ordenação (nome completo, id)
+    __table_args__ = (
+        db.Index('idx_usuario_nome', 'nome_completo', 'id_usuario'),
+        db.Index('idx_usuario_status_nome', 'status', 'nome_completo', 'id_usuario'),
+        db.Index('idx_usuario_perfil_nome', 'id_perfil', 'nome_completo', 'id_usuario'),
+    )
     
     id_usuario = db.Column(db.Integer, primary_key=True)
     id_perfil = db.Column(db.Integer, db.ForeignKey('Perfis.id_perfil'), nullable=False)
@@ -52,22 +268,47 @@ class Usuario(UserMixin, db.Model):
     def get_id(self):
         return str(self.id_usuario)
 
+# Índices parciais das linhas excluídas logicamente (aguardando a purga): pequenos e só usados por ela
+FILTRO_EXCLUIDOS = db.text('data_exclusao IS NOT NULL')
+# Unicidade só entre as linhas não excluídas: o código de um projeto excluído pode ser reutilizado antes da purga
+FILTRO_NAO_EXCLUIDOS = db.text('data_exclusao IS NULL')
+
 class Projeto(db.Model):
     __tablename__ = 'Projetos'
+    __table_args__ = (
+        db.Index('idx_projeto_atualizacao', 'data_ultima_atualizacao', 'id_projeto'),
+        db.Index('idx_projeto_situacao_atualizacao', 'situacao_projeto', 'data_ultima_atualizacao', 'id_projeto'),
+        db.Index('idx_projeto_exclusao', 'data_exclusao', sqlite_where=FILTRO_EXCLUIDOS,
+                 postgresql_where=FILTRO_EXCLUIDOS),
+        db.Index('uq_projeto_codigo', 'codigo_projeto', unique=True, sqlite_where=FILTRO_NAO_EXCLUIDOS,
+                 postgresql_where=FILTRO_NAO_EXCLUIDOS),
+    )
     
     id_projeto = db.Column(db.Integer, primary_key=True)
     id_usuario_criacao = db.Column(db.Integer, db.ForeignKey('Usuarios.id_usuario'), nullable=False)
     id_usuario_ultima_atualizacao = db.Column(db.Integer, db.ForeignKey('Usuarios.id_usuario'))
-    codigo_projeto = db.Column(db.String(10), unique=True, nullable=False)
+    codigo_projeto = db.Column(db.String(10), nullable=False)
     nome_projeto = db.Column(db.String(100), nullable=False)
     controle_economico = db.Column(db.String(50), nullable=False)
     numero_iniciativa = db.Column(db.String(50), nullable=False)
     situacao_projeto = db.Column(db.String(20), nullable=False)
     data_criacao = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone))
     data_ultima_atualizacao = db.Column(db.DateTime)
+    data_exclusao = db.Column(db.DateTime)  # exclusão lógica; a linha sai de fato na purga
 
 class Incidente(db.Model):
     __tablename__ = 'Incidentes'
+    __table_args__ = (
+        db.Index('idx_incidente_criacao', 'data_criacao', 'id_incidente'),
+        db.Index('idx_incidente_status_criacao', 'status', 'data_criacao', 'id_incidente'),
+        db.Index('idx_incidente_prioridade_criacao', 'prioridade', 'data_criacao', 'id_incidente'),
+        db.Index('idx_incidente_status_prioridade_criacao', 'status', 'prioridade', 'data_criacao', 'id_incidente'),
+        db.Index('idx_incidente_projeto_criacao', 'id_projeto', 'data_criacao', 'id_incidente'),
+        # Últimos incidentes atualizados (dashboard)
+        db.Index('idx_incidente_atualizacao', 'data_ultima_atualizacao', 'id_incidente'),
+        db.Index('idx_incidente_exclusao', 'data_exclusao', sqlite_where=FILTRO_EXCLUIDOS,
+                 postgresql_where=FILTRO_EXCLUIDOS),
+    )
     
     id_incidente = db.Column(db.Integer, primary_key=True)
     id_projeto = db.Column(db.Integer, db.ForeignKey('Projetos.id_projeto'), nullable=False)
@@ -80,6 +321,7 @@ class Incidente(db.Model):
     data_criacao = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone))
     data_ultima_atualizacao = db.Column(db.DateTime)
     data_resolucao = db.Column(db.DateTime)
+    data_exclusao = db.Column(db.DateTime)
     
     projeto = db.relationship('Projeto', backref='incidentes')
     criador = db.relationship('Usuario', foreign_keys=[id_usuario_criacao], backref='incidentes_criados')
@@ -87,6 +329,15 @@ class Incidente(db.Model):
 
 class Tarefa(db.Model):
     __tablename__ = 'Tarefas'
+    __table_args__ = (
+        db.Index('idx_tarefa_criacao', 'data_criacao', 'id_tarefa'),
+        db.Index('idx_tarefa_status_criacao', 'status', 'data_criacao', 'id_tarefa'),
+        db.Index('idx_tarefa_prioridade_criacao', 'prioridade', 'data_criacao', 'id_tarefa'),
+        db.Index('idx_tarefa_projeto_criacao', 'id_projeto', 'data_criacao', 'id_tarefa'),
+        db.Index('idx_tarefa_responsavel_criacao', 'id_usuario_responsavel', 'data_criacao', 'id_tarefa'),
+        db.Index('idx_tarefa_exclusao', 'data_exclusao', sqlite_where=FILTRO_EXCLUIDOS,
+                 postgresql_where=FILTRO_EXCLUIDOS),
+    )
     
     id_tarefa = db.Column(db.Integer, primary_key=True)
     id_projeto = db.Column(db.Integer, db.ForeignKey('Projetos.id_projeto'), nullable=False)
@@ -101,24 +352,1207 @@ class Tarefa(db.Model):
     data_ultima_atualizacao = db.Column(db.DateTime)
     data_limite = db.Column(db.Date)
     data_conclusao = db.Column(db.DateTime)
+    data_exclusao = db.Column(db.DateTime)
     
     projeto = db.relationship('Projeto', backref='tarefas')
     criador = db.relationship('Usuario', foreign_keys=[id_usuario_criacao], backref='tarefas_criadas')
     atualizador = db.relationship('Usuario', foreign_keys=[id_usuario_ultima_atualizacao], backref='tarefas_atualizadas')
     responsavel = db.relationship('Usuario', foreign_keys=[id_usuario_responsavel], backref='tarefas_responsavel')
 
+class Contador(db.Model):
+    __tablename__ = 'Contadores'
+    
+    dimensao = db.Column(db.String(30), primary_key=True)
+    valor = db.Column(db.String(20), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+# Dimensões mantidas na tabela de contadores: nome -> (modelo, atributo)
+DIMENSOES_CONTADORES = {
+    'projeto_situacao': (Projeto, 'situacao_projeto'),
+    'incidente_status': (Incidente, 'status'),
+    'incidente_prioridade': (Incidente, 'prioridade'),
+}
+
+# Linha especial da tabela de contadores incrementada a cada escrita em projetos/incidentes
+VERSAO_DASHBOARD = ('versao', 'dashboard')
+
+# Dados de referência das listas dos formulários e filtros: versão ('versao', nome) incrementada quando
+# um registro é criado/excluído ou muda algum dos atributos exibidos (ou guardados no cache de identidades)
+REFERENCIAS = {
+    'projetos': (Projeto, ('codigo_projeto', 'nome_projeto')),
+    'usuarios': (Usuario, ('login', 'nome_completo', 'status', 'id_perfil')),
+    'perfis': (Perfil, ('nome', 'descricao')),
+}
+
+def _transicao_exclusao(obj):
+    # -1: marcado como excluído neste flush; +1: restaurado; 0: exclusão lógica inalterada (ou modelo sem ela)
+    if not hasattr(type(obj), 'data_exclusao'):
+        return 0
+    historico = attributes.get_history(obj, 'data_exclusao')
+    if not historico.has_changes():
+        return 0
+    antes = historico.deleted[0] if historico.deleted else None
+    return (antes is not None) - (obj.data_exclusao is not None)
+
+def _calcular_deltas_contadores(session):
+    deltas = {}
+    
+    def somar(dimensao, valor, delta):
+        if valor is not None:
+            deltas[(dimensao, valor)] = deltas.get((dimensao, valor), 0) + delta
+    
+    # Registros excluídos logicamente já saíram das contagens quando foram marcados
+    for dimensao, (modelo, atributo) in DIMENSOES_CONTADORES.items():
+        for obj in session.new:
+            if isinstance(obj, modelo) and obj.data_exclusao is None:
+                somar(dimensao, getattr(obj, atributo), 1)
+        for obj in session.deleted:
+            if isinstance(obj, modelo) and obj.data_exclusao is None:
+                valores = attributes.get_history(obj, atributo).non_added()
+                somar(dimensao, valores[0] if valores else None, -1)
+        for obj in session.dirty:
+            if isinstance(obj, modelo) and obj not in session.deleted:
+                historico = attributes.get_history(obj, atributo)
+                transicao = _transicao_exclusao(obj)
+                if transicao < 0:
+                    valores = historico.non_added()
+                    somar(dimensao, valores[0] if valores else None, -1)
+                elif transicao > 0:
+                    somar(dimensao, getattr(obj, atributo), 1)
+                elif obj.data_exclusao is None:
+                    for valor in historico.deleted:
+                        somar(dimensao, valor, -1)
+                    for valor in historico.added:
+                        somar(dimensao, valor, 1)
+    
+    alterados = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in itertools.chain(session.new, session.deleted, alterados):
+        if isinstance(obj, (Projeto, Incidente)):
+            somar(*VERSAO_DASHBOARD, 1)
+            break
+    
+    for nome, (modelo, atributos) in REFERENCIAS.items():
+        if any(isinstance(obj, modelo) for obj in itertools.chain(session.new, session.deleted)) or any(
+                isinstance(obj, modelo) and (_transicao_exclusao(obj) or any(
+                    attributes.get_history(obj, a).has_changes() for a in atributos))
+                for obj in alterados):
+            somar('versao', nome, 1)
+    
+    return {chave: delta for chave, delta in deltas.items() if delta}
+
+def aplicar_deltas_contadores(connection, deltas):
+    tabela = Contador.__table__
+    for (dimensao, valor), delta in deltas.items():
+        resultado = connection.execute(
+            tabela.update()
+            .where(tabela.c.dimensao == dimensao, tabela.c.valor == valor)
+            .values(total=tabela.c.total + delta)
+        )
+        if resultado.rowcount == 0:
+            connection.execute(tabela.insert().values(dimensao=dimensao, valor=valor, total=delta))
+
+@event.listens_for(Session, 'after_flush')
+def atualizar_contadores(session, flush_context):
+    # Executado dentro da mesma transação do flush que alterou projetos/incidentes
+    deltas = _calcular_deltas_contadores(session)
+    if deltas:
+        aplicar_deltas_contadores(session.connection(), deltas)
+        if has_app_context():
+            # A própria requisição volta a ler as versões depois de alterar dados de referência
+            g.pop('versoes_referencia', None)
+
+# Modelos com exclusão lógica: linhas com data_exclusao ficam fora de toda consulta ORM até a purga
+MODELOS_EXCLUSAO_LOGICA = (Projeto, Tarefa, Incidente)
+
+@event.listens_for(Session, 'do_orm_execute')
+def ocultar_excluidos(estado):
+    # Vale para listagens, contagens, buscas, get() e relacionamentos (inclusive joinedload). Fica de fora o
+    # refresh de atributos de um objeto já carregado; execution_options(incluir_excluidos=True) desliga o filtro
+    if not estado.is_select or estado.is_column_load or estado.execution_options.get('incluir_excluidos', False):
+        return
+    estado.statement = estado.statement.options(*(
+        with_loader_criteria(modelo, lambda cls: cls.data_exclusao.is_(None), include_aliases=True)
+        for modelo in MODELOS_EXCLUSAO_LOGICA))
+
+def contar_totais_reais():
+    totais = {}
+    for dimensao, (modelo, atributo) in DIMENSOES_CONTADORES.items():
+        coluna = getattr(modelo, atributo)
+        for valor, total in db.session.query(coluna, db.func.count()).group_by(coluna).all():
+            totais[(dimensao, valor)] = total
+    return totais
+
+def reconstruir_contadores():
+    totais = contar_totais_reais()
+    Contador.query.filter(Contador.dimensao.in_(DIMENSOES_CONTADORES)).delete()
+    db.session.add_all(Contador(dimensao=dimensao, valor=valor, total=total)
+                       for (dimensao, valor), total in totais.items())
+    db.session.commit()
+    return totais
+
+@app.cli.group()
+def contadores():
+    """Manutenção da tabela de contadores do dashboard."""
+
+@contadores.command('reconstruir')
+def contadores_reconstruir():
+    """Recalcula todos os contadores a partir das tabelas."""
+    totais = reconstruir_contadores()
+    print(f'Contadores reconstruídos: {len(totais)} entradas.')
+
+@contadores.command('verificar')
+def contadores_verificar():
+    """Compara os contadores com as tabelas e informa divergências."""
+    esperados = contar_totais_reais()
+    atuais = {(c.dimensao, c.valor): c.total
+              for c in Contador.query.filter(Contador.dimensao.in_(DIMENSOES_CONTADORES))}
+    divergencias = 0
+    for chave in sorted(set(esperados) | set(atuais)):
+        esperado, atual = esperados.get(chave, 0), atuais.get(chave, 0)
+        if esperado != atual:
+            divergencias += 1
+            print(f'{chave[0]}={chave[1]}: contador {atual}, real {esperado} (diferença {atual - esperado:+d})')
+    if divergencias:
+        print(f'{divergencias} contador(es) divergente(s). Execute "flask contadores reconstruir".')
+        sys.exit(1)
+    print('Contadores consistentes.')
+
+def excluir_logicamente(registro):
+    """Marca o registro como excluído; o de um projeto leva junto as tarefas e incidentes. Não faz commit.
+    
+    Os filhos são marcados com um UPDATE por tabela, sem carregar objetos, e as contagens deles saem dos
+    contadores na mesma transação. A remoção física fica para purgar_excluidos.
+    """
+    agora = datetime.now(timezone)
+    registro.data_exclusao = agora
+    if not isinstance(registro, Projeto):
+        return
+    conexao = db.session.connection()
+    deltas = {}
+    for dimensao, (modelo, atributo) in DIMENSOES_CONTADORES.items():
+        if modelo is Projeto:
+            continue
+        tabela = modelo.__table__
+        coluna = tabela.c[atributo]
+        for valor, total in conexao.execute(db.select(coluna, db.func.count()).where(
+                tabela.c.id_projeto == registro.id_projeto, tabela.c.data_exclusao.is_(None)).group_by(coluna)):
+            deltas[(dimensao, valor)] = -total
+    aplicar_deltas_contadores(conexao, deltas)
+    for modelo in (Tarefa, Incidente):
+        tabela = modelo.__table__
+        conexao.execute(tabela.update().where(
+            tabela.c.id_projeto == registro.id_projeto, tabela.c.data_exclusao.is_(None)
+        ).values(data_exclusao=agora))
+
+def purgar_excluidos(lote=None, pausa=None):
+    """Remove de fato as linhas excluídas logicamente; devolve {tabela: linhas removidas}.
+    
+    Cada lote é um DELETE ... WHERE id IN (SELECT id ... LIMIT n) pelo índice parcial de data_exclusao, numa
+    transação própria: o lock de escrita é liberado entre os lotes (e durante a pausa) para as requisições.
+    Tarefas e incidentes saem antes dos projetos; um projeto só sai quando não tem mais nenhum filho.
+    """
+    lote = lote or app.config['PURGA_LOTE']
+    pausa = app.config['PURGA_PAUSA_MS'] / 1000 if pausa is None else pausa
+    removidos = {}
+    for modelo in (Tarefa, Incidente, Projeto):
+        tabela = modelo.__table__
+        chave = tabela.primary_key.columns[0]
+        candidatos = db.select(chave).where(tabela.c.data_exclusao.is_not(None))
+        if modelo is Projeto:
+            for filho in (Tarefa, Incidente):
+                candidatos = candidatos.where(~db.exists().where(filho.__table__.c.id_projeto == chave))
+        candidatos = candidatos.limit(lote)
+        removidos[tabela.name] = 0
+        while True:
+            with db.engine.begin() as conexao:
+                apagados = conexao.execute(tabela.delete().where(chave.in_(candidatos))).rowcount
+            removidos[tabela.name] += apagados
+            if apagados < lote:
+                break
+            time.sleep(pausa)
+    return removidos
+
+# Purga em segundo plano: uma thread por processo; exclusões seguidas acumulam uma única execução pendente
+_executor_purga = ThreadPoolExecutor(max_workers=1, thread_name_prefix='purga')
+_purga_pendente = threading.Event()
+
+def agendar_purga():
+    if not app.config['PURGA_AUTOMATICA'] or _purga_pendente.is_set():
+        return
+    _purga_pendente.set()
+    _executor_purga.submit(_executar_purga)
+
+def _executar_purga():
+    # Marcações feitas durante a execução agendam a próxima
+    _purga_pendente.clear()
+    try:
+        with app.app_context():
+            removidos = purgar_excluidos()
+        app.logger.info('Purga dos registros excluídos: %s', removidos)
+    except Exception:
+        app.logger.exception('Falha na purga dos registros excluídos')
+
+@app.cli.group()
+def exclusoes():
+    """Registros excluídos logicamente."""
+
+@exclusoes.command('purgar')
+@click.option('--lote', type=int, help='Linhas removidas por transação (padrão: PURGA_LOTE).')
+def exclusoes_purgar(lote):
+    """Remove fisicamente, em lotes, os projetos, tarefas e incidentes excluídos."""
+    removidos = purgar_excluidos(lote)
+    print('Linhas removidas: ' + ', '.join(f'{tabela} {total}' for tabela, total in removidos.items()) + '.')
+
+@event.listens_for(Engine, 'connect')
+def configurar_conexao_sqlite(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    # WAL: leitores não bloqueiam o escritor; NORMAL é seguro em WAL e evita um fsync por commit
+    try:
+        cursor.execute(f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}")
+    except sqlite3.OperationalError:
+        # Conexões mode=ro não podem trocar o journal; herdam o modo gravado no arquivo
+        pass
+    cursor.execute(f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}")
+    cursor.execute(f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}")
+    cursor.execute(f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}")
+    cursor.execute(f"PRAGMA cache_size={int(app.config['SQLITE_CACHE_SIZE'])}")
+    cursor.close()
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+# Índices de busca textual (SQLite FTS5): tabela virtual -> (modelo, colunas pesquisadas no fallback)
+INDICES_BUSCA = {
+    Projeto: ('ProjetosBusca', [Projeto.codigo_projeto, Projeto.nome_projeto]),
+    Incidente: ('IncidentesBusca', [Incidente.titulo, Incidente.descricao, Projeto.codigo_projeto]),
+    Tarefa: ('TarefasBusca', [Tarefa.titulo, Tarefa.descricao]),
+}
+
+DDL_BUSCA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS ProjetosBusca USING fts5(
+        codigo_projeto, nome_projeto, tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS IncidentesBusca USING fts5(
+        titulo, descricao, codigo_projeto, tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS TarefasBusca USING fts5(
+        titulo, descricao, tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    
+    # Projetos
+    """CREATE TRIGGER IF NOT EXISTS Projetos_busca_ai AFTER INSERT ON Projetos BEGIN
+        INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto)
+        VALUES (new.id_projeto, new.codigo_projeto, new.nome_projeto);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Projetos_busca_ad AFTER DELETE ON Projetos BEGIN
+        DELETE FROM ProjetosBusca WHERE rowid = old.id_projeto;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Projetos_busca_au AFTER UPDATE OF codigo_projeto, nome_projeto ON Projetos BEGIN
+        DELETE FROM ProjetosBusca WHERE rowid = old.id_projeto;
+        INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto)
+        VALUES (new.id_projeto, new.codigo_projeto, new.nome_projeto);
+        UPDATE IncidentesBusca SET codigo_projeto = new.codigo_projeto
+        WHERE rowid IN (SELECT id_incidente FROM Incidentes WHERE id_projeto = new.id_projeto);
+    END""",
+    
+    # Incidentes (o código do projeto também é pesquisável)
+    """CREATE TRIGGER IF NOT EXISTS Incidentes_busca_ai AFTER INSERT ON Incidentes BEGIN
+        INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto)
+        VALUES (new.id_incidente, new.titulo, new.descricao,
+                (SELECT codigo_projeto FROM Projetos WHERE id_projeto = new.id_projeto));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Incidentes_busca_ad AFTER DELETE ON Incidentes BEGIN
+        DELETE FROM IncidentesBusca WHERE rowid = old.id_incidente;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Incidentes_busca_au AFTER UPDATE OF titulo, descricao, id_projeto ON Incidentes BEGIN
+        DELETE FROM IncidentesBusca WHERE rowid = old.id_incidente;
+        INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto)
+        VALUES (new.id_incidente, new.titulo, new.descricao,
+                (SELECT codigo_projeto FROM Projetos WHERE id_projeto = new.id_projeto));
+    END""",
+    
+    # Tarefas
+    """CREATE TRIGGER IF NOT EXISTS Tarefas_busca_ai AFTER INSERT ON Tarefas BEGIN
+        INSERT INTO TarefasBusca(rowid, titulo, descricao) VALUES (new.id_tarefa, new.titulo, new.descricao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Tarefas_busca_ad AFTER DELETE ON Tarefas BEGIN
+        DELETE FROM TarefasBusca WHERE rowid = old.id_tarefa;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Tarefas_busca_au AFTER UPDATE OF titulo, descricao ON Tarefas BEGIN
+        DELETE FROM TarefasBusca WHERE rowid = old.id_tarefa;
+        INSERT INTO TarefasBusca(rowid, titulo, descricao) VALUES (new.id_tarefa, new.titulo, new.descricao);
+    END""",
+]
+
+REPOVOAR_BUSCA = [
+    'DELETE FROM ProjetosBusca',
+    'INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto) SELECT id_projeto, codigo_projeto, nome_projeto FROM Projetos',
+    'DELETE FROM IncidentesBusca',
+    """INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto)
+       SELECT i.id_incidente, i.titulo, i.descricao, p.codigo_projeto
+       FROM Incidentes i LEFT JOIN Projetos p ON p.id_projeto = i.id_projeto""",
+    'DELETE FROM TarefasBusca',
+    'INSERT INTO TarefasBusca(rowid, titulo, descricao) SELECT id_tarefa, titulo, descricao FROM Tarefas',
+]
+
+_busca_textual_disponivel = False
+
+@event.listens_for(db.metadata, 'after_create')
+def criar_indices_busca(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        for comando in DDL_BUSCA:
+            connection.exec_driver_sql(comando)
+
+@event.listens_for(db.metadata, 'before_drop')
+def remover_indices_busca(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        for nome, _ in INDICES_BUSCA.values():
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS {nome}')
+
+def busca_textual_disponivel():
+    global _busca_textual_disponivel
+    # Bancos anteriores ao índice usam o fallback com LIKE até "flask busca reconstruir"
+    if not _busca_textual_disponivel and db.engine.dialect.name == 'sqlite':
+        existe = db.session.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'IncidentesBusca'")
+        ).scalar()
+        _busca_textual_disponivel = bool(existe)
+    return _busca_textual_disponivel
+
+def aplicar_busca(query, modelo, termo):
+    """Filtra `query` pelo termo; devolve também a coluna de relevância (None no fallback com LIKE)."""
+    nome, colunas = INDICES_BUSCA[modelo]
+    palavras = re.findall(r'\w+', termo)
+    if palavras and busca_textual_disponivel():
+        # Cada palavra como prefixo ("proj"* casa com "projeto"), todas obrigatórias
+        expressao = ' '.join(f'"{palavra}"*' for palavra in palavras)
+        indice = db.table(nome, db.column('rowid'), db.column('rank'))
+        resultados = db.select(
+            indice.c.rowid.label('id'),
+            indice.c.rank.label('relevancia')
+        ).where(db.text(f'{nome} MATCH :expressao').bindparams(expressao=expressao)).subquery()
+        chave = modelo.__mapper__.primary_key[0]
+        return query.join(resultados, resultados.c.id == chave), resultados.c.relevancia
+    
+    padrao = f'%{termo}%'
+    if modelo is Incidente:
+        query = query.join(Projeto, Incidente.id_projeto == Projeto.id_projeto)
+    return query.filter(db.or_(*[coluna.ilike(padrao) for coluna in colunas])), None
+
+@app.cli.group()
+def busca():
+    """Manutenção do índice de busca textual."""
+
+@busca.command('reconstruir')
+def busca_reconstruir():
+    """Cria o índice FTS5 e os triggers (se necessário) e o repovoa a partir das tabelas."""
+    with db.engine.begin() as conn:
+        for comando in DDL_BUSCA + REPOVOAR_BUSCA:
+            conn.exec_driver_sql(comando)
+    print('Índice de busca reconstruído.')
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def contar_consultas(conn, cursor, statement, parameters, context, executemany):
+    instrumentada = False
+    if has_app_context():
+        g.sql_consultas = g.get('sql_consultas', 0) + 1
+        instrumentada = 'instrumentacao' in g
+    if instrumentada or app.config['CONSULTA_LENTA_MS']:
+        conn.info.setdefault('inicio_consultas', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def cronometrar_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('inicio_consultas')
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    if has_app_context() and 'instrumentacao' in g:
+        g.instrumentacao['sql'] += duracao
+    limite = app.config['CONSULTA_LENTA_MS']
+    if limite and duracao * 1000 >= limite:
+        registrar_consulta_lenta(conn, statement, parameters, executemany, duracao)
+
+@event.listens_for(Engine, 'handle_error')
+def descartar_cronometro(contexto):
+    inicios = contexto.connection.info.get('inicio_consultas') if contexto.connection is not None else None
+    if inicios:
+        inicios.pop()
+
+_log_consultas_lentas = logging.getLogger('portal.consultas_lentas')
+
+def caminho_consultas_lentas():
+    # Relativo a instance/ (fora do git e da imagem), salvo caminho absoluto em CONSULTAS_LENTAS_ARQUIVO
+    return os.path.join(app.instance_path, app.config['CONSULTAS_LENTAS_ARQUIVO'])
+
+def _saida_consultas_lentas():
+    # Arquivo criado só na primeira consulta lenta
+    if not _log_consultas_lentas.handlers:
+        caminho = caminho_consultas_lentas()
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        saida = RotatingFileHandler(caminho, maxBytes=app.config['CONSULTAS_LENTAS_MAX_BYTES'],
+                                    backupCount=app.config['CONSULTAS_LENTAS_BACKUPS'], encoding='utf-8')
+        saida.setFormatter(logging.Formatter('%(message)s'))
+        _log_consultas_lentas.addHandler(saida)
+        _log_consultas_lentas.setLevel(logging.INFO)
+        _log_consultas_lentas.propagate = False
+    return _log_consultas_lentas
+
+def _redigir(valor):
+    # Textos podem conter dados pessoais ou termos de busca: só o tamanho é registrado
+    if isinstance(valor, (list, tuple)):
+        return [_redigir(v) for v in valor]
+    if isinstance(valor, dict):
+        return {chave: _redigir(v) for chave, v in valor.items()}
+    if isinstance(valor, (str, bytes)):
+        return f'<texto:{len(valor)}>'
+    if valor is None or isinstance(valor, (int, float, bool)):
+        return valor
+    return str(valor)
+
+def _plano_consulta(conn, statement, parameters):
+    prefixo = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN ', 'mysql': 'EXPLAIN '}.get(conn.dialect.name)
+    if prefixo is None or not statement.lstrip().upper().startswith('SELECT'):
+        return None
+    # Direto no cursor do driver, fora dos eventos do engine (não conta nem é cronometrado)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefixo + statement, parameters)
+        return [str(linha[-1]) for linha in cursor.fetchall()]
+    except Exception as erro:
+        return [f'(plano indisponível: {erro})']
+    finally:
+        cursor.close()
+
+def registrar_consulta_lenta(conn, statement, parameters, executemany, duracao):
+    registro = {
+        'quando': datetime.now().isoformat(timespec='seconds'),
+        'duracao_ms': round(duracao * 1000, 2),
+        'sql': ' '.join(statement.split()),
+        'parametros': _redigir(parameters[:1] if executemany else parameters),
+        'lote': len(parameters) if executemany else None,
+        'rota': None,
+        'filtros': None,
+        'plano': None if executemany else _plano_consulta(conn, statement, parameters),
+    }
+    if has_request_context():
+        registro['rota'] = f'{request.method} {request.endpoint}'
+        # Combinação de filtros usada (só os nomes; cursor e página não mudam o plano)
+        registro['filtros'] = ','.join(sorted(k for k, v in request.args.items() if v and k not in ('cursor', 'page')))
+    _saida_consultas_lentas().warning(json.dumps(registro, ensure_ascii=False, default=str))
+
+def normalizar_sql(sql):
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\((\s*\?\s*,)+\s*\?\s*\)', '(?, ...)', sql)
+    return ' '.join(sql.split())
+
+def ler_consultas_lentas(caminho):
+    # Arquivo atual e os rotacionados (.1, .2, ...)
+    arquivos = [caminho] + [f'{caminho}.{i}' for i in range(1, app.config['CONSULTAS_LENTAS_BACKUPS'] + 1)]
+    for arquivo in arquivos:
+        if not os.path.exists(arquivo):
+            continue
+        with open(arquivo, encoding='utf-8') as entrada:
+            for linha in entrada:
+                try:
+                    yield json.loads(linha)
+                except ValueError:
+                    continue
+
+@app.cli.group('consultas-lentas')
+def consultas_lentas():
+    """Relatórios do log de consultas lentas."""
+
+@consultas_lentas.command('relatorio')
+@click.option('--top', default=10, show_default=True, help='Quantidade de linhas por agrupamento.')
+@click.option('--arquivo', default=None, help='Log a analisar (padrão: o configurado em instance/).')
+@click.option('--planos/--sem-planos', default=True, help='Exibir o plano de execução de cada consulta.')
+def consultas_lentas_relatorio(top, arquivo, planos):
+    """Agrupa o log por comando normalizado e por rota + filtros, ordenando pelo tempo total."""
+    caminho = arquivo or caminho_consultas_lentas()
+    por_comando, por_rota = {}, {}
+    for registro in ler_consultas_lentas(caminho):
+        comando = normalizar_sql(registro['sql'])
+        rota = f"{registro.get('rota') or '(fora de requisição)'} [{registro.get('filtros') or 'sem filtros'}]"
+        for grupos, chave in ((por_comando, comando), (por_rota, rota)):
+            grupo = grupos.setdefault(chave, {'total': 0.0, 'vezes': 0, 'maximo': 0.0, 'plano': None, 'rotas': set()})
+            grupo['total'] += registro['duracao_ms']
+            grupo['vezes'] += 1
+            grupo['maximo'] = max(grupo['maximo'], registro['duracao_ms'])
+            grupo['plano'] = registro.get('plano') or grupo['plano']
+            grupo['rotas'].add(rota)
+    if not por_comando:
+        print(f'Nenhuma consulta lenta registrada em {caminho}.')
+        return
+    
+    print(f'== Comandos que mais custaram no total (top {top})')
+    for comando, grupo in sorted(por_comando.items(), key=lambda item: -item[1]['total'])[:top]:
+        print(f"\n{grupo['total']:10.1f} ms  {grupo['vezes']:5d}x  média {grupo['total'] / grupo['vezes']:.1f} ms"
+              f"  máx {grupo['maximo']:.1f} ms")
+        print(f'  {comando[:400]}')
+        print(f"  rotas: {'; '.join(sorted(grupo['rotas'])[:5])}")
+        if planos and grupo['plano']:
+            for passo in grupo['plano']:
+                print(f'    plano: {passo}')
+    
+    print(f'\n== Rotas e combinações de filtros que mais custaram no total (top {top})')
+    for rota, grupo in sorted(por_rota.items(), key=lambda item: -item[1]['total'])[:top]:
+        print(f"{grupo['total']:10.1f} ms  {grupo['vezes']:5d}x  máx {grupo['maximo']:.1f} ms  {rota}")
+
+@before_render_template.connect_via(app)
+def iniciar_render(sender, template, context, **extra):
+    if 'instrumentacao' in g:
+        g.instrumentacao.setdefault('inicio_render', []).append(time.perf_counter())
+
+@template_rendered.connect_via(app)
+def concluir_render(sender, template, context, **extra):
+    inicios = g.get('instrumentacao', {}).get('inicio_render')
+    if inicios:
+        g.instrumentacao['render'] += time.perf_counter() - inicios.pop()
+
+# Uma linha JSON por requisição amostrada (stderr, capturado pelo gunicorn)
+log_instrumentacao = logging.getLogger('portal.instrumentacao')
+if not log_instrumentacao.handlers:
+    _saida_instrumentacao = logging.StreamHandler()
+    _saida_instrumentacao.setFormatter(logging.Formatter('%(message)s'))
+    log_instrumentacao.addHandler(_saida_instrumentacao)
+    log_instrumentacao.setLevel(logging.INFO)
+    log_instrumentacao.propagate = False
+
+def _tempos_instrumentacao(medicao):
+    agora = time.perf_counter()
+    # Hooks: before_request (sessão, login automático, cache de identidade) antes de a view começar
+    hooks = (medicao['inicio_view'] or agora) - medicao['inicio']
+    return {'hooks': hooks, 'view': medicao['view'], 'sql': medicao['sql'], 'render': medicao['render'],
+            'total': agora - medicao['inicio']}
+
+def registrar_instrumentacao(resposta):
+    medicao = g.instrumentacao
+    tempos = _tempos_instrumentacao(medicao)
+    consultas = g.get('sql_consultas', 0)
+    if app.config['INSTRUMENTACAO_SERVER_TIMING']:
+        # Em respostas em stream, cobre só o trabalho feito até o envio dos cabeçalhos
+        resposta.headers['Server-Timing'] = ', '.join(
+            f'{nome};dur={valor * 1000:.1f}' + (f';desc="{consultas} consultas"' if nome == 'sql' else '')
+            for nome, valor in tempos.items())
+    if app.config['INSTRUMENTACAO_LOG']:
+        dados = {'metodo': request.method, 'rota': request.endpoint, 'caminho': request.path,
+                 'status': resposta.status_code}
+        
+        def registrar(consultas, tempos):
+            log_instrumentacao.info(json.dumps({
+                **dados, 'consultas': consultas,
+                **{f'{nome}_ms': round(valor * 1000, 2) for nome, valor in tempos.items()},
+            }, ensure_ascii=False))
+        
+        if resposta.is_streamed:
+            # O corpo (e suas consultas) é gerado depois daqui: registra quando o servidor terminar de enviar
+            estado = g._get_current_object()
+            resposta.call_on_close(lambda: registrar(estado.get('sql_consultas', 0), _tempos_instrumentacao(medicao)))
+        else:
+            registrar(consultas, tempos)
+
+@app.after_request
+def verificar_query_budget(response):
+    limite = app.config['QUERY_BUDGET']
+    consultas = g.get('sql_consultas', 0)
+    if limite and consultas > limite:
+        mensagem = f'{request.method} {request.path} executou {consultas} comandos SQL (limite {limite})'
+        if app.testing:
+            # Um corpo em streaming já foi iniciado e segura o contexto da requisição: sem o close, o coletor
+            # de lixo o encerraria depois, desempilhando o contexto de outro teste
+            response.close()
+            raise QueryBudgetExceeded(mensagem)
+        app.logger.warning(mensagem)
+    return response
+
+def _codificacao_resposta():
+    aceitas = request.accept_encodings
+    if brotli is not None and aceitas['br']:
+        return 'br'
+    if aceitas['gzip']:
+        return 'gzip'
+    return None
+
+def _compressor(codificacao):
+    """Função que comprime um bloco e já o libera (flush), para o navegador receber cada bloco assim que sai."""
+    if codificacao == 'br':
+        compressor = brotli.Compressor(quality=app.config['COMPRESSAO_NIVEL_BROTLI'])
+        return lambda dados: compressor.process(dados) + compressor.flush(), compressor.finish
+    compressor = zlib.compressobj(app.config['COMPRESSAO_NIVEL_GZIP'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return lambda dados: compressor.compress(dados) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+def _comprimir_stream(partes, codificacao):
+    comprimir, finalizar = _compressor(codificacao)
+    try:
+        for parte in partes:
+            dados = comprimir(parte.encode('utf-8') if isinstance(parte, str) else parte)
+            if dados:
+                yield dados
+        yield finalizar()
+    finally:
+        if hasattr(partes, 'close'):
+            partes.close()
+
+@app.after_request
+def comprimir_resposta(response):
+    minimo = app.config['COMPRESSAO_MIN_BYTES']
+    if (not minimo or 'Content-Encoding' in response.headers
+            or response.mimetype not in app.config['COMPRESSAO_TIPOS'] or response.cache_control.no_transform):
+        return response
+    codificacao = _codificacao_resposta()
+    if response.status_code == 304:
+        # O 304 repete o Vary e a forma do ETag da resposta completa que substitui
+        response.vary.add('Accept-Encoding')
+        if codificacao is not None:
+            _enfraquecer_etag(response)
+        return response
+    if (codificacao is None or request.method == 'HEAD' or response.status_code < 200
+            or response.status_code == 204 or response.direct_passthrough):
+        return response
+    
+    if response.is_streamed:
+        # Tamanho desconhecido: comprime bloco a bloco sem acumular o corpo
+        response.response = _comprimir_stream(response.response, codificacao)
+        response.headers.pop('Content-Length', None)
+    else:
+        dados = response.get_data()
+        if len(dados) < minimo:
+            return response
+        comprimir, finalizar = _compressor(codificacao)
+        response.set_data(comprimir(dados) + finalizar())
+    response.headers['Content-Encoding'] = codificacao
+    response.vary.add('Accept-Encoding')
+    _enfraquecer_etag(response)
+    return response
+
+def _enfraquecer_etag(response):
+    # Os bytes comprimidos diferem dos originais: o ETag forte passa a fraco (W/"..."). If-None-Match usa
+    # comparação fraca, então os validadores da aplicação (dashboard, API) continuam reconhecendo o valor
+    etag, fraco = response.get_etag()
+    if etag and not fraco:
+        response.set_etag(etag, weak=True)
+
+def _agrupar_stream(partes, tamanho):
+    # O Jinja gera um pedaço por expressão; juntar em blocos evita um write (e um flush do compressor) por linha
+    bloco, acumulado = [], 0
+    for parte in partes:
+        bloco.append(parte)
+        acumulado += len(parte)
+        if acumulado >= tamanho:
+            yield ''.join(bloco)
+            bloco, acumulado = [], 0
+    if bloco:
+        yield ''.join(bloco)
+
+def renderizar_stream(nome_template, **contexto):
+    """Como render_template, mas envia o HTML em blocos enquanto o template (e os cursores que ele percorre) avança."""
+    # stream_template já mantém o contexto da requisição (sessão, g) até o fim do template
+    partes = stream_template(nome_template, **contexto)
+    return Response(_agrupar_stream(partes, app.config['STREAM_BLOCO_BYTES']), mimetype='text/html')
+
+class CacheLRU:
+    """Cache em memória, seguro entre threads, limitado em quantidade (e opcionalmente em bytes) e com validade por entrada."""
+    
+    def __init__(self, tamanho_maximo, ttl, max_bytes=0):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._bytes = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def obter(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            valor, expira_em, _ = item
+            if time.monotonic() >= expira_em:
+                self._remover(chave)
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+    
+    def guardar(self, chave, valor):
+        if self.tamanho_maximo <= 0 or self.ttl <= 0:
+            return
+        # Tamanho só é medido quando há limite em bytes (sys.getsizeof: rasa, adequada a str/bytes)
+        tamanho = sys.getsizeof(valor) if self.max_bytes > 0 else 0
+        if tamanho > self.max_bytes > 0:
+            return
+        with self._lock:
+            self._remover(chave)
+            self._itens[chave] = (valor, time.monotonic() + self.ttl, tamanho)
+            self._bytes += tamanho
+            while len(self._itens) > self.tamanho_maximo or (self.max_bytes > 0 and self._bytes > self.max_bytes):
+                _, (_, _, removido) = self._itens.popitem(last=False)
+                self._bytes -= removido
+    
+    def invalidar(self, chave=None):
+        with self._lock:
+            if chave is None:
+                self._itens.clear()
+                self._bytes = 0
+            else:
+                self._remover(chave)
+    
+    def _remover(self, chave):
+        item = self._itens.pop(chave, None)
+        if item is not None:
+            self._bytes -= item[2]
+
+@dataclass(frozen=True)
+class IdentidadeUsuario(UserMixin):
+    """Cópia imutável do usuário logado (current_user), compartilhável entre as threads do processo."""
+    id_usuario: int
+    nome_completo: str
+    id_perfil: int
+    perfil: str
+    
+    def get_id(self):
+        return str(self.id_usuario)
+
+# Chave inclui as versões de 'usuarios' e 'perfis': uma edição em qualquer worker invalida todos
+cache_identidades = CacheLRU(app.config['IDENTIDADE_CACHE_TAMANHO'], app.config['IDENTIDADE_CACHE_TTL'])
+
 @login_manager.user_loader
 def load_user(user_id):
-    return Usuario.query.get(int(user_id))
+    versoes = versoes_referencia()
+    chave = (int(user_id), versoes.get('usuarios', 0), versoes.get('perfis', 0))
+    identidade = cache_identidades.obter(chave)
+    if identidade is None:
+        linha = db.session.query(Usuario.id_usuario, Usuario.nome_completo, Usuario.id_perfil, Perfil.nome).join(
+            Perfil, Perfil.id_perfil == Usuario.id_perfil).filter(Usuario.id_usuario == int(user_id)).first()
+        if linha is None:
+            return None
+        identidade = IdentidadeUsuario(*linha)
+        cache_identidades.guardar(chave, identidade)
+    return identidade
+
+# Hash de senhas com concorrência limitada: no máximo SENHA_HASH_THREADS cálculos simultâneos por processo
+# (scrypt usa CPU e memória) e até SENHA_HASH_FILA requisições esperando a vez. O hash roda na própria thread
+# da requisição, que ficaria bloqueada de qualquer forma; acima do limite a requisição é recusada com 503 em
+# vez de ocupar mais uma thread do gunicorn na espera.
+_hashes_simultaneos = threading.BoundedSemaphore(app.config['SENHA_HASH_THREADS'])
+_vagas_senhas = threading.BoundedSemaphore(app.config['SENHA_HASH_THREADS'] + app.config['SENHA_HASH_FILA'])
+_prefixo_hash_atual = {}
+
+def _executar_hash(funcao, *args):
+    if not _vagas_senhas.acquire(blocking=False):
+        app.logger.warning('Fila de hash de senhas cheia; requisição recusada com 503')
+        raise ServiceUnavailable('Servidor ocupado. Tente novamente em alguns segundos.', retry_after=5)
+    try:
+        with _hashes_simultaneos:
+            return funcao(*args)
+    finally:
+        _vagas_senhas.release()
+
+def gerar_hash_senha(senha):
+    return _executar_hash(generate_password_hash, senha, app.config['SENHA_HASH_METODO'])
+
+def verificar_senha(hash_senha, senha):
+    return _executar_hash(check_password_hash, hash_senha, senha)
+
+def precisa_rehash(hash_senha):
+    # Compara os parâmetros gravados no hash ("scrypt:32768:8:1$...") com a política atual
+    metodo = app.config['SENHA_HASH_METODO']
+    if metodo not in _prefixo_hash_atual:
+        _prefixo_hash_atual[metodo] = generate_password_hash('', method=metodo).split('$', 1)[0]
+    return hash_senha.split('$', 1)[0] != _prefixo_hash_atual[metodo]
+
+# Id do usuário admin resolvido uma única vez por processo
+_admin_auto_login = {'id': None}
 
 @app.before_request
 def auto_login_admin():
-    from flask_login import login_user
-    if not hasattr(g, 'auto_login_done'):
-        admin = Usuario.query.filter_by(login='admin').first()
+    # Arquivos estáticos não dependem de sessão (e assim não recebem Vary: Cookie)
+    if request.endpoint in ('static', 'servir_asset'):
+        return
+    if not app.config['AUTO_LOGIN_ADMIN'] or current_user.is_authenticated:
+        return
+    if _admin_auto_login['id'] is None:
+        _admin_auto_login['id'] = db.session.query(Usuario.id_usuario).filter_by(login='admin').scalar()
+    if _admin_auto_login['id'] is not None:
+        admin = load_user(_admin_auto_login['id'])
         if admin:
             login_user(admin)
-            g.auto_login_done = True
+
+class PaginaCursor:
+    por_cursor = True
+    
+    def __init__(self, items, next_cursor, prev_cursor, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.has_next = next_cursor is not None
+        self.has_prev = prev_cursor is not None
+        self.total = total
+
+def _codificar_cursor(direcao, valores):
+    valores = [v.isoformat() if isinstance(v, datetime) else v for v in valores]
+    dados = json.dumps([direcao, valores], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip('=')
+
+def _decodificar_cursor(token, ordenacao):
+    try:
+        dados = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direcao, valores = json.loads(dados)
+        if direcao not in ('apos', 'antes') or len(valores) != len(ordenacao):
+            return None
+        return direcao, [_valor_cursor(coluna, valor) for (coluna, _), valor in zip(ordenacao, valores)]
+    except (ValueError, TypeError):
+        return None
+
+def _valor_cursor(coluna, valor):
+    # O token vem do cliente: só aceita o tipo da coluna (senão a consulta falharia com 500)
+    if valor is None:
+        if not _anulavel(coluna):
+            raise ValueError('valor nulo em coluna obrigatória')
+        return None
+    if isinstance(coluna.type, db.DateTime):
+        if not isinstance(valor, str):
+            raise TypeError('data esperada')
+        return datetime.fromisoformat(valor)
+    if isinstance(coluna.type, db.String):
+        if not isinstance(valor, str):
+            raise TypeError('texto esperado')
+        return valor
+    if isinstance(coluna.type, db.Integer):
+        # bool é subclasse de int; fora de 64 bits o driver do SQLite recusa o parâmetro
+        if isinstance(valor, bool) or not isinstance(valor, int) or not -2**63 <= valor < 2**63:
+            raise TypeError('inteiro esperado')
+        return valor
+    # Demais colunas (ex.: relevância da busca): número
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise TypeError('número esperado')
+    return valor
+
+def _anulavel(coluna):
+    if isinstance(coluna, InstrumentedAttribute):
+        return coluna.property.columns[0].nullable
+    return getattr(coluna, 'nullable', False)
+
+def _condicao_cursor(ordenacao, valores, depois):
+    # (k1, ..., kn) depois/antes de (v1, ..., vn) na ordem da listagem, com NULLs no fim
+    alternativas = []
+    iguais = []
+    for (coluna, decrescente), valor in zip(ordenacao, valores):
+        anulavel = _anulavel(coluna)
+        if valor is None:
+            passo = db.false() if depois else coluna.isnot(None)
+        elif depois:
+            passo = coluna < valor if decrescente else coluna > valor
+            if anulavel:
+                passo = db.or_(passo, coluna.is_(None))
+        else:
+            passo = coluna > valor if decrescente else coluna < valor
+        alternativas.append(db.and_(*iguais, passo))
+        iguais.append(coluna.is_(None) if valor is None else coluna == valor)
+    return db.or_(*alternativas)
+
+def criterios_ordenacao(ordenacao, invertida=False):
+    criterios = []
+    for coluna, decrescente in ordenacao:
+        criterio = coluna.desc() if decrescente != invertida else coluna.asc()
+        # NULLS FIRST/LAST só em colunas anuláveis: nas demais impediria o uso do índice da ordenação
+        if _anulavel(coluna):
+            criterio = criterio.nullsfirst() if invertida else criterio.nullslast()
+        criterios.append(criterio)
+    return criterios
+
+def paginar_por_cursor(query, ordenacao, per_page, cursor=None, total=None):
+    """Paginação keyset: `ordenacao` é uma lista de (coluna, decrescente) terminada pela chave primária."""
+    decodificado = _decodificar_cursor(cursor, ordenacao) if cursor else None
+    direcao, valores = decodificado or ('apos', None)
+    
+    criterios = criterios_ordenacao(ordenacao, invertida=(direcao == 'antes'))
+    if valores is not None:
+        query = query.filter(_condicao_cursor(ordenacao, valores, direcao == 'apos'))
+    
+    # Colunas de ordenação que não pertencem ao modelo (ex.: relevância da busca) vêm junto com cada linha
+    extras = [c for c, _ in ordenacao if not isinstance(c, InstrumentedAttribute)]
+    if extras:
+        query = query.add_columns(*extras)
+    
+    # Uma linha a mais indica se existe outra página na mesma direção
+    linhas = query.order_by(*criterios).limit(per_page + 1).all()
+    tem_mais = len(linhas) > per_page
+    linhas = linhas[:per_page]
+    if direcao == 'antes':
+        linhas.reverse()
+    items = [linha[0] for linha in linhas] if extras else linhas
+    
+    def chave(linha):
+        item = linha[0] if extras else linha
+        valores_extras = iter(linha[1:] if extras else ())
+        return [getattr(item, c.key) if isinstance(c, InstrumentedAttribute) else next(valores_extras)
+                for c, _ in ordenacao]
+    
+    next_cursor = prev_cursor = None
+    if linhas:
+        if direcao == 'antes' or tem_mais:
+            next_cursor = _codificar_cursor('apos', chave(linhas[-1]))
+        if (direcao == 'apos' and valores is not None) or (direcao == 'antes' and tem_mais):
+            prev_cursor = _codificar_cursor('antes', chave(linhas[0]))
+    return PaginaCursor(items, next_cursor, prev_cursor, total)
+
+def total_por_contadores(dimensao, filtros):
+    # Total exato em O(1) quando no máximo um filtro mapeado para a tabela de contadores está ativo
+    ativos = [(d, v) for d, v in filtros if v]
+    if len(ativos) > 1 or (ativos and ativos[0][0] is None):
+        return None
+    if ativos:
+        contador = db.session.get(Contador, ativos[0][0])
+        return contador.total if contador else 0
+    return db.session.query(db.func.coalesce(db.func.sum(Contador.total), 0)).filter(
+        Contador.dimensao == dimensao
+    ).scalar()
+
+ProjetoRef = namedtuple('ProjetoRef', 'id_projeto codigo_projeto nome_projeto')
+UsuarioRef = namedtuple('UsuarioRef', 'id_usuario login nome_completo')
+PerfilRef = namedtuple('PerfilRef', 'id_perfil nome descricao')
+TIPOS_REFERENCIA = {'projetos': ProjetoRef, 'usuarios': UsuarioRef, 'perfis': PerfilRef}
+
+CONSULTAS_REFERENCIA = {
+    'projetos': lambda: [ProjetoRef(*linha) for linha in db.session.query(
+        Projeto.id_projeto, Projeto.codigo_projeto, Projeto.nome_projeto).order_by(Projeto.codigo_projeto)],
+    'usuarios': lambda: [UsuarioRef(*linha) for linha in db.session.query(
+        Usuario.id_usuario, Usuario.login, Usuario.nome_completo).filter(Usuario.status == 'ATIVO').order_by(
+        Usuario.nome_completo, Usuario.id_usuario)],
+    'perfis': lambda: [PerfilRef(*linha) for linha in db.session.query(
+        Perfil.id_perfil, Perfil.nome, Perfil.descricao).order_by(Perfil.nome)],
+}
+
+# nome -> (versão, tupla de registros); compartilhado pelas threads do processo
+_cache_referencia = {}
+
+def versoes_referencia():
+    # Uma consulta por requisição cobre as três listas; outro worker que escreva incrementa a versão no banco
+    if 'versoes_referencia' not in g:
+        g.versoes_referencia = dict(db.session.query(Contador.valor, Contador.total).filter(
+            Contador.dimensao == 'versao', Contador.valor.in_(list(REFERENCIAS))))
+    return g.versoes_referencia
+
+def dados_referencia(nome):
+    versao = versoes_referencia().get(nome, 0)
+    entrada = _cache_referencia.get(nome)
+    if entrada is not None and entrada[0] == versao:
+        return entrada[1]
+    # Versão lida antes dos dados: uma escrita concorrente só faz a próxima requisição recarregar
+    dados = tuple(CONSULTAS_REFERENCIA[nome]())
+    _cache_referencia[nome] = (versao, dados)
+    return dados
+
+# Busca incremental (typeahead) sobre os dados de referência: campos indexados e rótulo de cada registro
+CAMPOS_BUSCA_REFERENCIA = {
+    'projetos': ('codigo_projeto', 'nome_projeto'),
+    'usuarios': ('login', 'nome_completo'),
+}
+ROTULOS_REFERENCIA = {
+    'projetos': lambda p: f'{p.codigo_projeto} - {p.nome_projeto}',
+    'usuarios': lambda u: u.nome_completo,
+}
+LIMITE_BUSCA_REFERENCIA = 50
+
+# nome -> (tupla de dados indexada, chaves ordenadas, registros por id); refeito quando o cache recarrega
+_indice_prefixos = {}
+
+def normalizar_prefixo(texto):
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold().strip()
+
+def indice_prefixos(nome):
+    dados = dados_referencia(nome)
+    entrada = _indice_prefixos.get(nome)
+    if entrada is not None and entrada[0] is dados:
+        return entrada
+    chaves = []
+    for posicao, registro in enumerate(dados):
+        for campo in CAMPOS_BUSCA_REFERENCIA[nome]:
+            valor = normalizar_prefixo(getattr(registro, campo))
+            # Cada palavra também inicia uma chave: "silva" encontra "Maria Silva"
+            for inicio in {0} | {m.start() for m in re.finditer(r'\b\w', valor)}:
+                chaves.append((valor[inicio:], posicao))
+    chaves.sort()
+    entrada = (dados, chaves, {registro[0]: registro for registro in dados})
+    _indice_prefixos[nome] = entrada
+    return entrada
+
+def buscar_referencia(nome, termo, limite):
+    """Até `limite` registros cujo campo (ou uma palavra dele) começa com `termo`, sem acentos nem caixa."""
+    dados, chaves, _ = indice_prefixos(nome)
+    prefixo = normalizar_prefixo(termo)
+    if not prefixo:
+        return list(dados[:limite])
+    encontrados = {}
+    posicao = bisect.bisect_left(chaves, (prefixo,))
+    while posicao < len(chaves) and len(encontrados) < limite:
+        chave, indice = chaves[posicao]
+        if not chave.startswith(prefixo):
+            break
+        encontrados.setdefault(indice, dados[indice])
+        posicao += 1
+    return list(encontrados.values())
+
+def referencia_selecionada(nome, valor):
+    """Registro do id recebido para renderizar só a opção selecionada; fora do cache (ex.: usuário inativo) vai ao banco."""
+    try:
+        identificador = int(valor)
+    except (TypeError, ValueError):
+        return None
+    registro = indice_prefixos(nome)[2].get(identificador)
+    if registro is None:
+        tipo = TIPOS_REFERENCIA[nome]
+        objeto = db.session.get(REFERENCIAS[nome][0], identificador)
+        if objeto is not None:
+            registro = tipo(*(getattr(objeto, campo) for campo in tipo._fields))
+    return registro
+
+# Arquivos estáticos versionados: "flask assets construir" copia static/ para static/dist/ com o hash do
+# conteúdo no nome e variantes .gz/.br; /assets serve essas cópias com cache imutável
+PASTA_ASSETS = os.path.join(app.static_folder, 'dist')
+EXTENSOES_COMPRIMIVEIS = ('.css', '.js', '.svg', '.ttf', '.json', '.txt')
+URL_CSS = re.compile(r'url\((?P<aspas>["\']?)(?P<caminho>(?![a-z]+:|/|#)[^"\')?#]+)(?P<sufixo>[^"\')]*)(?P=aspas)\)')
+CODIFICACOES_ASSETS = (('br', '.br'), ('gzip', '.gz'))
+
+_manifesto_assets = {}
+
+def manifesto_assets():
+    # Lido uma vez por processo; em modo debug, a cada uso para acompanhar um novo "construir"
+    if 'nomes' not in _manifesto_assets or app.debug:
+        try:
+            with open(os.path.join(PASTA_ASSETS, 'manifest.json'), encoding='utf-8') as arquivo:
+                _manifesto_assets['nomes'] = json.load(arquivo)
+        except (OSError, ValueError):
+            _manifesto_assets['nomes'] = {}
+    return _manifesto_assets['nomes']
+
+@app.template_global()
+def asset(caminho):
+    nome = manifesto_assets().get(caminho)
+    if nome is None:
+        # Sem "flask assets construir" (ex.: desenvolvimento): arquivo original com o cache padrão do Flask
+        return url_for('static', filename=caminho)
+    return url_for('servir_asset', nome=nome)
+
+@app.route('/assets/<path:nome>')
+def servir_asset(nome):
+    if nome == 'manifest.json':
+        abort(404)
+    arquivo = nome
+    codificacao = None
+    for candidata, sufixo in CODIFICACOES_ASSETS:
+        variante = safe_join(PASTA_ASSETS, nome + sufixo)
+        if request.accept_encodings[candidata] and variante and os.path.isfile(variante):
+            arquivo, codificacao = nome + sufixo, candidata
+            break
+    tipo = mimetypes.guess_type(nome)[0] or 'application/octet-stream'
+    resposta = send_from_directory(PASTA_ASSETS, arquivo, mimetype=tipo, max_age=365 * 24 * 3600,
+                                   download_name=posixpath.basename(nome))
+    if codificacao:
+        resposta.headers['Content-Encoding'] = codificacao
+    resposta.vary.add('Accept-Encoding')
+    # O nome muda junto com o conteúdo: o navegador não precisa revalidar
+    resposta.cache_control.public = True
+    resposta.cache_control.immutable = True
+    return resposta
+
+def _reescrever_urls_css(conteudo, relativo, manifesto):
+    # url(../webfonts/x.woff2) passa a apontar para a cópia com hash, mantendo o caminho relativo
+    pasta = posixpath.dirname(relativo)
+    
+    def substituir(encontrado):
+        alvo = posixpath.normpath(posixpath.join(pasta, encontrado.group('caminho')))
+        if alvo not in manifesto:
+            return encontrado.group(0)
+        caminho = posixpath.relpath(manifesto[alvo], pasta)
+        aspas = encontrado.group('aspas')
+        return f'url({aspas}{caminho}{encontrado.group("sufixo")}{aspas})'
+    
+    return URL_CSS.sub(substituir, conteudo.decode('utf-8')).encode('utf-8')
+
+def construir_assets(origem=None, destino=PASTA_ASSETS):
+    """Gera `destino` com as cópias versionadas, as variantes comprimidas e o manifest.json; devolve o manifesto."""
+    origem = origem or app.static_folder
+    relativos = []
+    for pasta, subpastas, arquivos in os.walk(origem):
+        subpastas[:] = sorted(p for p in subpastas if os.path.join(pasta, p) != destino and not p.startswith('.'))
+        relativos.extend(posixpath.join(*os.path.relpath(os.path.join(pasta, a), origem).split(os.sep))
+                         for a in arquivos if not a.startswith('.'))
+    shutil.rmtree(destino, ignore_errors=True)
+    
+    manifesto = {}
+    # CSS por último: os url() internos já encontram as fontes e imagens no manifesto
+    for relativo in sorted(relativos, key=lambda r: (r.endswith('.css'), r)):
+        with open(os.path.join(origem, relativo), 'rb') as arquivo:
+            conteudo = arquivo.read()
+        if relativo.endswith('.css'):
+            conteudo = _reescrever_urls_css(conteudo, relativo, manifesto)
+        raiz, extensao = posixpath.splitext(relativo)
+        nome = f'{raiz}.{hashlib.sha256(conteudo).hexdigest()[:12]}{extensao}'
+        variantes = {'': conteudo}
+        if extensao in EXTENSOES_COMPRIMIVEIS:
+            variantes['.gz'] = gzip.compress(conteudo, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variantes['.br'] = brotli.compress(conteudo, quality=11)
+        caminho = os.path.join(destino, *nome.split('/'))
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        for sufixo, dados in variantes.items():
+            # Variante que não ficou menor não vale o Content-Encoding
+            if sufixo and len(dados) >= len(conteudo):
+                continue
+            with open(caminho + sufixo, 'wb') as arquivo:
+                arquivo.write(dados)
+        manifesto[relativo] = nome
+    
+    with open(os.path.join(destino, 'manifest.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+    _manifesto_assets.pop('nomes', None)
+    return manifesto
+
+@app.cli.group()
+def assets():
+    """Arquivos estáticos versionados."""
+
+@assets.command('construir')
+def assets_construir():
+    """Copia static/ para static/dist/ com hash no nome e variantes gzip/brotli."""
+    manifesto = construir_assets()
+    print(f'{len(manifesto)} arquivos versionados em {PASTA_ASSETS}.')
+
+# HTML já renderizado de linhas e seções, por registro; compartilhado pelas threads do processo
+cache_fragmentos = CacheLRU(app.config['FRAGMENTOS_CACHE_ITENS'], app.config['FRAGMENTOS_CACHE_TTL'],
+                            app.config['FRAGMENTOS_CACHE_BYTES'])
+
+@app.template_global()
+def fragmento(nome, registro, referencias=(), caller=None):
+    """{% call fragmento('tarefas/linha', tarefa, ('projetos', 'usuarios')) %}...{% endcall %}
+    
+    A chave junta o id e as datas de criação/atualização do registro com a versão dos dados de referência
+    exibidos no trecho (nome do projeto, do responsável...): qualquer edição gera uma chave nova e a antiga
+    sai pelo LRU. O corpo do bloco só é renderizado quando a chave não está no cache.
+    """
+    if app.jinja_env.auto_reload:
+        # Desenvolvimento: o template pode ter mudado sem que o registro mudasse
+        return caller()
+    versoes = versoes_referencia() if referencias else {}
+    chave = (nome, inspect(registro).identity, registro.data_criacao, registro.data_ultima_atualizacao,
+             tuple(versoes.get(r, 0) for r in referencias))
+    html = cache_fragmentos.obter(chave)
+    if html is None:
+        html = caller()
+        cache_fragmentos.guardar(chave, html)
+    return html
+
+@app.cli.command('compilar-templates')
+def compilar_templates():
+    """Grava o bytecode de todos os templates (TEMPLATES_BYTECODE_DIR) antes de subir os workers."""
+    if not app.config['TEMPLATES_BYTECODE_DIR']:
+        raise click.UsageError('TEMPLATES_BYTECODE_DIR vazio: cache de bytecode desativado.')
+    nomes = app.jinja_env.list_templates(extensions=['html'])
+    for nome in nomes:
+        app.jinja_env.get_template(nome)
+    print(f'{len(nomes)} templates compilados.')
 
 @app.route('/')
 def index():
@@ -131,9 +1565,12 @@ def login():
         senha = request.form.get('senha')
         usuario = Usuario.query.filter_by(login=login).first()
         
-        if usuario and check_password_hash(usuario.senha, senha):
+        if usuario and verificar_senha(usuario.senha, senha):
             login_user(usuario)
             usuario.ultimo_login = datetime.now(timezone)
+            # Senha gravada com parâmetros antigos: regravar com a política atual
+            if precisa_rehash(usuario.senha):
+                usuario.senha = gerar_hash_senha(senha)
             db.session.commit()
             return redirect(url_for('index'))
         flash('Login ou senha inválidos', 'danger')
@@ -145,8 +1582,27 @@ def logout():
     logout_user()
     return redirect(url_for('login'))
 
+def filtrar_projetos(query, args):
+    """Aplica os filtros da listagem de projetos; devolve a query e a ordenação."""
+    situacao = args.get('situacao', '')
+    search = args.get('search', '')
+    
+    # Aplicar filtros
+    if situacao:
+        query = query.filter(Projeto.situacao_projeto == situacao)
+    
+    # Ordenar por data de última atualização (nulls last), com a chave primária como desempate
+    ordenacao = [(Projeto.data_ultima_atualizacao, True), (Projeto.id_projeto, True)]
+    if search:
+        query, relevancia = aplicar_busca(query, Projeto, search)
+        if relevancia is not None:
+            # Com busca textual, os mais relevantes primeiro
+            ordenacao = [(relevancia, False), (Projeto.id_projeto, True)]
+    return query, ordenacao
+
 @app.route('/projetos')
 @login_required
+@somente_leitura
 def listar_projetos():
     page = request.args.get('page', 1, type=int)
     per_page = 10
@@ -155,26 +1611,19 @@ def listar_projetos():
     situacao = request.args.get('situacao', '')
     search = request.args.get('search', '')
     
-    # Query base
-    query = Projeto.query
+    query, ordenacao = filtrar_projetos(Projeto.query, request.args)
     
-    # Aplicar filtros
-    if situacao:
-        query = query.filter(Projeto.situacao_projeto == situacao)
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            db.or_(
-                Projeto.codigo_projeto.ilike(search_term),
-                Projeto.nome_projeto.ilike(search_term)
-            )
-        )
-    
-    # Ordenar por data de última atualização (nulls last)
-    query = query.order_by(Projeto.data_ultima_atualizacao.desc().nullslast())
-    
-    # Paginação
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    if app.config['PAGINACAO_CURSOR']:
+        total = total_por_contadores('projeto_situacao', [
+            (('projeto_situacao', situacao), situacao),
+            (None, search),
+        ])
+        pagination = paginar_por_cursor(query, ordenacao, per_page, request.args.get('cursor'), total)
+    else:
+        query = query.order_by(*criterios_ordenacao(ordenacao))
+        
+        # Paginação
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     projetos = pagination.items
     
     return render_template('projetos.html', 
@@ -200,6 +1649,7 @@ def criar_projeto():
             
             db.session.add(projeto)
             db.session.commit()
+            invalidar_cache_dashboard()
             flash('Projeto criado com sucesso!', 'success')
             return redirect(url_for('listar_projetos'))
         except Exception as e:
@@ -225,6 +1675,7 @@ def editar_projeto(id):
         
         try:
             db.session.commit()
+            invalidar_cache_dashboard()
             flash('Projeto atualizado com sucesso!', 'success')
             return redirect(url_for('listar_projetos'))
         except Exception as e:
@@ -239,8 +1690,10 @@ def excluir_projeto(id):
     projeto = Projeto.query.get_or_404(id)
     
     try:
-        db.session.delete(projeto)
+        excluir_logicamente(projeto)
         db.session.commit()
+        invalidar_cache_dashboard()
+        agendar_purga()
         flash('Projeto excluído com sucesso!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -248,43 +1701,90 @@ def excluir_projeto(id):
     
     return redirect(url_for('listar_projetos'))
 
+# Linhas por página das listas de tarefas e incidentes no detalhe do projeto
+POR_PAGINA_SUBLISTA = 20
+
+def contagens_projeto(id_projeto):
+    """Totais de tarefas e incidentes do projeto por status e por prioridade, num único comando.
+    
+    UNION ALL de dois GROUP BY (status, prioridade), cada um restrito ao projeto pelo índice
+    (id_projeto, data_criacao, id); retorna {'tarefas': {'total', 'por_status', 'por_prioridade'}, 'incidentes': ...}.
+    """
+    consultas = [
+        db.select(db.literal(nome).label('entidade'), modelo.status, modelo.prioridade, db.func.count())
+        .where(modelo.id_projeto == id_projeto).group_by(modelo.status, modelo.prioridade)
+        for nome, modelo in (('tarefas', Tarefa), ('incidentes', Incidente))
+    ]
+    contagem = {nome: {'total': 0, 'por_status': {}, 'por_prioridade': {}} for nome in ('tarefas', 'incidentes')}
+    for entidade, status, prioridade, total in db.session.execute(db.union_all(*consultas)):
+        totais = contagem[entidade]
+        totais['total'] += total
+        totais['por_status'][status] = totais['por_status'].get(status, 0) + total
+        totais['por_prioridade'][prioridade] = totais['por_prioridade'].get(prioridade, 0) + total
+    return contagem
+
 @app.route('/projetos/<int:id>')
 @login_required
+@somente_leitura
 def visualizar_projeto(id):
     projeto = Projeto.query.get_or_404(id)
-    tarefas = Tarefa.query.filter_by(id_projeto=id).order_by(Tarefa.data_criacao.desc()).all()
-    incidentes = Incidente.query.filter_by(id_projeto=id).order_by(Incidente.data_criacao.desc()).all()
     
-    return render_template('projeto_detalhes.html', projeto=projeto, tarefas=tarefas, incidentes=incidentes)
-
-@app.route('/api/dashboard/stats')
-@login_required
-def dashboard_stats():
-    # Estatísticas de Projetos
-    total_projetos = Projeto.query.count()
-    projetos_ativos = Projeto.query.filter_by(situacao_projeto='ATIVO').count()
-    projetos_concluidos = Projeto.query.filter_by(situacao_projeto='CONCLUIDO').count()
-    projetos_cancelados = Projeto.query.filter_by(situacao_projeto='CANCELADO').count()
+    contagem = contagens_projeto(id)
     
+    # Sublistas paginadas por cursor, cada uma com o seu parâmetro: o custo da página não cresce com o projeto
+    tarefas = paginar_por_cursor(
+        Tarefa.query.options(db.joinedload(Tarefa.responsavel)).filter_by(id_projeto=id),
+        [(Tarefa.data_criacao, True), (Tarefa.id_tarefa, True)], POR_PAGINA_SUBLISTA,
+        request.args.get('tarefas_cursor'), contagem['tarefas']['total'])
+    incidentes = paginar_por_cursor(
+        Incidente.query.options(db.joinedload(Incidente.criador)).filter_by(id_projeto=id),
+        [(Incidente.data_criacao, True), (Incidente.id_incidente, True)], POR_PAGINA_SUBLISTA,
+        request.args.get('incidentes_cursor'), contagem['incidentes']['total'])
+    
+    return renderizar_stream('projeto_detalhes.html', projeto=projeto, tarefas=tarefas, incidentes=incidentes,
+                             contagem=contagem)
+
+# Snapshot do dashboard compartilhado entre as requisições do processo
+_dashboard_cache = {'payload': None, 'versao': None, 'hoje': None, 'expira_em': 0.0}
+_dashboard_cache_lock = threading.Lock()
+# Acorda os streams SSE deste processo quando há escrita local
+_dashboard_alterado = threading.Condition()
+# Vagas de stream SSE deste processo; o restante das threads fica livre para as demais rotas
+_vagas_sse = threading.BoundedSemaphore(max(app.config['DASHBOARD_SSE_MAX_CONEXOES'], 1))
+
+def invalidar_cache_dashboard():
+    with _dashboard_cache_lock:
+        _dashboard_cache['payload'] = None
+        _dashboard_cache['expira_em'] = 0.0
+    with _dashboard_alterado:
+        _dashboard_alterado.notify_all()
+
+def ler_versao_dashboard(connection=None):
+    tabela = Contador.__table__
+    consulta = db.select(tabela.c.total).where(
+        tabela.c.dimensao == VERSAO_DASHBOARD[0],
+        tabela.c.valor == VERSAO_DASHBOARD[1]
+    )
+    versao = (connection or db.session).execute(consulta).scalar()
+    return versao or 0
+
+def calcular_estatisticas_dashboard():
     hoje = datetime.now(timezone).date()
+
+    # Totais por situação/status/prioridade mantidos incrementalmente na tabela de contadores
+    totais = {}
+    for contador in Contador.query.all():
+        totais.setdefault(contador.dimensao, {})[contador.valor] = contador.total
+    projetos_por_situacao = totais.get('projeto_situacao', {})
+    incidentes_por_status = totais.get('incidente_status', {})
+    incidentes_por_prioridade = totais.get('incidente_prioridade', {})
+
+    inicio_hoje = datetime.combine(hoje, datetime.min.time())
     atualizacoes_hoje = Projeto.query.filter(
-        Projeto.data_ultima_atualizacao.isnot(None),
-        db.func.date(Projeto.data_ultima_atualizacao) == hoje
+        Projeto.data_ultima_atualizacao >= inicio_hoje,
+        Projeto.data_ultima_atualizacao < inicio_hoje + timedelta(days=1)
     ).count()
-    
-    # Estatísticas de Incidentes
-    total_incidentes = Incidente.query.count()
-    incidentes_abertos = Incidente.query.filter_by(status='ABERTO').count()
-    incidentes_em_analise = Incidente.query.filter_by(status='EM_ANÁLISE').count()
-    incidentes_em_andamento = Incidente.query.filter_by(status='EM_ANDAMENTO').count()
-    incidentes_resolvidos = Incidente.query.filter_by(status='RESOLVIDO').count()
-    incidentes_fechados = Incidente.query.filter_by(status='FECHADO').count()
-    
-    # Incidentes por Prioridade
-    incidentes_alta = Incidente.query.filter_by(prioridade='ALTA').count()
-    incidentes_media = Incidente.query.filter_by(prioridade='MÉDIA').count()
-    incidentes_baixa = Incidente.query.filter_by(prioridade='BAIXA').count()
-    
+
     # Últimos Projetos
     ultimos_projetos = Projeto.query.order_by(Projeto.data_ultima_atualizacao.desc().nullslast()).limit(5).all()
     projetos_recentes = []
@@ -297,7 +1797,7 @@ def dashboard_stats():
         })
     
     # Últimos Incidentes
-    ultimos_incidentes = Incidente.query.order_by(Incidente.data_ultima_atualizacao.desc().nullslast()).limit(5).all()
+    ultimos_incidentes = Incidente.query.options(db.joinedload(Incidente.projeto)).order_by(Incidente.data_ultima_atualizacao.desc().nullslast()).limit(5).all()
     incidentes_recentes = []
     for incidente in ultimos_incidentes:
         incidentes_recentes.append({
@@ -310,29 +1810,99 @@ def dashboard_stats():
             'data_ultima_atualizacao': incidente.data_ultima_atualizacao
         })
     
-    return jsonify({
+    return {
         # Estatísticas de Projetos
-        'total_projetos': total_projetos,
-        'projetos_ativos': projetos_ativos,
-        'projetos_concluidos': projetos_concluidos,
-        'projetos_cancelados': projetos_cancelados,
+        'total_projetos': sum(projetos_por_situacao.values()),
+        'projetos_ativos': projetos_por_situacao.get('ATIVO', 0),
+        'projetos_concluidos': projetos_por_situacao.get('CONCLUIDO', 0),
+        'projetos_cancelados': projetos_por_situacao.get('CANCELADO', 0),
         'atualizacoes_hoje': atualizacoes_hoje,
         
         # Estatísticas de Incidentes
-        'total_incidentes': total_incidentes,
-        'incidentes_abertos': incidentes_abertos,
-        'incidentes_em_analise': incidentes_em_analise,
-        'incidentes_em_andamento': incidentes_em_andamento,
-        'incidentes_resolvidos': incidentes_resolvidos,
-        'incidentes_fechados': incidentes_fechados,
-        'incidentes_alta': incidentes_alta,
-        'incidentes_media': incidentes_media,
-        'incidentes_baixa': incidentes_baixa,
+        'total_incidentes': sum(incidentes_por_status.values()),
+        'incidentes_abertos': incidentes_por_status.get('ABERTO', 0),
+        'incidentes_em_analise': incidentes_por_status.get('EM_ANÁLISE', 0),
+        'incidentes_em_andamento': incidentes_por_status.get('EM_ANDAMENTO', 0),
+        'incidentes_resolvidos': incidentes_por_status.get('RESOLVIDO', 0),
+        'incidentes_fechados': incidentes_por_status.get('FECHADO', 0),
+        'incidentes_alta': incidentes_por_prioridade.get('ALTA', 0),
+        'incidentes_media': incidentes_por_prioridade.get('MÉDIA', 0),
+        'incidentes_baixa': incidentes_por_prioridade.get('BAIXA', 0),
         
         # Listas Recentes
         'ultimos_projetos': projetos_recentes,
         'ultimos_incidentes': incidentes_recentes
-    })
+    }
+
+@app.route('/api/dashboard/stats')
+@login_required
+@somente_leitura
+def dashboard_stats():
+    ttl = app.config['DASHBOARD_CACHE_TTL']
+    agora = time.monotonic()
+    hoje = datetime.now(timezone).date()
+    with _dashboard_cache_lock:
+        snapshot = _dashboard_cache
+        # Dentro do TTL o snapshot é servido sem consultar o banco; depois disso,
+        # só é recalculado se a versão gravada pelas escritas tiver mudado
+        if snapshot['payload'] is None or agora >= snapshot['expira_em'] or snapshot['hoje'] != hoje:
+            versao = ler_versao_dashboard()
+            if snapshot['payload'] is None or snapshot['versao'] != versao or snapshot['hoje'] != hoje:
+                payload = calcular_estatisticas_dashboard()
+            else:
+                payload = snapshot['payload']
+            if ttl > 0:
+                snapshot.update(payload=payload, versao=versao, hoje=hoje, expira_em=agora + ttl)
+        else:
+            payload, versao = snapshot['payload'], snapshot['versao']
+    
+    # ETag derivado da versão: clientes que já têm os dados recebem 304
+    etag = f'{versao}-{hoje.isoformat()}'
+    if request.if_none_match.contains_weak(etag):
+        resposta = app.response_class(status=304, mimetype='application/json')
+    else:
+        resposta = jsonify(payload)
+    resposta.set_etag(etag)
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta
+
+@app.route('/api/dashboard/eventos')
+@login_required
+@somente_leitura
+def dashboard_eventos():
+    # 204: o EventSource para de reconectar e a página recorre à consulta periódica com ETag
+    if app.config['DASHBOARD_SSE_MAX_CONEXOES'] <= 0 or not _vagas_sse.acquire(blocking=False):
+        return app.response_class(status=204)
+    intervalo = app.config['DASHBOARD_SSE_INTERVALO']
+    duracao = app.config['DASHBOARD_SSE_DURACAO']
+    ultimo_id = request.headers.get('Last-Event-ID', '')
+    
+    def gerar():
+        # Conexões curtas para não manter uma transação aberta durante o stream
+        with engine_consultas().connect() as conn:
+            versao = ler_versao_dashboard(conn)
+        # Reconexão: avisar imediatamente se algo mudou enquanto o cliente esteve fora
+        if ultimo_id and ultimo_id != str(versao):
+            yield f'id: {versao}\nevent: atualizacao\ndata: {json.dumps({"versao": versao})}\n\n'
+        yield f'id: {versao}\nretry: 5000\n\n'
+        
+        fim = time.monotonic() + duracao
+        while time.monotonic() < fim:
+            with _dashboard_alterado:
+                _dashboard_alterado.wait(timeout=intervalo)
+            with engine_consultas().connect() as conn:
+                atual = ler_versao_dashboard(conn)
+            if atual != versao:
+                versao = atual
+                yield f'id: {versao}\nevent: atualizacao\ndata: {json.dumps({"versao": versao})}\n\n'
+            else:
+                yield ': ping\n\n'
+    
+    resposta = Response(stream_with_context(gerar()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # close() é chamado pelo servidor ao fim do stream ou na desconexão, mesmo sem o gerador ter começado
+    resposta.call_on_close(_vagas_sse.release)
+    return resposta
 
 @app.route('/criar-admin', methods=['GET', 'POST'])
 def criar_admin():
@@ -354,7 +1924,7 @@ def criar_admin():
                 login='admin',
                 nome_completo='Administrador do Sistema',
                 email='admin@portalprojetos.com',
-                senha=generate_password_hash('admin123'),
+                senha=gerar_hash_senha('admin123'),
                 status='ATIVO'
             )
             db.session.add(admin)
@@ -367,38 +1937,52 @@ def criar_admin():
     
     return render_template('criar_admin.html')
 
+def filtrar_incidentes(query, args):
+    """Aplica os filtros da listagem de incidentes; devolve a query e a ordenação."""
+    status = args.get('status', '')
+    prioridade = args.get('prioridade', '')
+    busca = args.get('busca', '')
+
+    if status:
+        query = query.filter(Incidente.status == status)
+    
+    if prioridade:
+        query = query.filter(Incidente.prioridade == prioridade)
+    
+    ordenacao = [(Incidente.data_criacao, True), (Incidente.id_incidente, True)]
+    if busca:
+        # Título, descrição ou código do projeto; com busca textual, os mais relevantes primeiro
+        query, relevancia = aplicar_busca(query, Incidente, busca)
+        if relevancia is not None:
+            ordenacao = [(relevancia, False), (Incidente.id_incidente, True)]
+    return query, ordenacao
+
 @app.route('/incidentes')
 @login_required
+@somente_leitura
 def listar_incidentes():
     page = request.args.get('page', 1, type=int)
     status = request.args.get('status', '')
     prioridade = request.args.get('prioridade', '')
     busca = request.args.get('busca', '')
 
-    query = Incidente.query
+    # Projeto exibido em cada linha: carregado no mesmo SELECT
+    query, ordenacao = filtrar_incidentes(Incidente.query.options(db.joinedload(Incidente.projeto)), request.args)
 
-    if status:
-        query = query.filter_by(status=status)
-    
-    if prioridade:
-        query = query.filter_by(prioridade=prioridade)
-    
-    if busca:
-        query = query.filter(
-            db.or_(
-                Incidente.titulo.ilike(f'%{busca}%'),
-                Incidente.descricao.ilike(f'%{busca}%'),
-                Incidente.projeto.codigo_projeto.ilike(f'%{busca}%')
-            )
+    if app.config['PAGINACAO_CURSOR']:
+        total = total_por_contadores('incidente_status', [
+            (('incidente_status', status), status),
+            (('incidente_prioridade', prioridade), prioridade),
+            (None, busca),
+        ])
+        pagination = paginar_por_cursor(query, ordenacao, 10, request.args.get('cursor'), total)
+    else:
+        pagination = query.order_by(*criterios_ordenacao(ordenacao)).paginate(
+            page=page,
+            per_page=10,
+            error_out=False
         )
 
-    pagination = db.paginate(
-        query.order_by(Incidente.data_criacao.desc()),
-        page=page,
-        per_page=10,
-        error_out=False
-    )
-
     return render_template('incidentes.html', incidentes=pagination.items, pagination=pagination)
 
 @app.route('/incidentes/novo', methods=['GET', 'POST'])
@@ -428,6 +2012,7 @@ def criar_incidente():
             
             db.session.add(incidente)
             db.session.commit()
+            invalidar_cache_dashboard()
             
             flash('Incidente criado com sucesso!', 'success')
             return redirect(url_for('listar_incidentes'))
@@ -437,15 +2022,12 @@ def criar_incidente():
             flash('Erro ao criar incidente: ' + str(e), 'danger')
             return redirect(url_for('criar_incidente'))
     
-    projetos = Projeto.query.all()
-    
     # Pré-selecionar projeto se fornecido via query parameter
-    projeto_selecionado = request.args.get('projeto', '')
+    projeto_atual = referencia_selecionada('projetos', request.args.get('projeto'))
     
     return render_template('incidente_form.html', 
                          titulo='Novo Incidente', 
-                         projetos=projetos,
-                         projeto_selecionado=projeto_selecionado)
+                         projeto_atual=projeto_atual)
 
 @app.route('/incidentes/<int:id>/editar', methods=['GET', 'POST'])
 @login_required
@@ -465,14 +2047,15 @@ def editar_incidente(id):
         
         try:
             db.session.commit()
+            invalidar_cache_dashboard()
             flash('Incidente atualizado com sucesso!', 'success')
             return redirect(url_for('listar_incidentes'))
         except Exception as e:
             db.session.rollback()
             flash('Erro ao atualizar incidente.', 'danger')
     
-    projetos = Projeto.query.all()
-    return render_template('incidente_form.html', titulo='Editar Incidente', incidente=incidente, projetos=projetos)
+    projeto_atual = referencia_selecionada('projetos', incidente.id_projeto)
+    return render_template('incidente_form.html', titulo='Editar Incidente', incidente=incidente, projeto_atual=projeto_atual)
 
 @app.route('/incidentes/<int:id>/excluir', methods=['POST'])
 @login_required
@@ -480,8 +2063,10 @@ def excluir_incidente(id):
     incidente = Incidente.query.get_or_404(id)
     
     try:
-        db.session.delete(incidente)
+        excluir_logicamente(incidente)
         db.session.commit()
+        invalidar_cache_dashboard()
+        agendar_purga()
         flash('Incidente excluído com sucesso!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -489,19 +2074,90 @@ def excluir_incidente(id):
     
     return redirect(url_for('listar_incidentes'))
 
+# Campos aceitos em /api/projetos?fields=...; sem o parâmetro, os três primeiros (formato anterior da API)
+CAMPOS_API_PROJETOS = OrderedDict((coluna.key, coluna) for coluna in (
+    Projeto.id_projeto, Projeto.codigo_projeto, Projeto.nome_projeto, Projeto.controle_economico,
+    Projeto.numero_iniciativa, Projeto.situacao_projeto, Projeto.data_criacao, Projeto.data_ultima_atualizacao,
+))
+LIMITE_API_PROJETOS = 1000
+
 @app.route('/api/projetos')
 @login_required
+@somente_leitura
 def api_projetos():
-    projetos = Projeto.query.order_by(Projeto.codigo_projeto).all()
-    return jsonify([{
-        'id_projeto': p.id_projeto,
-        'codigo_projeto': p.codigo_projeto,
-        'nome_projeto': p.nome_projeto
-    } for p in projetos])
+    nomes = [nome.strip() for nome in request.args.get('fields', '').split(',') if nome.strip()]
+    nomes = nomes or list(CAMPOS_API_PROJETOS)[:3]
+    invalidos = [nome for nome in nomes if nome not in CAMPOS_API_PROJETOS]
+    if invalidos:
+        return jsonify({'erro': f'Campos inválidos: {", ".join(invalidos)}'}), 400
+    limite = min(max(request.args.get('limite', 100, type=int), 1), LIMITE_API_PROJETOS)
+    # Sem limite nem cursor, a resposta continua a de antes da paginação: todos os projetos, por código
+    paginada = 'limite' in request.args or 'cursor' in request.args
+    
+    # Validador antes de qualquer listagem: a versão cobre inclusões, exclusões e importações,
+    # a data mais recente cobre as edições (ambas em O(1) pelos contadores e pelo índice).
+    # Sem Last-Modified: a data mais recente não muda numa exclusão e geraria 304 com a lista antiga
+    versao = versoes_referencia().get('projetos', 0)
+    ultima = db.session.query(db.func.max(Projeto.data_ultima_atualizacao)).scalar()
+    parametros = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    etag = f'{versao}-{ultima.isoformat() if ultima else 0}-{zlib.crc32(parametros.encode()):08x}'
+    resposta = app.response_class(mimetype='application/json')
+    resposta.set_etag(etag)
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.make_conditional(request)
+    if resposta.status_code == 304:
+        return resposta
+    
+    query, ordenacao = filtrar_projetos(db.session.query(Projeto), request.args)
+    cursor = request.args.get('cursor')
+    if cursor:
+        # Cursor da própria API (somente avanço), no mesmo formato da paginação das listagens
+        decodificado = _decodificar_cursor(cursor, ordenacao)
+        if decodificado is None or decodificado[0] != 'apos':
+            return jsonify({'erro': 'Cursor inválido.'}), 400
+        query = query.filter(_condicao_cursor(ordenacao, decodificado[1], True))
+    
+    # Apenas as colunas pedidas, mais as chaves da ordenação para montar o próximo cursor
+    campos = [CAMPOS_API_PROJETOS[nome] for nome in nomes]
+    if not paginada:
+        linhas = query.with_entities(*campos).order_by(Projeto.codigo_projeto, Projeto.id_projeto).all()
+    else:
+        chaves = [coluna.label(f'_ordem{i}') for i, (coluna, _) in enumerate(ordenacao)]
+        linhas = query.with_entities(*campos, *chaves).order_by(
+            *criterios_ordenacao(ordenacao)).limit(limite + 1).all()
+    
+    if paginada and len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo = _codificar_cursor('apos', list(linhas[-1][len(nomes):]))
+        argumentos = request.args.to_dict()
+        argumentos['cursor'] = proximo
+        resposta.headers['Link'] = f'<{url_for("api_projetos", **argumentos)}>; rel="next"'
+    total = total_por_contadores('projeto_situacao', [
+        (('projeto_situacao', request.args.get('situacao', '')), request.args.get('situacao', '')),
+        (None, request.args.get('search', '')),
+    ])
+    if total is not None:
+        resposta.headers['X-Total-Count'] = str(total)
+    
+    resposta.set_data(json.dumps(
+        [{nome: _valor_exportacao(valor) for nome, valor in zip(nomes, linha)} for linha in linhas],
+        ensure_ascii=False))
+    return resposta
+
+@app.route('/api/busca/<any(projetos, usuarios):nome>')
+@login_required
+@somente_leitura
+def buscar_referencias(nome):
+    # Alimenta os campos de busca dos formulários e filtros no lugar das listas completas
+    limite = min(max(request.args.get('limite', 10, type=int), 1), LIMITE_BUSCA_REFERENCIA)
+    rotulo = ROTULOS_REFERENCIA[nome]
+    return jsonify([{'id': registro[0], 'texto': rotulo(registro)}
+                    for registro in buscar_referencia(nome, request.args.get('q', ''), limite)])
 
 # Rotas para manutenção de usuários
 @app.route('/usuarios')
 @login_required
+@somente_leitura
 def listar_usuarios():
     page = request.args.get('page', 1, type=int)
     per_page = 10
@@ -511,8 +2167,8 @@ def listar_usuarios():
     perfil = request.args.get('perfil', '')
     search = request.args.get('search', '')
     
-    # Query base
-    query = Usuario.query
+    # Query base (perfil exibido em cada linha carregado no mesmo SELECT)
+    query = Usuario.query.options(db.joinedload(Usuario.perfil))
     
     # Aplicar filtros
     if status:
@@ -529,15 +2185,24 @@ def listar_usuarios():
             )
         )
     
-    # Ordenar por nome completo
-    query = query.order_by(Usuario.nome_completo)
-    
-    # Paginação
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    if app.config['PAGINACAO_CURSOR']:
+        # Ordenar por nome completo, com a chave primária como desempate
+        pagination = paginar_por_cursor(
+            query,
+            [(Usuario.nome_completo, False), (Usuario.id_usuario, False)],
+            per_page,
+            request.args.get('cursor')
+        )
+    else:
+        # Ordenar por nome completo
+        query = query.order_by(Usuario.nome_completo)
+        
+        # Paginação
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     usuarios = pagination.items
     
     # Buscar perfis para o filtro
-    perfis = Perfil.query.all()
+    perfis = dados_referencia('perfis')
     
     return render_template('usuarios.html', 
                          usuarios=usuarios, 
@@ -564,7 +2229,7 @@ def criar_usuario():
                 login=request.form['login'],
                 nome_completo=request.form['nome_completo'],
                 email=request.form['email'],
-                senha=generate_password_hash(request.form['senha']),
+                senha=gerar_hash_senha(request.form['senha']),
                 status=request.form['status']
             )
             
@@ -576,7 +2241,7 @@ def criar_usuario():
             db.session.rollback()
             flash('Erro ao criar usuário: ' + str(e), 'danger')
     
-    perfis = Perfil.query.all()
+    perfis = dados_referencia('perfis')
     return render_template('usuario_form.html', titulo='Novo Usuário', perfis=perfis)
 
 @app.route('/usuarios/<int:id>/editar', methods=['GET', 'POST'])
@@ -605,7 +2270,7 @@ def editar_usuario(id):
         
         # Atualizar senha apenas se foi fornecida
         if request.form['senha']:
-            usuario.senha = generate_password_hash(request.form['senha'])
+            usuario.senha = gerar_hash_senha(request.form['senha'])
         
         try:
             db.session.commit()
@@ -615,7 +2280,7 @@ def editar_usuario(id):
             db.session.rollback()
             flash('Erro ao atualizar usuário: ' + str(e), 'danger')
     
-    perfis = Perfil.query.all()
+    perfis = dados_referencia('perfis')
     return render_template('usuario_form.html', titulo='Editar Usuário', usuario=usuario, perfis=perfis)
 
 @app.route('/usuarios/<int:id>/excluir', methods=['POST'])
@@ -631,6 +2296,8 @@ def excluir_usuario(id):
     try:
         db.session.delete(usuario)
         db.session.commit()
+        if _admin_auto_login['id'] == id:
+            _admin_auto_login['id'] = None
         flash('Usuário excluído com sucesso!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -639,21 +2306,13 @@ def excluir_usuario(id):
     return redirect(url_for('listar_usuarios'))
 
 # Rotas para manutenção de tarefas
-@app.route('/tarefas')
-@login_required
-def listar_tarefas():
-    page = request.args.get('page', 1, type=int)
-    per_page = 10
-    
-    # Filtros
-    status = request.args.get('status', '')
-    prioridade = request.args.get('prioridade', '')
-    projeto = request.args.get('projeto', '')
-    responsavel = request.args.get('responsavel', '')
-    search = request.args.get('search', '')
-    
-    # Query base
-    query = Tarefa.query
+def filtrar_tarefas(query, args):
+    """Aplica os filtros da listagem de tarefas; devolve a query e a ordenação."""
+    status = args.get('status', '')
+    prioridade = args.get('prioridade', '')
+    projeto = args.get('projeto', '')
+    responsavel = args.get('responsavel', '')
+    search = args.get('search', '')
     
     # Aplicar filtros
     if status:
@@ -664,31 +2323,47 @@ def listar_tarefas():
         query = query.filter(Tarefa.id_projeto == projeto)
     if responsavel:
         query = query.filter(Tarefa.id_usuario_responsavel == responsavel)
+    
+    # Mais recentes primeiro, com a chave primária como desempate
+    ordenacao = [(Tarefa.data_criacao, True), (Tarefa.id_tarefa, True)]
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            db.or_(
-                Tarefa.titulo.ilike(search_term),
-                Tarefa.descricao.ilike(search_term)
-            )
-        )
+        query, relevancia = aplicar_busca(query, Tarefa, search)
+        if relevancia is not None:
+            # Com busca textual, as mais relevantes primeiro
+            ordenacao = [(relevancia, False), (Tarefa.id_tarefa, True)]
+    return query, ordenacao
+
+@app.route('/tarefas')
+@login_required
+@somente_leitura
+def listar_tarefas():
+    page = request.args.get('page', 1, type=int)
+    per_page = 10
     
-    # Ordenar por data de criação (mais recentes primeiro)
-    query = query.order_by(Tarefa.data_criacao.desc())
+    # Query base (projeto e responsável exibidos em cada linha carregados no mesmo SELECT)
+    query, ordenacao = filtrar_tarefas(Tarefa.query.options(
+        db.joinedload(Tarefa.projeto),
+        db.joinedload(Tarefa.responsavel)
+    ), request.args)
     
-    # Paginação
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    if app.config['PAGINACAO_CURSOR']:
+        pagination = paginar_por_cursor(query, ordenacao, per_page, request.args.get('cursor'))
+    else:
+        query = query.order_by(*criterios_ordenacao(ordenacao))
+        
+        # Paginação
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     tarefas = pagination.items
     
-    # Buscar dados para os filtros
-    projetos = Projeto.query.all()
-    usuarios = Usuario.query.filter_by(status='ATIVO').all()
+    # Filtros renderizam só a opção selecionada; as demais vêm da busca incremental
+    projeto_atual = referencia_selecionada('projetos', request.args.get('projeto'))
+    responsavel_atual = referencia_selecionada('usuarios', request.args.get('responsavel'))
     
     return render_template('tarefas.html', 
                          tarefas=tarefas, 
                          pagination=pagination,
-                         projetos=projetos,
-                         usuarios=usuarios)
+                         projeto_atual=projeto_atual,
+                         responsavel_atual=responsavel_atual)
 
 @app.route('/tarefas/novo', methods=['GET', 'POST'])
 @login_required
@@ -727,17 +2402,12 @@ def criar_tarefa():
             flash('Erro ao criar tarefa: ' + str(e), 'danger')
             return redirect(url_for('criar_tarefa'))
     
-    projetos = Projeto.query.all()
-    usuarios = Usuario.query.filter_by(status='ATIVO').all()
-    
     # Pré-selecionar projeto se fornecido via query parameter
-    projeto_selecionado = request.args.get('projeto', '')
+    projeto_atual = referencia_selecionada('projetos', request.args.get('projeto'))
     
     return render_template('tarefa_form.html', 
                          titulo='Nova Tarefa', 
-                         projetos=projetos, 
-                         usuarios=usuarios,
-                         projeto_selecionado=projeto_selecionado)
+                         projeto_atual=projeto_atual)
 
 @app.route('/tarefas/<int:id>/editar', methods=['GET', 'POST'])
 @login_required
@@ -774,9 +2444,10 @@ def editar_tarefa(id):
             db.session.rollback()
             flash('Erro ao atualizar tarefa.', 'danger')
     
-    projetos = Projeto.query.all()
-    usuarios = Usuario.query.filter_by(status='ATIVO').all()
-    return render_template('tarefa_form.html', titulo='Editar Tarefa', tarefa=tarefa, projetos=projetos, usuarios=usuarios)
+    projeto_atual = referencia_selecionada('projetos', tarefa.id_projeto)
+    responsavel_atual = referencia_selecionada('usuarios', tarefa.id_usuario_responsavel)
+    return render_template('tarefa_form.html', titulo='Editar Tarefa', tarefa=tarefa,
+                         projeto_atual=projeto_atual, responsavel_atual=responsavel_atual)
 
 @app.route('/tarefas/<int:id>/excluir', methods=['POST'])
 @login_required
@@ -784,8 +2455,9 @@ def excluir_tarefa(id):
     tarefa = Tarefa.query.get_or_404(id)
     
     try:
-        db.session.delete(tarefa)
+        excluir_logicamente(tarefa)
         db.session.commit()
+        agendar_purga()
         flash('Tarefa excluída com sucesso!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -793,10 +2465,413 @@ def excluir_tarefa(id):
     
     return redirect(url_for('listar_tarefas'))
 
+# Importação em lote (CSV ou NDJSON) de projetos, tarefas e incidentes
+SITUACOES_PROJETO = ('ATIVO', 'CONCLUIDO', 'CANCELADO')
+STATUS_TAREFA = ('PENDENTE', 'EM_ANDAMENTO', 'CONCLUIDA', 'CANCELADA')
+STATUS_INCIDENTE = ('ABERTO', 'EM_ANÁLISE', 'EM_ANDAMENTO', 'RESOLVIDO', 'FECHADO')
+PRIORIDADES = ('ALTA', 'MÉDIA', 'BAIXA')
+
+class ErroImportacao(ValueError):
+    pass
+
+def verificar_codificacao(arquivo, tamanho_bloco=1 << 20):
+    """Confere, em blocos, que o arquivo inteiro é UTF-8 antes de qualquer lote ser gravado; volta ao início."""
+    decodificador = codecs.getincrementaldecoder('utf-8-sig')()
+    linha = 1
+    while True:
+        bloco = arquivo.read(tamanho_bloco)
+        try:
+            decodificador.decode(bloco, final=not bloco)
+        except UnicodeDecodeError as e:
+            linha += bloco.count(b'\n', 0, max(e.start, 0))
+            raise ErroImportacao(f'o arquivo não está em UTF-8 (linha {linha}); salve-o como UTF-8 e envie novamente')
+        if not bloco:
+            break
+        linha += bloco.count(b'\n')
+    arquivo.seek(0)
+
+def ler_linhas_importacao(arquivo, formato):
+    """Gera (número da linha, registro) sem carregar o arquivo inteiro em memória."""
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    if formato == 'csv':
+        leitor = csv.DictReader(texto)
+        for registro in leitor:
+            yield leitor.line_num, registro
+    else:
+        for numero, linha in enumerate(texto, start=1):
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError as e:
+                yield numero, ErroImportacao(f'JSON inválido: {e}')
+                continue
+            yield numero, registro if isinstance(registro, dict) else ErroImportacao('a linha deve ser um objeto JSON')
+
+def _texto(registro, campo, obrigatorio=True, tamanho=None, opcoes=None, padrao=None):
+    valor = registro.get(campo)
+    if isinstance(valor, (list, dict)):
+        raise ErroImportacao(f'o campo {campo} deve ser um valor simples, não uma lista ou objeto')
+    valor = str(valor).strip() if valor not in (None, '') else ''
+    if not valor:
+        if obrigatorio and padrao is None:
+            raise ErroImportacao(f'o campo {campo} é obrigatório')
+        return padrao
+    if tamanho and len(valor) > tamanho:
+        raise ErroImportacao(f'o campo {campo} excede {tamanho} caracteres')
+    if opcoes and valor not in opcoes:
+        raise ErroImportacao(f'valor inválido para {campo}: {valor}')
+    return valor
+
+def _data(registro, campo, formato=None):
+    valor = registro.get(campo)
+    if valor in (None, ''):
+        return None
+    try:
+        if formato:
+            return datetime.strptime(str(valor), formato).date()
+        data = datetime.fromisoformat(str(valor))
+    except ValueError:
+        raise ErroImportacao(f'data inválida em {campo}: {valor}')
+    # As colunas guardam o horário local sem fuso: um horário com fuso é convertido para o da aplicação
+    if data.tzinfo is not None:
+        data = data.astimezone(timezone).replace(tzinfo=None)
+    return data
+
+class ContextoImportacao:
+    """Consultas de apoio (projetos e usuários referenciados) resolvidas uma vez por lote."""
+    
+    def __init__(self, id_usuario):
+        self.id_usuario = id_usuario
+        self.agora = datetime.now(timezone)
+        self.projetos = {}
+        self.ids_projeto = set()
+        self.usuarios = {}
+        self.ids_usuario = set()
+        self.codigos_vistos = set()
+    
+    def carregar(self, registros):
+        codigos = {str(r.get('codigo_projeto')).strip() for r in registros if r.get('codigo_projeto')}
+        ids = {str(r.get('id_projeto')) for r in registros if r.get('id_projeto')}
+        logins = {str(r.get('login_responsavel')).strip() for r in registros if r.get('login_responsavel')}
+        ids_usuario = {str(r.get('id_usuario_responsavel')) for r in registros if r.get('id_usuario_responsavel')}
+        
+        codigos -= set(self.projetos)
+        if codigos:
+            self.projetos.update(db.session.query(Projeto.codigo_projeto, Projeto.id_projeto)
+                                 .filter(Projeto.codigo_projeto.in_(codigos)).all())
+        ids = {int(i) for i in ids if i.isdigit()} - self.ids_projeto
+        if ids:
+            self.ids_projeto.update(i for (i,) in db.session.query(Projeto.id_projeto)
+                                    .filter(Projeto.id_projeto.in_(ids)).all())
+        logins -= set(self.usuarios)
+        if logins:
+            self.usuarios.update(db.session.query(Usuario.login, Usuario.id_usuario)
+                                 .filter(Usuario.login.in_(logins)).all())
+        ids_usuario = {int(i) for i in ids_usuario if i.isdigit()} - self.ids_usuario
+        if ids_usuario:
+            self.ids_usuario.update(i for (i,) in db.session.query(Usuario.id_usuario)
+                                    .filter(Usuario.id_usuario.in_(ids_usuario)).all())
+    
+    def id_projeto(self, registro):
+        if registro.get('id_projeto'):
+            valor = _texto(registro, 'id_projeto')
+            if not valor.isdigit() or int(valor) not in self.ids_projeto:
+                raise ErroImportacao(f'projeto inexistente: {valor}')
+            return int(valor)
+        codigo = _texto(registro, 'codigo_projeto')
+        if codigo not in self.projetos:
+            raise ErroImportacao(f'projeto inexistente: {codigo}')
+        return self.projetos[codigo]
+    
+    def id_responsavel(self, registro):
+        if registro.get('id_usuario_responsavel'):
+            valor = _texto(registro, 'id_usuario_responsavel')
+            if not valor.isdigit() or int(valor) not in self.ids_usuario:
+                raise ErroImportacao(f'usuário inexistente: {valor}')
+            return int(valor)
+        login = _texto(registro, 'login_responsavel', obrigatorio=False)
+        if login is None:
+            return None
+        if login not in self.usuarios:
+            raise ErroImportacao(f'usuário inexistente: {login}')
+        return self.usuarios[login]
+
+def _validar_projeto(registro, ctx):
+    codigo = _texto(registro, 'codigo_projeto', tamanho=10)
+    if codigo in ctx.projetos or codigo in ctx.codigos_vistos:
+        raise ErroImportacao(f'código de projeto já existe: {codigo}')
+    ctx.codigos_vistos.add(codigo)
+    return {
+        'codigo_projeto': codigo,
+        'nome_projeto': _texto(registro, 'nome_projeto', tamanho=100),
+        'controle_economico': _texto(registro, 'controle_economico', tamanho=50),
+        'numero_iniciativa': _texto(registro, 'numero_iniciativa', tamanho=50),
+        'situacao_projeto': _texto(registro, 'situacao_projeto', opcoes=SITUACOES_PROJETO),
+        'id_usuario_criacao': ctx.id_usuario,
+        'id_usuario_ultima_atualizacao': ctx.id_usuario,
+        'data_criacao': _data(registro, 'data_criacao') or ctx.agora,
+        'data_ultima_atualizacao': _data(registro, 'data_ultima_atualizacao') or ctx.agora,
+    }
+
+def _validar_tarefa(registro, ctx):
+    status = _texto(registro, 'status', opcoes=STATUS_TAREFA, padrao='PENDENTE')
+    return {
+        'id_projeto': ctx.id_projeto(registro),
+        'id_usuario_responsavel': ctx.id_responsavel(registro),
+        'titulo': _texto(registro, 'titulo', tamanho=200),
+        'descricao': _texto(registro, 'descricao'),
+        'prioridade': _texto(registro, 'prioridade', opcoes=PRIORIDADES),
+        'status': status,
+        'id_usuario_criacao': ctx.id_usuario,
+        'id_usuario_ultima_atualizacao': ctx.id_usuario,
+        'data_criacao': _data(registro, 'data_criacao') or ctx.agora,
+        'data_ultima_atualizacao': _data(registro, 'data_ultima_atualizacao') or ctx.agora,
+        'data_limite': _data(registro, 'data_limite', '%Y-%m-%d'),
+        'data_conclusao': _data(registro, 'data_conclusao') or (ctx.agora if status == 'CONCLUIDA' else None),
+    }
+
+def _validar_incidente(registro, ctx):
+    status = _texto(registro, 'status', opcoes=STATUS_INCIDENTE, padrao='ABERTO')
+    return {
+        'id_projeto': ctx.id_projeto(registro),
+        'titulo': _texto(registro, 'titulo', tamanho=200),
+        'descricao': _texto(registro, 'descricao'),
+        'prioridade': _texto(registro, 'prioridade', opcoes=PRIORIDADES),
+        'status': status,
+        'id_usuario_criacao': ctx.id_usuario,
+        'id_usuario_ultima_atualizacao': ctx.id_usuario,
+        'data_criacao': _data(registro, 'data_criacao') or ctx.agora,
+        'data_ultima_atualizacao': _data(registro, 'data_ultima_atualizacao') or ctx.agora,
+        'data_resolucao': _data(registro, 'data_resolucao') or (ctx.agora if status in ('RESOLVIDO', 'FECHADO') else None),
+    }
+
+IMPORTADORES = {
+    'projetos': (Projeto, _validar_projeto),
+    'tarefas': (Tarefa, _validar_tarefa),
+    'incidentes': (Incidente, _validar_incidente),
+}
+
+def _deltas_importacao(modelo, valores):
+    # O INSERT em lote não passa pelo flush do ORM: contadores e versão do dashboard são ajustados aqui
+    deltas = {}
+    for dimensao, (modelo_contador, atributo) in DIMENSOES_CONTADORES.items():
+        if modelo_contador is modelo:
+            for registro in valores:
+                chave = (dimensao, registro[atributo])
+                deltas[chave] = deltas.get(chave, 0) + 1
+    if modelo in (Projeto, Incidente) and valores:
+        deltas[VERSAO_DASHBOARD] = 1
+    if modelo is Projeto and valores:
+        deltas[('versao', 'projetos')] = 1
+    return deltas
+
+def _inserir_lote(modelo, validos, relatorio):
+    try:
+        db.session.execute(db.insert(modelo), [valores for _, valores in validos])
+        aplicar_deltas_contadores(db.session.connection(), _deltas_importacao(modelo, [v for _, v in validos]))
+        db.session.commit()
+        relatorio['inseridos'] += len(validos)
+        return
+    except Exception:
+        db.session.rollback()
+    
+    # Algum registro foi recusado pelo banco: repetir um a um para isolar os erros
+    for numero, valores in validos:
+        try:
+            db.session.execute(db.insert(modelo), [valores])
+            aplicar_deltas_contadores(db.session.connection(), _deltas_importacao(modelo, [valores]))
+            db.session.commit()
+            relatorio['inseridos'] += 1
+        except Exception as e:
+            db.session.rollback()
+            _registrar_erro(relatorio, numero, str(getattr(e, 'orig', e)))
+
+def _registrar_erro(relatorio, numero, mensagem):
+    relatorio['total_erros'] += 1
+    if len(relatorio['erros']) < 1000:
+        relatorio['erros'].append({'linha': numero, 'erro': mensagem})
+
+def importar_registros(entidade, linhas, id_usuario, tamanho_lote=None):
+    """Valida e insere `linhas` ((número, registro)) em lotes; erros por linha não interrompem o arquivo."""
+    modelo, validar = IMPORTADORES[entidade]
+    tamanho_lote = tamanho_lote or app.config['IMPORTACAO_LOTE']
+    ctx = ContextoImportacao(id_usuario)
+    relatorio = {'linhas': 0, 'inseridos': 0, 'total_erros': 0, 'erros': []}
+    
+    def processar(lote):
+        ctx.carregar([registro for _, registro in lote if isinstance(registro, dict)])
+        validos = []
+        for numero, registro in lote:
+            try:
+                if isinstance(registro, Exception):
+                    raise registro
+                validos.append((numero, validar(registro, ctx)))
+            except ErroImportacao as e:
+                _registrar_erro(relatorio, numero, str(e))
+        if validos:
+            _inserir_lote(modelo, validos, relatorio)
+    
+    lote = []
+    for numero, registro in linhas:
+        relatorio['linhas'] += 1
+        lote.append((numero, registro))
+        if len(lote) >= tamanho_lote:
+            processar(lote)
+            lote = []
+    if lote:
+        processar(lote)
+    
+    if relatorio['inseridos'] and modelo in (Projeto, Incidente):
+        invalidar_cache_dashboard()
+    return relatorio
+
+def _formato_importacao(nome_arquivo, formato=None):
+    formato = (formato or os.path.splitext(nome_arquivo or '')[1].lstrip('.')).lower()
+    if formato in ('ndjson', 'jsonl', 'json'):
+        return 'ndjson'
+    if formato == 'csv':
+        return 'csv'
+    return None
+
+@app.route('/importar/<entidade>', methods=['POST'])
+@login_required
+def importar(entidade):
+    if entidade not in IMPORTADORES:
+        return jsonify({'erro': f'Entidade inválida: {entidade}'}), 404
+    arquivo = request.files.get('arquivo')
+    if not arquivo:
+        return jsonify({'erro': 'Envie o arquivo no campo "arquivo".'}), 400
+    formato = _formato_importacao(arquivo.filename, request.form.get('formato'))
+    if not formato:
+        return jsonify({'erro': 'Formato não suportado. Use CSV ou NDJSON.'}), 400
+    
+    try:
+        verificar_codificacao(arquivo.stream)
+    except ErroImportacao as e:
+        return jsonify({'erro': str(e)}), 400
+    
+    tamanho_lote = request.form.get('lote', type=int)
+    relatorio = importar_registros(entidade, ler_linhas_importacao(arquivo.stream, formato),
+                                   current_user.id_usuario, tamanho_lote)
+    return jsonify(relatorio)
+
+@app.cli.command('importar')
+@click.argument('entidade', type=click.Choice(sorted(IMPORTADORES)))
+@click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--formato', type=click.Choice(['csv', 'ndjson']), help='Padrão: pela extensão do arquivo.')
+@click.option('--lote', type=int, help='Registros por transação (padrão: IMPORTACAO_LOTE).')
+@click.option('--usuario', default='admin', show_default=True, help='Login gravado como criador dos registros.')
+def importar_comando(entidade, arquivo, formato, lote, usuario):
+    """Importa projetos, tarefas ou incidentes de um arquivo CSV ou NDJSON."""
+    formato = _formato_importacao(arquivo, formato)
+    if not formato:
+        raise click.UsageError('Formato não suportado. Use CSV ou NDJSON.')
+    id_usuario = db.session.query(Usuario.id_usuario).filter_by(login=usuario).scalar()
+    if id_usuario is None:
+        raise click.UsageError(f'Usuário inexistente: {usuario}')
+    
+    inicio = time.perf_counter()
+    with open(arquivo, 'rb') as f:
+        try:
+            verificar_codificacao(f)
+        except ErroImportacao as e:
+            raise click.ClickException(str(e))
+        relatorio = importar_registros(entidade, ler_linhas_importacao(f, formato), id_usuario, lote)
+    duracao = time.perf_counter() - inicio
+    
+    for erro in relatorio['erros']:
+        print(f"Linha {erro['linha']}: {erro['erro']}")
+    print(f"{relatorio['inseridos']} de {relatorio['linhas']} registro(s) importado(s) em {duracao:.1f}s; "
+          f"{relatorio['total_erros']} erro(s).")
+    if relatorio['total_erros']:
+        sys.exit(1)
+
+# Exportação das listagens filtradas (CSV ou NDJSON) em streaming
+def _consulta_exportacao(entidade):
+    # Apenas colunas (sem montar objetos do ORM), com os mesmos nomes de campo aceitos pela importação
+    if entidade == 'projetos':
+        query = db.session.query(
+            Projeto.id_projeto, Projeto.codigo_projeto, Projeto.nome_projeto, Projeto.controle_economico,
+            Projeto.numero_iniciativa, Projeto.situacao_projeto, Projeto.data_criacao,
+            Projeto.data_ultima_atualizacao
+        )
+        return filtrar_projetos(query, request.args)
+    
+    projeto = db.aliased(Projeto)
+    if entidade == 'tarefas':
+        responsavel = db.aliased(Usuario)
+        query = db.session.query(
+            Tarefa.id_tarefa, projeto.codigo_projeto, Tarefa.titulo, Tarefa.descricao, Tarefa.prioridade,
+            Tarefa.status, responsavel.login.label('login_responsavel'), Tarefa.data_criacao,
+            Tarefa.data_ultima_atualizacao, Tarefa.data_limite, Tarefa.data_conclusao
+        ).select_from(Tarefa).join(projeto, projeto.id_projeto == Tarefa.id_projeto).outerjoin(
+            responsavel, responsavel.id_usuario == Tarefa.id_usuario_responsavel
+        )
+        return filtrar_tarefas(query, request.args)
+    
+    query = db.session.query(
+        Incidente.id_incidente, projeto.codigo_projeto, Incidente.titulo, Incidente.descricao,
+        Incidente.prioridade, Incidente.status, Incidente.data_criacao, Incidente.data_ultima_atualizacao,
+        Incidente.data_resolucao
+    ).select_from(Incidente).join(projeto, projeto.id_projeto == Incidente.id_projeto)
+    return filtrar_incidentes(query, request.args)
+
+def _valor_exportacao(valor):
+    return valor.isoformat() if hasattr(valor, 'isoformat') else valor
+
+@app.route('/exportar/<entidade>')
+@login_required
+@somente_leitura
+def exportar(entidade):
+    if entidade not in ('projetos', 'tarefas', 'incidentes'):
+        return jsonify({'erro': f'Entidade inválida: {entidade}'}), 404
+    formato = request.args.get('formato', 'csv')
+    if formato not in ('csv', 'ndjson'):
+        return jsonify({'erro': 'Formato não suportado. Use csv ou ndjson.'}), 400
+    
+    query, ordenacao = _consulta_exportacao(entidade)
+    query = query.order_by(*criterios_ordenacao(ordenacao))
+    nomes = [coluna['name'] for coluna in query.column_descriptions]
+    lote = app.config['EXPORTACAO_LOTE']
+    
+    def gerar():
+        # Cabeçalho enviado antes da consulta; as linhas chegam do cursor em blocos de `lote`
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        if formato == 'csv':
+            escritor.writerow(nomes)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        for numero, linha in enumerate(query.yield_per(lote), start=1):
+            valores = [_valor_exportacao(valor) for valor in linha]
+            if formato == 'csv':
+                escritor.writerow(valores)
+            else:
+                buffer.write(json.dumps(dict(zip(nomes, valores)), ensure_ascii=False))
+                buffer.write('\n')
+            if numero % lote == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    if formato == 'csv':
+        mimetype, extensao = 'text/csv', 'csv'
+    else:
+        mimetype, extensao = 'application/x-ndjson', 'ndjson'
+    nome_arquivo = f'{entidade}_{datetime.now(timezone):%Y%m%d_%H%M%S}.{extensao}'
+    return Response(stream_with_context(gerar()), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{nome_arquivo}"'})
+
 if __name__ == '__main__':
     with app.app_context():
+        # Bancos existentes: colunas e índices novos vêm das migrações (create_all não altera tabelas)
+        upgrade(directory=os.path.join(app.root_path, 'migrations'))
         # Criar o banco de dados
         db.create_all()
+        reconstruir_contadores()
         
         # Criar perfis padrão se não existirem
         if not Perfil.query.first():
@@ -813,10 +2888,13 @@ if __name__ == '__main__':
                 login='admin',
                 nome_completo='Administrador do Sistema',
                 email='admin@sistema.com',
-                senha=generate_password_hash('admin'),
+                senha=gerar_hash_senha('admin'),
                 status='ATIVO'
             )
             db.session.add(admin)
             db.session.commit()
     
+    # Em desenvolvimento toda requisição é cronometrada (Server-Timing no DevTools), salvo escolha explícita
+    if 'INSTRUMENTACAO_AMOSTRAGEM' not in os.environ:
+        app.config['INSTRUMENTACAO_AMOSTRAGEM'] = 1.0
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""Benchmark das rotas principais contra um banco semeado em volume.
+
+    python benchmarks/benchmark_rotas.py                                  # mede e compara com a baseline
+    python benchmarks/benchmark_rotas.py --gravar-baseline                # regrava a baseline
+    python benchmarks/benchmark_rotas.py --tarefas 1000000 --sem-baseline # volume de produção, só relatório
+
+Cada rota é chamada pelo cliente de teste do Flask sobre uma cópia do banco semeado (as rotas de escrita
+alteram os dados). Para cada rota são medidos p50/p95/p99 de latência, comandos SQL por requisição e o
+pico de memória (RSS) do processo. A execução falha (código 1) quando alguma rota fica mais lenta que a
+baseline além da tolerância ou passa a executar mais comandos SQL.
+
+Latências só são comparáveis na mesma máquina: a baseline não é versionada. Grave-a localmente antes de uma
+mudança; o CI a mede no commit base, no mesmo job.
+"""
+import json
+import os
+import random
+import resource
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PADRAO = os.path.join(RAIZ, 'benchmarks', 'baseline.json')
+
+
+def percentis(amostras):
+    cortes = statistics.quantiles(amostras, n=100, method='inclusive')
+    return {'p50': cortes[49], 'p95': cortes[94], 'p99': cortes[98]}
+
+
+def pico_rss_mb():
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def definir_rotas(rng, ids_projetos, ids_usuarios, ids_tarefas, ids_incidentes):
+    """(nome, método, url, dados) gerados a cada iteração; as escolhas dependem só da semente."""
+    sequencia = iter(range(1, 10 ** 9))
+
+    def usuario():
+        return str(rng.choice(ids_usuarios))
+
+    def formulario_tarefa():
+        return {'titulo': 'Benchmark de tarefa', 'descricao': 'Criada pelo benchmark', 'prioridade': 'MÉDIA',
+                'status': rng.choice(['PENDENTE', 'EM_ANDAMENTO', 'CONCLUIDA']),
+                'id_projeto': str(rng.choice(ids_projetos)), 'id_usuario_responsavel': usuario(),
+                'data_limite': '2030-01-31'}
+
+    def formulario_incidente():
+        return {'titulo': 'Benchmark de incidente', 'descricao': 'Criado pelo benchmark', 'prioridade': 'ALTA',
+                'status': rng.choice(['ABERTO', 'EM_ANDAMENTO', 'RESOLVIDO']),
+                'id_projeto': str(rng.choice(ids_projetos))}
+
+    def formulario_projeto():
+        return {'codigo_projeto': f'BM{next(sequencia):07d}', 'nome_projeto': 'Projeto do benchmark',
+                'controle_economico': 'CE-0001', 'numero_iniciativa': 'INI-0001',
+                'situacao_projeto': rng.choice(['ATIVO', 'CONCLUIDO'])}
+
+    return [
+        ('listar_projetos', lambda: ('GET', '/projetos', None)),
+        ('listar_projetos_filtros', lambda: ('GET', '/projetos?situacao=ATIVO&search=integração', None)),
+        ('listar_incidentes', lambda: ('GET', '/incidentes', None)),
+        ('listar_incidentes_filtros', lambda: ('GET', '/incidentes?status=ABERTO&prioridade=ALTA', None)),
+        ('listar_tarefas', lambda: ('GET', '/tarefas', None)),
+        ('listar_tarefas_filtros', lambda: ('GET', f'/tarefas?status=PENDENTE&responsavel={usuario()}', None)),
+        ('visualizar_projeto', lambda: ('GET', f'/projetos/{rng.choice(ids_projetos)}', None)),
+        ('dashboard_stats', lambda: ('GET', '/api/dashboard/stats', None)),
+        # Página padrão dos clientes paginados (sem limite, a API devolve todos os projetos)
+        ('api_projetos', lambda: ('GET', '/api/projetos?limite=100', None)),
+        ('buscar_projetos', lambda: ('GET', f'/api/busca/projetos?q={rng.choice(["s00", "integ", "rel", "mig"])}', None)),
+        ('criar_tarefa', lambda: ('POST', '/tarefas/novo', formulario_tarefa())),
+        ('editar_tarefa', lambda: ('POST', f'/tarefas/{rng.choice(ids_tarefas)}/editar', formulario_tarefa())),
+        ('criar_incidente', lambda: ('POST', '/incidentes/novo', formulario_incidente())),
+        ('editar_incidente', lambda: ('POST', f'/incidentes/{rng.choice(ids_incidentes)}/editar',
+                                      formulario_incidente())),
+        ('criar_projeto', lambda: ('POST', '/projetos/novo', formulario_projeto())),
+    ]
+
+
+def preparar_banco(caminho, escala, semente):
+    """Gera o banco semeado (uma vez por escala/semente) e devolve o caminho de uma cópia descartável."""
+    if not os.path.exists(caminho):
+        # Em outro processo: o app lê DATABASE_URL na importação
+        argumentos = [f'--{opcao}={valor}' for opcao, valor in escala.items()]
+        subprocess.run([sys.executable, os.path.join(RAIZ, 'gerar_dados_teste.py'), *argumentos,
+                        f'--semente={semente}', '--referencia=2026-01-01'],
+                       env={**os.environ, 'DATABASE_URL': 'sqlite:///' + caminho}, cwd=RAIZ, check=True)
+    copia = os.path.join(tempfile.mkdtemp(prefix='portal-benchmark-'), 'portal_projetos.db')
+    # API de backup em vez de copiar o arquivo: inclui as páginas que ainda estão no -wal do banco semeado
+    origem, destino = sqlite3.connect(caminho), sqlite3.connect(copia)
+    try:
+        origem.backup(destino)
+    finally:
+        origem.close()
+        destino.close()
+    # Banco semeado por uma versão anterior do esquema: aplica as migrações pendentes na cópia
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'db', 'upgrade'],
+                   env={**os.environ, 'DATABASE_URL': 'sqlite:///' + copia}, cwd=RAIZ, check=True,
+                   capture_output=True)
+    return copia
+
+
+def garantir_admin(app, db, Perfil, Usuario):
+    # Usado pelo login automático nas requisições do benchmark
+    with app.app_context():
+        if Usuario.query.filter_by(login='admin').first() is None:
+            perfil = Perfil.query.filter_by(nome='ADMIN').first() or Perfil(nome='ADMIN', descricao='Administrador')
+            db.session.add(perfil)
+            db.session.flush()
+            db.session.add(Usuario(id_perfil=perfil.id_perfil, login='admin', nome_completo='Administrador',
+                                   email='admin@benchmark.local', senha='-', status='ATIVO'))
+            db.session.commit()
+        db.session.remove()
+
+
+def medir(repeticoes, aquecimento, semente):
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app import app, db, Perfil, Projeto, Usuario, Tarefa, Incidente
+
+    garantir_admin(app, db, Perfil, Usuario)
+    consultas = [0]
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        consultas[0] += 1
+
+    with app.app_context():
+        ids = [[i for (i,) in db.session.query(coluna).order_by(coluna).all()]
+               for coluna in (Projeto.id_projeto, Usuario.id_usuario, Tarefa.id_tarefa, Incidente.id_incidente)]
+        db.session.remove()
+
+    cliente = app.test_client()
+    rng = random.Random(semente)
+    resultados = {}
+    for nome, requisicao in definir_rotas(rng, *ids):
+        tempos, totais = [], []
+        for iteracao in range(aquecimento + repeticoes):
+            metodo, url, dados = requisicao()
+            consultas[0] = 0
+            inicio = time.perf_counter()
+            resposta = cliente.open(url, method=metodo, data=dados)
+            resposta.get_data()
+            decorrido = time.perf_counter() - inicio
+            if resposta.status_code >= 400:
+                raise click.ClickException(f'{nome}: {metodo} {url} respondeu {resposta.status_code}')
+            if iteracao >= aquecimento:
+                tempos.append(decorrido * 1000)
+                totais.append(consultas[0])
+        resultados[nome] = {**{k: round(v, 2) for k, v in percentis(tempos).items()},
+                            'consultas': max(totais), 'pico_rss_mb': pico_rss_mb()}
+    event.remove(Engine, 'before_cursor_execute', contar)
+    return resultados
+
+
+def comparar(resultados, baseline, tolerancia, folga_ms):
+    regressoes = []
+    for nome, atual in resultados.items():
+        base = baseline.get('rotas', {}).get(nome)
+        if base is None:
+            continue
+        limite = base['p95'] * (1 + tolerancia) + folga_ms
+        if atual['p95'] > limite:
+            regressoes.append(f'{nome}: p95 {atual["p95"]:.1f}ms > {limite:.1f}ms (baseline {base["p95"]:.1f}ms)')
+        if atual['consultas'] > base['consultas']:
+            regressoes.append(f'{nome}: {atual["consultas"]} comandos SQL por requisição '
+                              f'(baseline {base["consultas"]})')
+    pico, pico_base = max(r['pico_rss_mb'] for r in resultados.values()), baseline.get('pico_rss_mb')
+    if pico_base and pico > pico_base * (1 + tolerancia):
+        regressoes.append(f'pico de RSS {pico:.0f}MB (baseline {pico_base:.0f}MB)')
+    return regressoes
+
+
+@click.command()
+@click.option('--projetos', default=2000, show_default=True)
+@click.option('--tarefas', default=100000, show_default=True)
+@click.option('--incidentes', default=50000, show_default=True)
+@click.option('--usuarios', default=200, show_default=True)
+@click.option('--semente', default=42, show_default=True)
+@click.option('--repeticoes', default=30, show_default=True, help='Requisições medidas por rota.')
+@click.option('--aquecimento', default=3, show_default=True, help='Requisições descartadas antes da medição.')
+@click.option('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'portal-benchmark'), show_default=True,
+              help='Onde guardar o banco semeado entre execuções.')
+@click.option('--baseline', 'caminho_baseline', default=BASELINE_PADRAO, show_default=True)
+@click.option('--gravar-baseline', is_flag=True, help='Grava os resultados como nova baseline.')
+@click.option('--sem-baseline', is_flag=True, help='Só relata, sem comparar.')
+@click.option('--tolerancia', default=float(os.environ.get('BENCHMARK_TOLERANCIA', 1.0)), show_default=True,
+              help='Aumento relativo de p95/RSS aceito em relação à baseline.')
+@click.option('--folga-ms', default=5.0, show_default=True, help='Folga absoluta no p95, contra ruído em rotas rápidas.')
+@click.option('--saida', default=None, help='Grava os resultados em JSON.')
+def benchmark(projetos, tarefas, incidentes, usuarios, semente, repeticoes, aquecimento, cache_dir,
+              caminho_baseline, gravar_baseline, sem_baseline, tolerancia, folga_ms, saida):
+    """Mede as rotas principais e compara com a baseline."""
+    escala = {'projetos': projetos, 'tarefas': tarefas, 'incidentes': incidentes, 'usuarios': usuarios}
+    os.makedirs(cache_dir, exist_ok=True)
+    semeado = os.path.join(cache_dir, 'semente-{semente}-{usuarios}-{projetos}-{tarefas}-{incidentes}.db'.format(
+        semente=semente, **escala))
+
+    # Configuração lida na importação do app: banco descartável, sem cache do dashboard e sem limite de hash
+    banco = preparar_banco(semeado, escala, semente)
+    os.environ.update({'DATABASE_URL': 'sqlite:///' + banco, 'DASHBOARD_CACHE_TTL': '0',
+                       'AUTO_LOGIN_ADMIN': '1', 'QUERY_BUDGET': '0', 'INSTRUMENTACAO_LOG': '0'})
+
+    try:
+        resultados = medir(repeticoes, aquecimento, semente)
+    finally:
+        shutil.rmtree(os.path.dirname(banco), ignore_errors=True)
+
+    click.echo(f'{"rota":28} {"p50":>9} {"p95":>9} {"p99":>9} {"SQL":>5} {"RSS":>8}')
+    for nome, r in resultados.items():
+        click.echo(f'{nome:28} {r["p50"]:>7.1f}ms {r["p95"]:>7.1f}ms {r["p99"]:>7.1f}ms '
+                   f'{r["consultas"]:>5} {r["pico_rss_mb"]:>6.0f}MB')
+
+    relatorio = {'escala': escala, 'repeticoes': repeticoes, 'rotas': resultados,
+                 'pico_rss_mb': max(r['pico_rss_mb'] for r in resultados.values())}
+    if saida:
+        with open(saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    if gravar_baseline:
+        with open(caminho_baseline, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write('\n')
+        click.echo(f'Baseline gravada em {caminho_baseline}')
+        return
+    if sem_baseline or not os.path.exists(caminho_baseline):
+        return
+
+    with open(caminho_baseline, encoding='utf-8') as arquivo:
+        baseline = json.load(arquivo)
+    if baseline.get('escala') != escala:
+        click.echo('Aviso: escala diferente da baseline; comparação ignorada.')
+        return
+    regressoes = comparar(resultados, baseline, tolerancia, folga_ms)
+    if regressoes:
+        click.echo('\nRegressões em relação à baseline:')
+        for regressao in regressoes:
+            click.echo(f'  - {regressao}')
+        sys.exit(1)
+    click.echo('\nSem regressões em relação à baseline.')
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, RAIZ)
+    os.chdir(RAIZ)
+    benchmark()
@@ -0,0 +1,256 @@
+"""Gera uma massa de dados sintética, determinística e em volume de produção.
+
+    python gerar_dados_teste.py --projetos 10000 --tarefas 1000000 --incidentes 500000 --semente 42
+
+A mesma semente e a mesma data de referência sempre produzem os mesmos registros. Os dados
+são acrescentados aos existentes (ids e códigos continuam a partir do maior id de cada tabela).
+"""
+from app import app, db, Perfil, Usuario, Projeto, Incidente, Tarefa, reconstruir_contadores, invalidar_cache_dashboard
+from app import aplicar_deltas_contadores, VERSAO_DASHBOARD
+from app import SITUACOES_PROJETO, STATUS_TAREFA, STATUS_INCIDENTE, PRIORIDADES, DDL_BUSCA
+from werkzeug.security import generate_password_hash
+from datetime import datetime, timedelta
+import itertools
+import random
+import time
+import click
+
+# Distribuições (pesos na mesma ordem das constantes do app)
+PESOS_SITUACAO = (60, 30, 10)            # ATIVO, CONCLUIDO, CANCELADO
+PESOS_STATUS_TAREFA = (25, 20, 50, 5)    # PENDENTE, EM_ANDAMENTO, CONCLUIDA, CANCELADA
+PESOS_STATUS_INCIDENTE = (12, 8, 15, 35, 30)  # ABERTO, EM_ANÁLISE, EM_ANDAMENTO, RESOLVIDO, FECHADO
+PESOS_PRIORIDADE = (20, 50, 30)          # ALTA, MÉDIA, BAIXA
+
+ACOES = ['Revisar', 'Implementar', 'Corrigir', 'Documentar', 'Testar', 'Migrar', 'Configurar', 'Otimizar',
+         'Homologar', 'Publicar', 'Validar', 'Automatizar']
+OBJETOS = ['relatório financeiro', 'integração com o ERP', 'tela de cadastro', 'rotina de backup',
+           'API de pagamentos', 'painel gerencial', 'fluxo de aprovação', 'cadastro de clientes',
+           'envio de notificações', 'controle de acesso', 'importação de planilhas', 'servidor de arquivos']
+FALHAS = ['Erro ao gerar', 'Lentidão na', 'Indisponibilidade da', 'Falha de autenticação na',
+          'Dados divergentes na', 'Timeout na', 'Tela em branco na']
+AREAS = ['Financeiro', 'Comercial', 'Logística', 'RH', 'Jurídico', 'Marketing', 'Operações', 'TI']
+NOMES = ['Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João',
+         'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Thiago', 'Vanessa', 'Yuri']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Rodrigues', 'Almeida',
+              'Nascimento', 'Carvalho', 'Ribeiro', 'Gomes', 'Martins', 'Araújo']
+
+# Triggers de inserção do índice FTS5: desligados durante a carga e compensados no final
+TRIGGERS_INSERCAO_BUSCA = ('Projetos_busca_ai', 'Incidentes_busca_ai', 'Tarefas_busca_ai')
+# Índices secundários destas tabelas são removidos na carga e recriados de uma vez (bem mais rápido
+# que mantê-los a cada inserção fora de ordem)
+TABELAS_CARGA = (Projeto, Tarefa, Incidente)
+BLOCO_SORTEIO = 10000
+
+
+def proximo_id(conn, coluna):
+    return (conn.execute(db.select(db.func.max(coluna))).scalar() or 0) + 1
+
+
+def pesos_acumulados(quantidade, expoente=0.8):
+    # Popularidade decrescente (tipo Zipf): poucos projetos/usuários concentram boa parte dos registros
+    return list(itertools.accumulate(1 / (i + 1) ** expoente for i in range(quantidade)))
+
+
+def instante(rng, referencia, dias):
+    return referencia - timedelta(seconds=rng.randrange(dias * 86400))
+
+
+def depois_de(rng, inicio, referencia):
+    return inicio + (referencia - inicio) * rng.random()
+
+
+def gerar_usuarios(rng, inicio, quantidade, id_perfil, senha, referencia, dias):
+    for id_usuario in range(inicio, inicio + quantidade):
+        nome = f'{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}'
+        yield {
+            'id_usuario': id_usuario, 'id_perfil': id_perfil,
+            'login': f'sim{id_usuario:06d}', 'nome_completo': nome, 'email': f'sim{id_usuario:06d}@exemplo.com',
+            'senha': senha, 'data_criacao': instante(rng, referencia, dias),
+            'status': 'ATIVO' if rng.random() < 0.9 else 'INATIVO',
+        }
+
+
+def gerar_projetos(rng, inicio, quantidade, usuarios, referencia, dias):
+    situacoes = rng.choices(SITUACOES_PROJETO, PESOS_SITUACAO, k=quantidade)
+    for id_projeto, situacao in zip(range(inicio, inicio + quantidade), situacoes):
+        criacao = instante(rng, referencia, dias)
+        atualizado = rng.random() < 0.8
+        yield {
+            'id_projeto': id_projeto, 'id_usuario_criacao': rng.choice(usuarios),
+            'id_usuario_ultima_atualizacao': rng.choice(usuarios) if atualizado else None,
+            'codigo_projeto': f'S{id_projeto:07d}',
+            'nome_projeto': f'{rng.choice(ACOES)} {rng.choice(OBJETOS)} - {rng.choice(AREAS)}',
+            'controle_economico': f'CE-{rng.randrange(1000, 9999)}',
+            'numero_iniciativa': f'INI-{rng.randrange(100000, 999999)}',
+            'situacao_projeto': situacao, 'data_criacao': criacao,
+            'data_ultima_atualizacao': depois_de(rng, criacao, referencia) if atualizado else None,
+        }
+
+
+def gerar_tarefas(rng, inicio, quantidade, projetos, usuarios, referencia, dias):
+    acumulados_projetos = pesos_acumulados(len(projetos))
+    acumulados_usuarios = pesos_acumulados(len(usuarios))
+    for base in range(inicio, inicio + quantidade, BLOCO_SORTEIO):
+        n = min(BLOCO_SORTEIO, inicio + quantidade - base)
+        # Sorteios em bloco: uma chamada a choices() por coluna em vez de uma por linha
+        colunas = zip(
+            range(base, base + n),
+            rng.choices(STATUS_TAREFA, PESOS_STATUS_TAREFA, k=n),
+            rng.choices(PRIORIDADES, PESOS_PRIORIDADE, k=n),
+            rng.choices(projetos, cum_weights=acumulados_projetos, k=n),
+            rng.choices(usuarios, cum_weights=acumulados_usuarios, k=n),
+        )
+        for id_tarefa, status, prioridade, id_projeto, responsavel in colunas:
+            criacao = instante(rng, referencia, dias)
+            atualizacao = depois_de(rng, criacao, referencia) if status != 'PENDENTE' else None
+            acao, objeto = rng.choice(ACOES), rng.choice(OBJETOS)
+            yield {
+                'id_tarefa': id_tarefa, 'id_projeto': id_projeto,
+                'id_usuario_criacao': rng.choice(usuarios),
+                'id_usuario_ultima_atualizacao': rng.choice(usuarios) if atualizacao else None,
+                'id_usuario_responsavel': responsavel if rng.random() < 0.85 else None,
+                'titulo': f'{acao} {objeto}',
+                'descricao': f'{acao} {objeto} conforme levantamento da área {rng.choice(AREAS)}',
+                'prioridade': prioridade, 'status': status,
+                'data_criacao': criacao, 'data_ultima_atualizacao': atualizacao,
+                'data_limite': (criacao + timedelta(days=rng.randrange(3, 90))).date() if rng.random() < 0.7 else None,
+                'data_conclusao': atualizacao if status == 'CONCLUIDA' else None,
+            }
+
+
+def gerar_incidentes(rng, inicio, quantidade, projetos, usuarios, referencia, dias):
+    acumulados_projetos = pesos_acumulados(len(projetos))
+    for base in range(inicio, inicio + quantidade, BLOCO_SORTEIO):
+        n = min(BLOCO_SORTEIO, inicio + quantidade - base)
+        colunas = zip(
+            range(base, base + n),
+            rng.choices(STATUS_INCIDENTE, PESOS_STATUS_INCIDENTE, k=n),
+            rng.choices(PRIORIDADES, PESOS_PRIORIDADE, k=n),
+            rng.choices(projetos, cum_weights=acumulados_projetos, k=n),
+        )
+        for id_incidente, status, prioridade, id_projeto in colunas:
+            criacao = instante(rng, referencia, dias)
+            atualizacao = depois_de(rng, criacao, referencia) if status != 'ABERTO' else None
+            falha, objeto = rng.choice(FALHAS), rng.choice(OBJETOS)
+            yield {
+                'id_incidente': id_incidente, 'id_projeto': id_projeto,
+                'id_usuario_criacao': rng.choice(usuarios),
+                'id_usuario_ultima_atualizacao': rng.choice(usuarios) if atualizacao else None,
+                'titulo': f'{falha} {objeto}',
+                'descricao': f'{falha} {objeto} reportado pela área {rng.choice(AREAS)}',
+                'prioridade': prioridade, 'status': status,
+                'data_criacao': criacao, 'data_ultima_atualizacao': atualizacao,
+                'data_resolucao': atualizacao if status in ('RESOLVIDO', 'FECHADO') else None,
+            }
+
+
+def inserir(modelo, registros, lote):
+    total = 0
+    while True:
+        bloco = list(itertools.islice(registros, lote))
+        if not bloco:
+            return total
+        # executemany direto no driver, uma transação por lote
+        with db.engine.begin() as conn:
+            conn.execute(db.insert(modelo), bloco)
+        total += len(bloco)
+
+
+@click.command()
+@click.option('--usuarios', default=200, show_default=True, help='Usuários a criar.')
+@click.option('--projetos', default=10000, show_default=True, help='Projetos a criar.')
+@click.option('--tarefas', default=1000000, show_default=True, help='Tarefas a criar.')
+@click.option('--incidentes', default=500000, show_default=True, help='Incidentes a criar.')
+@click.option('--semente', default=42, show_default=True, help='Semente do gerador aleatório.')
+@click.option('--referencia', default=None, help='Data de referência AAAA-MM-DD (padrão: hoje).')
+@click.option('--dias', default=730, show_default=True, help='Janela de datas de criação, em dias antes da referência.')
+@click.option('--lote', default=20000, show_default=True, help='Registros inseridos por transação.')
+def gerar_dados_teste(usuarios, projetos, tarefas, incidentes, semente, referencia, dias, lote):
+    """Acrescenta usuários, projetos, tarefas e incidentes sintéticos ao banco."""
+    gerar_dados(usuarios, projetos, tarefas, incidentes, semente,
+                datetime.strptime(referencia, '%Y-%m-%d') if referencia else None, dias, lote)
+
+
+def gerar_dados(usuarios=200, projetos=10000, tarefas=1000000, incidentes=500000, semente=42,
+                referencia=None, dias=730, lote=20000):
+    rng = random.Random(semente)
+    referencia = referencia or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    with app.app_context():
+        db.create_all()
+        perfil = Perfil.query.filter_by(nome='USUARIO').first()
+        if perfil is None:
+            perfil = Perfil(nome='USUARIO', descricao='Usuário padrão')
+            db.session.add(perfil)
+            db.session.commit()
+        id_perfil = perfil.id_perfil
+        db.session.remove()
+
+        with db.engine.connect() as conn:
+            inicio = {modelo: proximo_id(conn, coluna) for modelo, coluna in [
+                (Usuario, Usuario.id_usuario), (Projeto, Projeto.id_projeto),
+                (Tarefa, Tarefa.id_tarefa), (Incidente, Incidente.id_incidente)]}
+        sqlite = db.engine.dialect.name == 'sqlite'
+        indices = [indice for modelo in TABELAS_CARGA for indice in modelo.__table__.indexes]
+        with db.engine.begin() as conn:
+            if sqlite:
+                for trigger in TRIGGERS_INSERCAO_BUSCA:
+                    conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger}')
+            for indice in indices:
+                indice.drop(conn, checkfirst=True)
+
+        comeco = time.perf_counter()
+        try:
+            # Um único hash para todos os usuários sintéticos (senha "teste123")
+            senha = generate_password_hash('teste123')
+            ids_usuarios = list(range(inicio[Usuario], inicio[Usuario] + usuarios))
+            inserir(Usuario, gerar_usuarios(rng, inicio[Usuario], usuarios, id_perfil, senha, referencia, dias), lote)
+            if not ids_usuarios:
+                ids_usuarios = [i for (i,) in db.session.query(Usuario.id_usuario).all()]
+            ids_projetos = list(range(inicio[Projeto], inicio[Projeto] + projetos))
+            inserir(Projeto, gerar_projetos(rng, inicio[Projeto], projetos, ids_usuarios, referencia, dias), lote)
+            if not ids_projetos:
+                ids_projetos = [i for (i,) in db.session.query(Projeto.id_projeto).all()]
+            db.session.remove()
+            if (tarefas or incidentes) and not (ids_projetos and ids_usuarios):
+                raise click.UsageError('Tarefas e incidentes precisam de ao menos um projeto e um usuário.')
+            inserir(Tarefa, gerar_tarefas(rng, inicio[Tarefa], tarefas, ids_projetos, ids_usuarios,
+                                          referencia, dias), lote)
+            inserir(Incidente, gerar_incidentes(rng, inicio[Incidente], incidentes, ids_projetos, ids_usuarios,
+                                                referencia, dias), lote)
+            click.echo(f'{usuarios + projetos + tarefas + incidentes} registros inseridos em '
+                       f'{time.perf_counter() - comeco:.1f}s')
+        finally:
+            with db.engine.begin() as conn:
+                for indice in indices:
+                    indice.create(conn, checkfirst=True)
+            click.echo(f'Índices recriados ({time.perf_counter() - comeco:.1f}s)')
+            if sqlite:
+                # Recria os triggers e indexa somente as linhas novas
+                with db.engine.begin() as conn:
+                    for comando in DDL_BUSCA:
+                        conn.exec_driver_sql(comando)
+                    conn.exec_driver_sql(
+                        'INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto) '
+                        'SELECT id_projeto, codigo_projeto, nome_projeto FROM Projetos WHERE id_projeto >= ?',
+                        (inicio[Projeto],))
+                    conn.exec_driver_sql(
+                        'INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto) '
+                        'SELECT i.id_incidente, i.titulo, i.descricao, p.codigo_projeto FROM Incidentes i '
+                        'LEFT JOIN Projetos p ON p.id_projeto = i.id_projeto WHERE i.id_incidente >= ?',
+                        (inicio[Incidente],))
+                    conn.exec_driver_sql(
+                        'INSERT INTO TarefasBusca(rowid, titulo, descricao) '
+                        'SELECT id_tarefa, titulo, descricao FROM Tarefas WHERE id_tarefa >= ?',
+                        (inicio[Tarefa],))
+                click.echo(f'Índice de busca atualizado ({time.perf_counter() - comeco:.1f}s)')
+            reconstruir_contadores()
+            # Outros processos recarregam o dashboard e as listas de projetos/usuários
+            with db.engine.begin() as conn:
+                aplicar_deltas_contadores(conn, {VERSAO_DASHBOARD: 1, ('versao', 'projetos'): 1, ('versao', 'usuarios'): 1})
+            invalidar_cache_dashboard()
+            click.echo(f'Contadores reconstruídos ({time.perf_counter() - comeco:.1f}s)')
+
+
+if __name__ == '__main__':
+    gerar_dados_teste()
@@ -0,0 +1,70 @@
+"""Índices compostos das listagens (filtro + ordenação)
+
+Revision ID: 4b1f0c7e2a13
+Revises: 9e4f1b6c3a27
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1f0c7e2a13'
+down_revision = '9e4f1b6c3a27'
+branch_labels = None
+depends_on = None
+
+# tabela -> [(nome do índice, colunas)]; os mesmos declarados em __table_args__ dos modelos
+INDICES = {
+    'Usuarios': [
+        ('idx_usuario_nome', ['nome_completo', 'id_usuario']),
+        ('idx_usuario_status_nome', ['status', 'nome_completo', 'id_usuario']),
+        ('idx_usuario_perfil_nome', ['id_perfil', 'nome_completo', 'id_usuario']),
+    ],
+    'Projetos': [
+        ('idx_projeto_atualizacao', ['data_ultima_atualizacao', 'id_projeto']),
+        ('idx_projeto_situacao_atualizacao', ['situacao_projeto', 'data_ultima_atualizacao', 'id_projeto']),
+    ],
+    'Incidentes': [
+        ('idx_incidente_criacao', ['data_criacao', 'id_incidente']),
+        ('idx_incidente_status_criacao', ['status', 'data_criacao', 'id_incidente']),
+        ('idx_incidente_prioridade_criacao', ['prioridade', 'data_criacao', 'id_incidente']),
+        ('idx_incidente_status_prioridade_criacao', ['status', 'prioridade', 'data_criacao', 'id_incidente']),
+        ('idx_incidente_projeto_criacao', ['id_projeto', 'data_criacao', 'id_incidente']),
+        ('idx_incidente_atualizacao', ['data_ultima_atualizacao', 'id_incidente']),
+    ],
+    'Tarefas': [
+        ('idx_tarefa_criacao', ['data_criacao', 'id_tarefa']),
+        ('idx_tarefa_status_criacao', ['status', 'data_criacao', 'id_tarefa']),
+        ('idx_tarefa_prioridade_criacao', ['prioridade', 'data_criacao', 'id_tarefa']),
+        ('idx_tarefa_projeto_criacao', ['id_projeto', 'data_criacao', 'id_tarefa']),
+        ('idx_tarefa_responsavel_criacao', ['id_usuario_responsavel', 'data_criacao', 'id_tarefa']),
+    ],
+}
+
+
+def _existentes(tabela):
+    inspetor = sa.inspect(op.get_bind())
+    if not inspetor.has_table(tabela):
+        return None
+    return {indice['name'] for indice in inspetor.get_indexes(tabela)}
+
+
+def upgrade():
+    # Bancos criados por db.create_all() depois desta versão já têm os índices
+    for tabela, indices in INDICES.items():
+        existentes = _existentes(tabela)
+        if existentes is None:
+            continue
+        for nome, colunas in indices:
+            if nome not in existentes:
+                op.create_index(nome, tabela, colunas)
+
+
+def downgrade():
+    for tabela, indices in INDICES.items():
+        existentes = _existentes(tabela) or set()
+        for nome, _ in reversed(indices):
+            if nome in existentes:
+                op.drop_index(nome, table_name=tabela)
@@ -0,0 +1,49 @@
+"""Tabela de contadores do dashboard, já povoada com os totais atuais
+
+Revision ID: 5c2a7e9b4d18
+Revises: 
+Create Date: 2026-10-18 08:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2a7e9b4d18'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# dimensão -> (tabela, coluna); as mesmas de DIMENSOES_CONTADORES, contadas como em reconstruir_contadores()
+DIMENSOES = {
+    'projeto_situacao': ('Projetos', 'situacao_projeto'),
+    'incidente_status': ('Incidentes', 'status'),
+    'incidente_prioridade': ('Incidentes', 'prioridade'),
+}
+
+
+def upgrade():
+    # Bancos criados por db.create_all() depois desta versão já têm a tabela (mantida pelo listener);
+    # banco vazio: create_all cria tudo junto
+    inspetor = sa.inspect(op.get_bind())
+    if inspetor.has_table('Contadores') or not all(inspetor.has_table(t) for t, _ in DIMENSOES.values()):
+        return
+    op.create_table(
+        'Contadores',
+        sa.Column('dimensao', sa.String(length=30), nullable=False),
+        sa.Column('valor', sa.String(length=20), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimensao', 'valor'),
+    )
+    # Sem a carga inicial o dashboard partiria de zero e só contaria as escritas feitas depois
+    for dimensao, (tabela, coluna) in DIMENSOES.items():
+        op.execute(sa.text(
+            f'INSERT INTO "Contadores" (dimensao, valor, total) '
+            f'SELECT :dimensao, {coluna}, COUNT(*) FROM "{tabela}" GROUP BY {coluna}'
+        ).bindparams(dimensao=dimensao))
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('Contadores'):
+        op.drop_table('Contadores')
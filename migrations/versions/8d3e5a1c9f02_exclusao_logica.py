@@ -0,0 +1,48 @@
+"""Exclusão lógica de projetos, tarefas e incidentes (data_exclusao + índice parcial para a purga)
+
+Revision ID: 8d3e5a1c9f02
+Revises: 4b1f0c7e2a13
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3e5a1c9f02'
+down_revision = '4b1f0c7e2a13'
+branch_labels = None
+depends_on = None
+
+# tabela -> nome do índice parcial (só as linhas aguardando a purga); os mesmos declarados nos modelos
+TABELAS = {
+    'Projetos': 'idx_projeto_exclusao',
+    'Tarefas': 'idx_tarefa_exclusao',
+    'Incidentes': 'idx_incidente_exclusao',
+}
+
+
+def upgrade():
+    # Bancos criados por db.create_all() depois desta versão já têm a coluna e o índice
+    inspetor = sa.inspect(op.get_bind())
+    for tabela, indice in TABELAS.items():
+        if not inspetor.has_table(tabela):
+            continue
+        if 'data_exclusao' not in {coluna['name'] for coluna in inspetor.get_columns(tabela)}:
+            op.add_column(tabela, sa.Column('data_exclusao', sa.DateTime(), nullable=True))
+        if indice not in {i['name'] for i in inspetor.get_indexes(tabela)}:
+            filtro = sa.text('data_exclusao IS NOT NULL')
+            op.create_index(indice, tabela, ['data_exclusao'], sqlite_where=filtro, postgresql_where=filtro)
+
+
+def downgrade():
+    inspetor = sa.inspect(op.get_bind())
+    for tabela, indice in TABELAS.items():
+        if not inspetor.has_table(tabela):
+            continue
+        if indice in {i['name'] for i in inspetor.get_indexes(tabela)}:
+            op.drop_index(indice, table_name=tabela)
+        if 'data_exclusao' in {coluna['name'] for coluna in inspetor.get_columns(tabela)}:
+            with op.batch_alter_table(tabela) as lote:
+                lote.drop_column('data_exclusao')
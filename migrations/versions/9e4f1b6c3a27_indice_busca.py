@@ -0,0 +1,112 @@
+"""Índice de busca textual (FTS5) de projetos, incidentes e tarefas, com os triggers que o mantêm
+
+Revision ID: 9e4f1b6c3a27
+Revises: 5c2a7e9b4d18
+Create Date: 2026-10-18 08:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4f1b6c3a27'
+down_revision = '5c2a7e9b4d18'
+branch_labels = None
+depends_on = None
+
+# Cópia de DDL_BUSCA/REPOVOAR_BUSCA de app.py nesta versão (FTS5 só existe no SQLite)
+DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS ProjetosBusca USING fts5(
+        codigo_projeto, nome_projeto, tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS IncidentesBusca USING fts5(
+        titulo, descricao, codigo_projeto, tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS TarefasBusca USING fts5(
+        titulo, descricao, tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+
+    # Projetos
+    """CREATE TRIGGER IF NOT EXISTS Projetos_busca_ai AFTER INSERT ON Projetos BEGIN
+        INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto)
+        VALUES (new.id_projeto, new.codigo_projeto, new.nome_projeto);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Projetos_busca_ad AFTER DELETE ON Projetos BEGIN
+        DELETE FROM ProjetosBusca WHERE rowid = old.id_projeto;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Projetos_busca_au AFTER UPDATE OF codigo_projeto, nome_projeto ON Projetos BEGIN
+        DELETE FROM ProjetosBusca WHERE rowid = old.id_projeto;
+        INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto)
+        VALUES (new.id_projeto, new.codigo_projeto, new.nome_projeto);
+        UPDATE IncidentesBusca SET codigo_projeto = new.codigo_projeto
+        WHERE rowid IN (SELECT id_incidente FROM Incidentes WHERE id_projeto = new.id_projeto);
+    END""",
+
+    # Incidentes (o código do projeto também é pesquisável)
+    """CREATE TRIGGER IF NOT EXISTS Incidentes_busca_ai AFTER INSERT ON Incidentes BEGIN
+        INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto)
+        VALUES (new.id_incidente, new.titulo, new.descricao,
+                (SELECT codigo_projeto FROM Projetos WHERE id_projeto = new.id_projeto));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Incidentes_busca_ad AFTER DELETE ON Incidentes BEGIN
+        DELETE FROM IncidentesBusca WHERE rowid = old.id_incidente;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Incidentes_busca_au AFTER UPDATE OF titulo, descricao, id_projeto ON Incidentes BEGIN
+        DELETE FROM IncidentesBusca WHERE rowid = old.id_incidente;
+        INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto)
+        VALUES (new.id_incidente, new.titulo, new.descricao,
+                (SELECT codigo_projeto FROM Projetos WHERE id_projeto = new.id_projeto));
+    END""",
+
+    # Tarefas
+    """CREATE TRIGGER IF NOT EXISTS Tarefas_busca_ai AFTER INSERT ON Tarefas BEGIN
+        INSERT INTO TarefasBusca(rowid, titulo, descricao) VALUES (new.id_tarefa, new.titulo, new.descricao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Tarefas_busca_ad AFTER DELETE ON Tarefas BEGIN
+        DELETE FROM TarefasBusca WHERE rowid = old.id_tarefa;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS Tarefas_busca_au AFTER UPDATE OF titulo, descricao ON Tarefas BEGIN
+        DELETE FROM TarefasBusca WHERE rowid = old.id_tarefa;
+        INSERT INTO TarefasBusca(rowid, titulo, descricao) VALUES (new.id_tarefa, new.titulo, new.descricao);
+    END""",
+]
+
+REPOVOAR = [
+    'DELETE FROM ProjetosBusca',
+    'INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto) SELECT id_projeto, codigo_projeto, nome_projeto FROM Projetos',
+    'DELETE FROM IncidentesBusca',
+    """INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto)
+       SELECT i.id_incidente, i.titulo, i.descricao, p.codigo_projeto
+       FROM Incidentes i LEFT JOIN Projetos p ON p.id_projeto = i.id_projeto""",
+    'DELETE FROM TarefasBusca',
+    'INSERT INTO TarefasBusca(rowid, titulo, descricao) SELECT id_tarefa, titulo, descricao FROM Tarefas',
+]
+
+TABELAS = ['Projetos', 'Incidentes', 'Tarefas']
+INDICES = ['ProjetosBusca', 'IncidentesBusca', 'TarefasBusca']
+TRIGGERS = [f'{tabela}_busca_{sufixo}' for tabela in TABELAS for sufixo in ('ai', 'ad', 'au')]
+
+
+def upgrade():
+    conexao = op.get_bind()
+    if conexao.dialect.name != 'sqlite':
+        return
+    # Bancos criados por db.create_all() já têm o índice (listener after_create); os triggers referenciam
+    # as três tabelas, então sem elas não há o que indexar
+    inspetor = sa.inspect(conexao)
+    if not all(inspetor.has_table(tabela) for tabela in TABELAS):
+        return
+    existia = inspetor.has_table('IncidentesBusca')
+    for comando in DDL:
+        conexao.exec_driver_sql(comando)
+    if not existia:
+        for comando in REPOVOAR:
+            conexao.exec_driver_sql(comando)
+
+
+def downgrade():
+    conexao = op.get_bind()
+    if conexao.dialect.name != 'sqlite':
+        return
+    for trigger in TRIGGERS:
+        conexao.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger}')
+    for indice in INDICES:
+        conexao.exec_driver_sql(f'DROP TABLE IF EXISTS {indice}')
@@ -0,0 +1,99 @@
+"""Código de projeto único só entre os projetos não excluídos (índice único parcial)
+
+Revision ID: a3d8c6f1e205
+Revises: 8d3e5a1c9f02
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d8c6f1e205'
+down_revision = '8d3e5a1c9f02'
+branch_labels = None
+depends_on = None
+
+INDICE = 'uq_projeto_codigo'
+# Nome dado à restrição UNIQUE sem nome do SQLite para removê-la na recriação da tabela
+CONVENCAO = {'uq': 'uq_%(table_name)s_%(column_0_name)s'}
+
+# Cópia dos triggers de busca da revisão 9e4f1b6c3a27 que usam Projetos. No SQLite, recriar a tabela remove
+# os triggers dela, e a troca de nome da tabela nova falha enquanto os de Incidentes a referenciam.
+TRIGGERS_BUSCA = {
+    'Projetos_busca_ai': """CREATE TRIGGER IF NOT EXISTS Projetos_busca_ai AFTER INSERT ON Projetos BEGIN
+        INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto)
+        VALUES (new.id_projeto, new.codigo_projeto, new.nome_projeto);
+    END""",
+    'Projetos_busca_ad': """CREATE TRIGGER IF NOT EXISTS Projetos_busca_ad AFTER DELETE ON Projetos BEGIN
+        DELETE FROM ProjetosBusca WHERE rowid = old.id_projeto;
+    END""",
+    'Projetos_busca_au': """CREATE TRIGGER IF NOT EXISTS Projetos_busca_au AFTER UPDATE OF codigo_projeto, nome_projeto ON Projetos BEGIN
+        DELETE FROM ProjetosBusca WHERE rowid = old.id_projeto;
+        INSERT INTO ProjetosBusca(rowid, codigo_projeto, nome_projeto)
+        VALUES (new.id_projeto, new.codigo_projeto, new.nome_projeto);
+        UPDATE IncidentesBusca SET codigo_projeto = new.codigo_projeto
+        WHERE rowid IN (SELECT id_incidente FROM Incidentes WHERE id_projeto = new.id_projeto);
+    END""",
+    'Incidentes_busca_ai': """CREATE TRIGGER IF NOT EXISTS Incidentes_busca_ai AFTER INSERT ON Incidentes BEGIN
+        INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto)
+        VALUES (new.id_incidente, new.titulo, new.descricao,
+                (SELECT codigo_projeto FROM Projetos WHERE id_projeto = new.id_projeto));
+    END""",
+    'Incidentes_busca_au': """CREATE TRIGGER IF NOT EXISTS Incidentes_busca_au AFTER UPDATE OF titulo, descricao, id_projeto ON Incidentes BEGIN
+        DELETE FROM IncidentesBusca WHERE rowid = old.id_incidente;
+        INSERT INTO IncidentesBusca(rowid, titulo, descricao, codigo_projeto)
+        VALUES (new.id_incidente, new.titulo, new.descricao,
+                (SELECT codigo_projeto FROM Projetos WHERE id_projeto = new.id_projeto));
+    END""",
+}
+
+
+def _restricao_unica(inspetor):
+    for restricao in inspetor.get_unique_constraints('Projetos'):
+        if restricao['column_names'] == ['codigo_projeto']:
+            return restricao
+    return None
+
+
+def _recriar_projetos(alteracao):
+    """Aplica `alteracao` (recebe o batch_alter_table de Projetos) preservando os triggers de busca."""
+    conexao = op.get_bind()
+    triggers = []
+    if conexao.dialect.name == 'sqlite':
+        triggers = [nome for nome, in conexao.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'") if nome in TRIGGERS_BUSCA]
+        for nome in triggers:
+            conexao.exec_driver_sql(f'DROP TRIGGER {nome}')
+    with op.batch_alter_table('Projetos', naming_convention=CONVENCAO) as lote:
+        alteracao(lote)
+    for nome in triggers:
+        conexao.exec_driver_sql(TRIGGERS_BUSCA[nome])
+
+
+def upgrade():
+    # Bancos criados por db.create_all() depois desta versão já têm só o índice parcial
+    inspetor = sa.inspect(op.get_bind())
+    if not inspetor.has_table('Projetos'):
+        return
+    restricao = _restricao_unica(inspetor)
+    if restricao is not None:
+        _recriar_projetos(lambda lote: lote.drop_constraint(
+            restricao['name'] or 'uq_Projetos_codigo_projeto', type_='unique'))
+    if INDICE not in {i['name'] for i in inspetor.get_indexes('Projetos')}:
+        filtro = sa.text('data_exclusao IS NULL')
+        op.create_index(INDICE, 'Projetos', ['codigo_projeto'], unique=True,
+                        sqlite_where=filtro, postgresql_where=filtro)
+
+
+def downgrade():
+    # Só volta a ser possível depois de purgar os projetos excluídos que repetem códigos
+    inspetor = sa.inspect(op.get_bind())
+    if not inspetor.has_table('Projetos'):
+        return
+    if INDICE in {i['name'] for i in inspetor.get_indexes('Projetos')}:
+        op.drop_index(INDICE, table_name='Projetos')
+    if _restricao_unica(inspetor) is None:
+        _recriar_projetos(lambda lote: lote.create_unique_constraint(
+            'uq_Projetos_codigo_projeto', ['codigo_projeto']))
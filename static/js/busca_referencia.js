@@ -0,0 +1,44 @@
+// Busca incremental para os selects de projetos e usuários.
+// O servidor renderiza só a opção selecionada; as demais vêm de /api/busca/<nome>?q=... conforme o usuário digita.
+(function () {
+    'use strict'
+
+    document.querySelectorAll('input[data-busca]').forEach(function (campo) {
+        const select = document.getElementById(campo.dataset.alvo)
+        let temporizador = null
+        let controlador = null
+
+        function preencher(itens) {
+            // Mantém o placeholder ("Todos", "Selecione...") e a opção escolhida
+            const atual = select.value
+            Array.from(select.options).forEach(function (opcao) {
+                if (opcao.value !== '' && opcao.value !== atual) {
+                    opcao.remove()
+                }
+            })
+            itens.forEach(function (item) {
+                if (String(item.id) !== atual) {
+                    select.add(new Option(item.texto, item.id))
+                }
+            })
+        }
+
+        function buscar() {
+            if (controlador) {
+                controlador.abort()
+            }
+            controlador = new AbortController()
+            fetch(campo.dataset.busca + '?q=' + encodeURIComponent(campo.value.trim()), { signal: controlador.signal })
+                .then(function (resposta) { return resposta.ok ? resposta.json() : [] })
+                .then(preencher)
+                .catch(function () {})
+        }
+
+        campo.addEventListener('input', function () {
+            clearTimeout(temporizador)
+            temporizador = setTimeout(buscar, 200)
+        })
+        // Primeiras opções ao abrir o select sem ter digitado nada
+        select.addEventListener('focus', buscar, { once: true })
+    })
+})()
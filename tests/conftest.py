@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# Banco SQLite temporário; precisa estar definido antes de importar a aplicação
+_diretorio = tempfile.mkdtemp(prefix='portal-testes-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_diretorio, 'portal_projetos.db')
+os.environ.setdefault('AUTO_LOGIN_ADMIN', '1')
+# Toda requisição instrumentada, para os testes verem as medições
+os.environ.setdefault('INSTRUMENTACAO_AMOSTRAGEM', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as portal  # noqa: E402
+
+
+def _popular(db):
+    perfil_admin = portal.Perfil(nome='ADMIN', descricao='Administrador do sistema')
+    perfil_usuario = portal.Perfil(nome='USUARIO', descricao='Usuário comum')
+    db.session.add_all([perfil_admin, perfil_usuario])
+    db.session.flush()
+
+    # Hash fixo: os testes não fazem login por senha
+    usuarios = [portal.Usuario(id_perfil=perfil_admin.id_perfil, login='admin', nome_completo='Administrador',
+                               email='admin@portal.local', senha='x', status='ATIVO')]
+    for i in range(1, 20):
+        usuarios.append(portal.Usuario(id_perfil=perfil_usuario.id_perfil, login=f'usuario{i}',
+                                       nome_completo=f'Usuário {i:02d}', email=f'usuario{i}@portal.local',
+                                       senha='x', status='ATIVO' if i % 4 else 'INATIVO'))
+    db.session.add_all(usuarios)
+    db.session.flush()
+
+    agora = datetime.now()
+    situacoes = ['ATIVO', 'INATIVO', 'CONCLUIDO']
+    projetos = [portal.Projeto(id_usuario_criacao=usuarios[0].id_usuario, codigo_projeto=f'P{i:04d}',
+                               nome_projeto=f'Projeto de integração {i}', controle_economico='CE',
+                               numero_iniciativa=f'INI-{i}', situacao_projeto=situacoes[i % 3],
+                               data_criacao=agora - timedelta(days=i),
+                               data_ultima_atualizacao=agora - timedelta(hours=i) if i % 5 else None)
+                for i in range(1, 41)]
+    db.session.add_all(projetos)
+    db.session.flush()
+
+    prioridades = ['ALTA', 'MÉDIA', 'BAIXA']
+    for i in range(1, 121):
+        projeto = projetos[i % len(projetos)]
+        db.session.add(portal.Incidente(id_projeto=projeto.id_projeto, id_usuario_criacao=usuarios[0].id_usuario,
+                                        titulo=f'Falha no processamento {i}', descricao='Erro ao gerar relatório',
+                                        prioridade=prioridades[i % 3],
+                                        status=['ABERTO', 'EM_ANÁLISE', 'RESOLVIDO'][i % 3],
+                                        data_criacao=agora - timedelta(minutes=i),
+                                        data_ultima_atualizacao=agora - timedelta(minutes=i) if i % 2 else None))
+        db.session.add(portal.Tarefa(id_projeto=projeto.id_projeto, id_usuario_criacao=usuarios[0].id_usuario,
+                                     id_usuario_responsavel=usuarios[i % len(usuarios)].id_usuario,
+                                     titulo=f'Revisar documentação {i}', descricao='Atualizar manual',
+                                     prioridade=prioridades[i % 3],
+                                     status=['PENDENTE', 'EM_ANDAMENTO', 'CONCLUIDA'][i % 3],
+                                     data_criacao=agora - timedelta(minutes=i)))
+    db.session.commit()
+    portal.reconstruir_contadores()
+
+
+@pytest.fixture(scope='session')
+def app():
+    portal.app.config['TESTING'] = True
+    # Rotas que passarem deste número de comandos SQL falham com QueryBudgetExceeded (detecta N+1);
+    # o maior custo fixo é a exclusão de projeto, com um UPDATE por contador afetado
+    portal.app.config['QUERY_BUDGET'] = 20
+    with portal.app.app_context():
+        portal.db.create_all()
+        _popular(portal.db)
+    yield portal.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
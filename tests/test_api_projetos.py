@@ -0,0 +1,38 @@
+"""/api/projetos: resposta sem paginação compatível com a anterior e ETag que acompanha exclusões e importações."""
+import io
+
+import app as portal
+
+
+def _codigos_ativos():
+    with portal.app.app_context():
+        return [c for (c,) in portal.db.session.query(portal.Projeto.codigo_projeto)
+                .order_by(portal.Projeto.codigo_projeto)]
+
+
+def test_sem_limite_devolve_todos_por_codigo(client):
+    resposta = client.get('/api/projetos')
+    assert [p['codigo_projeto'] for p in resposta.get_json()] == _codigos_ativos()
+    assert set(resposta.get_json()[0]) == {'id_projeto', 'codigo_projeto', 'nome_projeto'}
+    assert 'Link' not in resposta.headers and 'Last-Modified' not in resposta.headers
+
+
+def test_etag_muda_com_exclusao_e_importacao(client, monkeypatch):
+    monkeypatch.setattr(portal, 'agendar_purga', lambda: None)
+    url = '/api/projetos?limite=5'
+    etag = client.get(url).headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    assert client.post('/projetos/37/excluir').status_code == 302
+    resposta = client.get(url, headers={'If-None-Match': etag})
+    assert resposta.status_code == 200
+    etag = resposta.headers['ETag']
+    with portal.app.app_context():
+        portal.purgar_excluidos(pausa=0)
+
+    # Importação com data antiga: a data mais recente não muda, a versão sim
+    conteudo = ('codigo_projeto,nome_projeto,controle_economico,numero_iniciativa,situacao_projeto,'
+                'data_ultima_atualizacao\nAPI01,Importado,CE,INI,ATIVO,2001-01-01T00:00:00\n').encode()
+    client.post('/importar/projetos', data={'arquivo': (io.BytesIO(conteudo), 'p.csv')},
+                content_type='multipart/form-data')
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
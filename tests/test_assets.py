@@ -0,0 +1,48 @@
+"""Pipeline de arquivos estáticos: nomes com hash, url() do CSS reescritos e cabeçalhos de /assets."""
+import json
+
+import pytest
+
+import app as portal
+
+
+@pytest.fixture()
+def assets(tmp_path, monkeypatch):
+    origem = tmp_path / 'static'
+    (origem / 'css').mkdir(parents=True)
+    (origem / 'fontes').mkdir()
+    (origem / 'fontes' / 'icones.woff2').write_bytes(b'\x00fonte')
+    (origem / 'css' / 'tema.css').write_text(
+        '@font-face{src:url(../fontes/icones.woff2) format("woff2")}' + '.a{color:red}' * 200, encoding='utf-8')
+    destino = tmp_path / 'dist'
+    monkeypatch.setattr(portal, 'PASTA_ASSETS', str(destino))
+    manifesto = portal.construir_assets(str(origem), str(destino))
+    yield manifesto, destino
+    portal._manifesto_assets.pop('nomes', None)
+
+
+def test_nomes_com_hash_e_url_reescrita(assets):
+    manifesto, destino = assets
+    fonte, css = manifesto['fontes/icones.woff2'], manifesto['css/tema.css']
+    assert fonte != 'fontes/icones.woff2' and css != 'css/tema.css'
+    conteudo = (destino / css).read_text(encoding='utf-8')
+    assert f'url(../{fonte})' in conteudo
+    assert json.loads((destino / 'manifest.json').read_text(encoding='utf-8')) == manifesto
+    # Fonte woff2 já é comprimida: sem variantes
+    assert (destino / (css + '.gz')).exists() and not (destino / (fonte + '.gz')).exists()
+
+
+def test_servido_com_cache_imutavel_e_variante_comprimida(app, assets):
+    manifesto, _ = assets
+    cliente = app.test_client()
+    with app.test_request_context():
+        url = portal.asset('css/tema.css')
+    assert url == f"/assets/{manifesto['css/tema.css']}"
+    resposta = cliente.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert resposta.status_code == 200
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert resposta.headers['Content-Type'].startswith('text/css')
+    assert 'immutable' in resposta.headers['Cache-Control']
+    assert 'Accept-Encoding' in resposta.headers['Vary'] and 'Cookie' not in resposta.headers['Vary']
+    assert cliente.get(url, headers={'Accept-Encoding': 'identity'}).headers.get('Content-Encoding') is None
+    assert cliente.get('/assets/manifest.json').status_code == 404
@@ -0,0 +1,54 @@
+"""Índice FTS5: mantido pelos triggers nas edições e na remoção física (purga)."""
+import pytest
+
+import app as portal
+
+
+@pytest.fixture
+def busca(app, monkeypatch):
+    monkeypatch.setattr(portal, 'agendar_purga', lambda: None)
+    with app.app_context():
+        assert portal.busca_textual_disponivel(), 'os testes rodam em SQLite com FTS5'
+
+
+def _encontrados(chave, termo):
+    # Pela consulta das listagens (índice + registros não excluídos)
+    with portal.app.app_context():
+        query, _ = portal.aplicar_busca(portal.db.session.query(chave), chave.class_, termo)
+        return {id_ for (id_,) in query}
+
+
+def _no_indice(modelo, termo):
+    # Direto na tabela FTS5, sem o filtro de exclusão lógica
+    nome = portal.INDICES_BUSCA[modelo][0]
+    with portal.app.app_context(), portal.db.engine.connect() as conexao:
+        return {id_ for (id_,) in conexao.exec_driver_sql(
+            f'SELECT rowid FROM "{nome}" WHERE "{nome}" MATCH ?', (f'"{termo}"*',))}
+
+
+def test_indice_acompanha_criacao_edicao_e_purga(client, busca):
+    projeto = {'codigo_projeto': 'FTS01', 'nome_projeto': 'Zeppelin orbital', 'controle_economico': 'CE',
+               'numero_iniciativa': 'INI-FTS', 'situacao_projeto': 'ATIVO'}
+    assert client.post('/projetos/novo', data=projeto).status_code == 302
+    with portal.app.app_context():
+        id_projeto = portal.Projeto.query.filter_by(codigo_projeto='FTS01').one().id_projeto
+    assert _encontrados(portal.Projeto.id_projeto, 'zeppel') == {id_projeto}
+
+    assert client.post(f'/projetos/{id_projeto}/editar',
+                       data={**projeto, 'nome_projeto': 'Dirigível estratosférico'}).status_code == 302
+    assert _encontrados(portal.Projeto.id_projeto, 'zeppelin') == set()
+    assert _encontrados(portal.Projeto.id_projeto, 'dirigível estrato') == {id_projeto}
+
+    assert client.post('/incidentes/5/editar', data={'titulo': 'Quasar no relatório', 'descricao': 'd',
+                                                     'prioridade': 'ALTA', 'status': 'ABERTO'}).status_code == 302
+    assert _encontrados(portal.Incidente.id_incidente, 'quasar') == {5}
+
+    # Exclusão lógica: fora dos resultados na hora; a linha do índice sai com a remoção física
+    assert client.post('/incidentes/5/excluir').status_code == 302
+    assert client.post(f'/projetos/{id_projeto}/excluir').status_code == 302
+    assert _encontrados(portal.Incidente.id_incidente, 'quasar') == set()
+    assert _encontrados(portal.Projeto.id_projeto, 'dirigível') == set()
+    assert _no_indice(portal.Incidente, 'quasar') == {5}
+    with portal.app.app_context():
+        portal.purgar_excluidos(pausa=0)
+    assert _no_indice(portal.Incidente, 'quasar') == _no_indice(portal.Projeto, 'dirigível') == set()
@@ -0,0 +1,50 @@
+"""Compressão das respostas dinâmicas e streaming do detalhe do projeto."""
+import zlib
+
+import pytest
+
+import app as portal
+
+
+def test_html_em_streaming_comprimido_em_blocos(client, monkeypatch):
+    monkeypatch.setitem(portal.app.config, 'STREAM_BLOCO_BYTES', 1024)
+    resposta = client.get('/projetos/1', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert resposta.status_code == 200 and resposta.is_streamed
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in resposta.headers
+    assert 'Accept-Encoding' in resposta.headers['Vary']
+    partes = list(resposta.response)
+    resposta.close()
+    assert len(partes) > 1
+    html = zlib.decompress(b''.join(partes), 16 + zlib.MAX_WBITS).decode('utf-8')
+    assert html.rstrip().endswith('</html>')
+
+
+@pytest.mark.parametrize('url', ['/api/projetos?limite=40', '/api/dashboard/stats'])
+def test_json_comprimido_com_etag_fraco_e_vary_no_304(client, url):
+    resposta = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert int(resposta.headers['Content-Length']) == len(resposta.data)
+    assert zlib.decompress(resposta.data, 16 + zlib.MAX_WBITS)[:1] in (b'[', b'{')
+    # Os bytes comprimidos não são os do ETag forte da aplicação
+    assert resposta.headers['ETag'].startswith('W/"')
+
+    revalidada = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': resposta.headers['ETag']})
+    assert revalidada.status_code == 304
+    assert revalidada.headers['ETag'] == resposta.headers['ETag']
+    assert 'Accept-Encoding' in revalidada.headers['Vary']
+    # Sem compressão, o mesmo recurso mantém o ETag forte
+    assert not client.get(url).headers['ETag'].startswith('W/')
+
+
+@pytest.mark.skipif(portal.brotli is None, reason='pacote Brotli não instalado')
+def test_brotli_preferido_quando_aceito(client):
+    resposta = client.get('/api/projetos?limite=40', headers={'Accept-Encoding': 'gzip, br'})
+    assert resposta.headers['Content-Encoding'] == 'br'
+    assert portal.brotli.decompress(resposta.data).startswith(b'[')
+
+
+def test_respostas_pequenas_ou_sem_aceite_nao_comprimidas(client):
+    assert client.get('/api/busca/projetos?q=P0001', headers={'Accept-Encoding': 'gzip'}).headers.get(
+        'Content-Encoding') is None
+    assert client.get('/api/projetos?limite=40').headers.get('Content-Encoding') is None
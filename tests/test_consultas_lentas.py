@@ -0,0 +1,40 @@
+"""Log de consultas lentas: uma linha JSON por comando, com parâmetros redigidos, rota, filtros e plano."""
+import json
+import os
+
+import pytest
+
+import app as portal
+
+
+@pytest.fixture
+def log_lentas(tmp_path, monkeypatch):
+    # Limite mínimo (0 desativa): todo comando entra no log, gravado num arquivo do teste
+    caminho = tmp_path / 'consultas_lentas.log'
+    monkeypatch.setitem(portal.app.config, 'CONSULTA_LENTA_MS', 1e-6)
+    monkeypatch.setitem(portal.app.config, 'CONSULTAS_LENTAS_ARQUIVO', str(caminho))
+    monkeypatch.setattr(portal._log_consultas_lentas, 'handlers', [])
+    yield caminho
+    for saida in portal._log_consultas_lentas.handlers:
+        saida.close()
+
+
+def test_arquivo_padrao_fica_em_instance():
+    assert os.path.dirname(portal.caminho_consultas_lentas()) == portal.app.instance_path
+
+
+def test_consulta_registrada_com_plano_e_parametros_redigidos(client, log_lentas):
+    assert client.get('/projetos?situacao=ATIVO&page=2').status_code == 200
+    registros = [json.loads(linha) for linha in log_lentas.read_text(encoding='utf-8').splitlines()]
+    listagem = [r for r in registros if r['rota'] == 'GET listar_projetos' and 'FROM "Projetos"' in r['sql']]
+    assert listagem, registros
+    registro = listagem[0]
+    # Página e cursor não mudam o plano: só o filtro entra na combinação
+    assert registro['filtros'] == 'situacao'
+    assert registro['plano'] and any('Projetos' in passo for passo in registro['plano'])
+    assert '<texto:5>' in json.dumps(registro['parametros']) and 'ATIVO' not in json.dumps(registro['parametros'])
+    assert registro['duracao_ms'] >= 0
+
+    resultado = portal.app.test_cli_runner().invoke(
+        args=['consultas-lentas', 'relatorio', '--arquivo', str(log_lentas), '--top', '3'])
+    assert resultado.exit_code == 0 and 'listar_projetos [situacao]' in resultado.output
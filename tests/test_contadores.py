@@ -0,0 +1,54 @@
+"""Tabela Contadores: atualizada na mesma transação de cada escrita, conferida contra as tabelas."""
+import pytest
+
+import app as portal
+
+
+@pytest.fixture
+def sem_purga_automatica(monkeypatch):
+    monkeypatch.setattr(portal, 'agendar_purga', lambda: None)
+
+
+def _totais(*chaves):
+    with portal.app.app_context():
+        return [getattr(portal.db.session.get(portal.Contador, chave), 'total', 0) for chave in chaves]
+
+
+def _verificar(app):
+    resultado = app.test_cli_runner().invoke(args=['contadores', 'verificar'])
+    assert resultado.exit_code == 0, resultado.output
+
+
+def test_contadores_acompanham_o_ciclo_de_vida(app, client, sem_purga_automatica):
+    chaves = [('projeto_situacao', 'ATIVO'), ('projeto_situacao', 'CONCLUIDO'),
+              ('incidente_status', 'ABERTO'), ('incidente_status', 'RESOLVIDO'), ('incidente_prioridade', 'ALTA')]
+    iniciais = _totais(*chaves)
+    projeto = {'codigo_projeto': 'CNT01', 'nome_projeto': 'Contadores', 'controle_economico': 'CE',
+               'numero_iniciativa': 'INI-CNT', 'situacao_projeto': 'ATIVO'}
+
+    assert client.post('/projetos/novo', data=projeto).status_code == 302
+    with app.app_context():
+        id_projeto = portal.Projeto.query.filter_by(codigo_projeto='CNT01').one().id_projeto
+    assert client.post('/incidentes/novo', data={'id_projeto': id_projeto, 'titulo': 'Contado', 'descricao': 'd',
+                                                 'prioridade': 'ALTA'}).status_code == 302
+    with app.app_context():
+        id_incidente = portal.Incidente.query.filter_by(id_projeto=id_projeto).one().id_incidente
+    assert _totais(*chaves) == [iniciais[0] + 1, iniciais[1], iniciais[2] + 1, iniciais[3], iniciais[4] + 1]
+    _verificar(app)
+
+    # Mudança de situação/status: sai de um valor e entra no outro
+    assert client.post(f'/projetos/{id_projeto}/editar',
+                       data={**projeto, 'situacao_projeto': 'CONCLUIDO'}).status_code == 302
+    assert client.post(f'/incidentes/{id_incidente}/editar', data={
+        'titulo': 'Contado', 'descricao': 'd', 'prioridade': 'ALTA', 'status': 'RESOLVIDO'}).status_code == 302
+    assert _totais(*chaves) == [iniciais[0], iniciais[1] + 1, iniciais[2], iniciais[3] + 1, iniciais[4] + 1]
+    _verificar(app)
+
+    # A exclusão lógica do projeto tira ele e o incidente das contagens; a purga não muda mais nada
+    assert client.post(f'/projetos/{id_projeto}/excluir').status_code == 302
+    assert _totais(*chaves) == iniciais
+    _verificar(app)
+    with app.app_context():
+        assert portal.purgar_excluidos(pausa=0)['Incidentes'] == 1
+    assert _totais(*chaves) == iniciais
+    _verificar(app)
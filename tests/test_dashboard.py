@@ -0,0 +1,36 @@
+"""Stream SSE do dashboard: vagas limitadas por processo, com recusa (204) quando esgotadas."""
+import threading
+
+import app as portal
+
+
+def test_streams_sse_limitados_por_processo(client, monkeypatch):
+    monkeypatch.setattr(portal, '_vagas_sse', threading.BoundedSemaphore(1))
+    aberto = client.get('/api/dashboard/eventos', buffered=False)
+    assert aberto.status_code == 200 and aberto.mimetype == 'text/event-stream'
+    assert client.get('/api/dashboard/eventos').status_code == 204
+    # Fechar o stream devolve a vaga
+    aberto.close()
+    outro = client.get('/api/dashboard/eventos', buffered=False)
+    assert outro.status_code == 200
+    outro.close()
+
+
+def test_sse_desativado(client, monkeypatch):
+    monkeypatch.setitem(portal.app.config, 'DASHBOARD_SSE_MAX_CONEXOES', 0)
+    assert client.get('/api/dashboard/eventos').status_code == 204
+
+
+def test_recusado_recorre_as_estatisticas_com_etag(client, monkeypatch):
+    # Sem vagas: 204 sem consumir vaga alguma; a página passa a revalidar /api/dashboard/stats pelo ETag
+    monkeypatch.setattr(portal, '_vagas_sse', threading.BoundedSemaphore(1))
+    portal._vagas_sse.acquire()
+    assert client.get('/api/dashboard/eventos').status_code == 204
+    assert not portal._vagas_sse.acquire(blocking=False)
+
+    etag = client.get('/api/dashboard/stats').headers['ETag']
+    assert client.get('/api/dashboard/stats', headers={'If-None-Match': etag}).status_code == 304
+    assert client.post('/incidentes/novo', data={'id_projeto': 1, 'titulo': 'Novo', 'descricao': 'd',
+                                                 'prioridade': 'BAIXA'}).status_code == 302
+    resposta = client.get('/api/dashboard/stats', headers={'If-None-Match': etag})
+    assert resposta.status_code == 200 and resposta.headers['ETag'] != etag
@@ -0,0 +1,63 @@
+"""Exclusão lógica (filtrada de todas as consultas ORM) e purga em lotes."""
+import pytest
+
+import app as portal
+
+
+@pytest.fixture
+def sem_purga_automatica(monkeypatch):
+    monkeypatch.setattr(portal, 'agendar_purga', lambda: None)
+
+
+def _contadores_consistentes():
+    with portal.app.app_context():
+        atuais = {(c.dimensao, c.valor): c.total for c in portal.Contador.query.filter(
+            portal.Contador.dimensao.in_(portal.DIMENSOES_CONTADORES)) if c.total}
+        return atuais == portal.contar_totais_reais()
+
+
+def _linhas(tabela, **filtro):
+    with portal.app.app_context(), portal.db.engine.connect() as conexao:
+        condicoes = [tabela.c[coluna] == valor for coluna, valor in filtro.items()]
+        return conexao.execute(portal.db.select(portal.db.func.count()).select_from(tabela).where(*condicoes)).scalar()
+
+
+def test_projeto_excluido_some_das_consultas_e_e_purgado_em_lotes(client, sem_purga_automatica):
+    tarefas, incidentes = portal.Tarefa.__table__, portal.Incidente.__table__
+    assert _linhas(tarefas, id_projeto=40) > 1
+
+    assert client.post('/projetos/40/excluir').status_code == 302
+    assert client.get('/projetos/40').status_code == 404
+    assert 'P0040' not in client.get('/api/busca/projetos?q=P0040').get_data(as_text=True)
+    assert 'P0040' not in client.get('/incidentes').get_data(as_text=True)
+    assert _contadores_consistentes()
+    # Marcados, ainda não removidos
+    assert _linhas(tarefas, id_projeto=40) > 1
+
+    with portal.app.app_context():
+        removidos = portal.purgar_excluidos(lote=1, pausa=0)
+    assert removidos['Projetos'] == 1 and removidos['Tarefas'] > 1
+    assert _linhas(tarefas, id_projeto=40) == _linhas(incidentes, id_projeto=40) == 0
+    assert _linhas(portal.Projeto.__table__, id_projeto=40) == 0
+
+
+def test_incidente_excluido_sai_dos_contadores(client, sem_purga_automatica):
+    assert client.post('/incidentes/10/excluir').status_code == 302
+    assert client.get('/incidentes/10/editar').status_code == 404
+    assert _contadores_consistentes()
+    with portal.app.app_context():
+        assert portal.purgar_excluidos()['Incidentes'] == 1
+
+
+def test_codigo_de_projeto_excluido_pode_ser_reutilizado_antes_da_purga(client, sem_purga_automatica):
+    dados = {'nome_projeto': 'Projeto recriado', 'controle_economico': 'CE', 'numero_iniciativa': 'INI-39',
+             'situacao_projeto': 'ATIVO'}
+    assert client.post('/projetos/39/excluir').status_code == 302
+    assert client.post('/projetos/novo', data={**dados, 'codigo_projeto': 'P0039'}).status_code == 302
+    # Entre os projetos não excluídos o código continua único
+    resposta = client.post('/projetos/novo', data={**dados, 'codigo_projeto': 'P0038'})
+    assert resposta.status_code == 200 and 'código do projeto já existe' in resposta.get_data(as_text=True)
+    with portal.app.app_context():
+        assert portal.Projeto.query.filter_by(codigo_projeto='P0039').count() == 1
+        assert portal.purgar_excluidos(pausa=0)['Projetos'] == 1
+    assert _contadores_consistentes()
@@ -0,0 +1,42 @@
+"""Exportação das listagens: mesmos filtros da tela, sem registros excluídos logicamente."""
+import csv
+import io
+import json
+
+import app as portal
+
+COLUNAS_INCIDENTES = ['id_incidente', 'codigo_projeto', 'titulo', 'descricao', 'prioridade', 'status',
+                      'data_criacao', 'data_ultima_atualizacao', 'data_resolucao']
+
+
+def _nao_excluidos(tabela, **filtro):
+    with portal.app.app_context(), portal.db.engine.connect() as conexao:
+        condicoes = [tabela.c[coluna] == valor for coluna, valor in filtro.items()]
+        return conexao.execute(portal.db.select(portal.db.func.count()).select_from(tabela).where(
+            tabela.c.data_exclusao.is_(None), *condicoes)).scalar()
+
+
+def test_csv_filtrado_sem_excluidos(client, monkeypatch):
+    monkeypatch.setattr(portal, 'agendar_purga', lambda: None)
+    # Incidente 3 (ABERTO, ALTA) excluído diretamente; o 75 sai junto com o projeto 36
+    assert client.post('/incidentes/3/excluir').status_code == 302
+    assert client.post('/projetos/36/excluir').status_code == 302
+
+    resposta = client.get('/exportar/incidentes?status=ABERTO&prioridade=ALTA')
+    assert resposta.status_code == 200 and resposta.mimetype == 'text/csv'
+    assert resposta.headers['Content-Disposition'].startswith('attachment; filename="incidentes_')
+    linhas = list(csv.reader(io.StringIO(resposta.get_data(as_text=True))))
+    assert linhas[0] == COLUNAS_INCIDENTES
+    registros = [dict(zip(linhas[0], linha)) for linha in linhas[1:]]
+    assert len(registros) == _nao_excluidos(portal.Incidente.__table__, status='ABERTO', prioridade='ALTA')
+    assert all(r['status'] == 'ABERTO' and r['prioridade'] == 'ALTA' for r in registros)
+    ids = {int(r['id_incidente']) for r in registros}
+    assert ids and not ids & {3, 75}
+
+    ndjson = client.get('/exportar/projetos?situacao=ATIVO&formato=ndjson').get_data(as_text=True)
+    codigos = [json.loads(linha)['codigo_projeto'] for linha in ndjson.splitlines()]
+    assert len(codigos) == _nao_excluidos(portal.Projeto.__table__, situacao_projeto='ATIVO')
+    assert 'P0036' not in codigos
+
+    with portal.app.app_context():
+        portal.purgar_excluidos(pausa=0)
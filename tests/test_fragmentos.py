@@ -0,0 +1,43 @@
+"""Cache de fragmentos: linhas reaproveitadas entre requisições e invalidadas por edição do registro ou das referências."""
+from datetime import datetime
+
+import app as portal
+
+
+def _editar(modelo, id, **valores):
+    with portal.app.app_context():
+        registro = portal.db.session.get(modelo, id)
+        for atributo, valor in valores.items():
+            setattr(registro, atributo, valor)
+        portal.db.session.commit()
+
+
+def test_linha_reaproveitada_e_invalidada_pela_edicao(client):
+    portal.cache_fragmentos.invalidar()
+    primeira = client.get('/tarefas').get_data(as_text=True)
+    guardados = len(portal.cache_fragmentos._itens)
+    assert guardados > 0
+    assert client.get('/tarefas').get_data(as_text=True) == primeira
+    assert len(portal.cache_fragmentos._itens) == guardados
+
+    # Sem data de atualização nova o registro é considerado inalterado
+    _editar(portal.Tarefa, 1, titulo='Título revisado', data_ultima_atualizacao=datetime.now())
+    assert 'Título revisado' in client.get('/tarefas').get_data(as_text=True)
+
+
+def test_referencias_renomeadas_invalidam_linhas(client):
+    assert 'Usuário 01' in client.get('/tarefas').get_data(as_text=True)
+    _editar(portal.Usuario, 2, nome_completo='Usuária Renomeada')
+    _editar(portal.Projeto, 2, nome_projeto='Projeto de integração renomeado')
+    html = client.get('/tarefas').get_data(as_text=True)
+    assert 'Usuária Renomeada' in html and 'Projeto de integração renomeado' in html
+
+
+def test_cache_limitado_em_bytes():
+    cache = portal.CacheLRU(100, 60, max_bytes=1000)
+    for i in range(10):
+        cache.guardar(i, 'x' * 300)
+    assert 0 < len(cache._itens) < 10 and cache._bytes <= 1000
+    assert cache.obter(9) is not None and cache.obter(0) is None
+    cache.guardar('grande', 'x' * 2000)
+    assert cache.obter('grande') is None
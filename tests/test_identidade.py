@@ -0,0 +1,29 @@
+"""Cache de identidades: cópia imutável do usuário, invalidada pela versão de 'usuarios' gravada no banco."""
+import dataclasses
+
+import pytest
+
+import app as portal
+
+
+def _renomear_admin(nome):
+    # Escrita direta no banco, como faria outro worker: nenhuma invalidação explícita do cache local
+    with portal.app.app_context():
+        admin = portal.Usuario.query.filter_by(login='admin').one()
+        admin.nome_completo = nome
+        portal.db.session.commit()
+        return admin.id_usuario
+
+
+def test_identidade_imutavel_e_invalidada_pela_versao(client):
+    assert 'Administrador' in client.get('/projetos').get_data(as_text=True)
+    id_admin = _renomear_admin('Administradora Geral')
+    try:
+        assert 'Administradora Geral' in client.get('/projetos').get_data(as_text=True)
+        with portal.app.test_request_context():
+            identidade = portal.load_user(id_admin)
+        assert isinstance(identidade, portal.IdentidadeUsuario) and identidade.perfil == 'ADMIN'
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            identidade.nome_completo = 'outro'
+    finally:
+        _renomear_admin('Administrador')
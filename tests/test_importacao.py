@@ -0,0 +1,111 @@
+"""Importação em lote (rota e comando): relatório por linha, transação por lote e recusa de arquivo fora de UTF-8."""
+import io
+import json
+from datetime import datetime
+
+import app as portal
+
+
+def _enviar(client, entidade, conteudo, nome, **dados):
+    return client.post(f'/importar/{entidade}', data={**dados, 'arquivo': (io.BytesIO(conteudo), nome)},
+                       content_type='multipart/form-data')
+
+
+def _ndjson(*registros):
+    return '\n'.join(json.dumps(r, ensure_ascii=False) for r in registros).encode()
+
+
+def _projetos(prefixo):
+    with portal.app.app_context():
+        return portal.Projeto.query.filter(portal.Projeto.codigo_projeto.startswith(prefixo)).count()
+
+
+def _contador(dimensao, valor):
+    with portal.app.app_context():
+        contador = portal.db.session.get(portal.Contador, (dimensao, valor))
+        return contador.total if contador else 0
+
+
+def test_csv_valido_importado_com_contadores(client):
+    ativos = _contador('projeto_situacao', 'ATIVO')
+    conteudo = ('codigo_projeto,nome_projeto,controle_economico,numero_iniciativa,situacao_projeto\n'
+                'CSV01,Migração do ERP,CE-1,INI-901,ATIVO\n'
+                'CSV02,Portal do cliente,CE-2,INI-902,ATIVO\n').encode('utf-8-sig')
+    resposta = _enviar(client, 'projetos', conteudo, 'projetos.csv')
+    assert resposta.status_code == 200
+    assert resposta.get_json() == {'linhas': 2, 'inseridos': 2, 'total_erros': 0, 'erros': []}
+    assert _projetos('CSV0') == 2
+    assert _contador('projeto_situacao', 'ATIVO') == ativos + 2
+
+
+def test_ndjson_valido_com_referencias_e_data_com_fuso(client):
+    registro = {'codigo_projeto': 'P0001', 'login_responsavel': 'usuario2', 'titulo': 'Importada via NDJSON',
+                'descricao': 'Carga inicial', 'prioridade': 'ALTA', 'data_criacao': '2026-01-10T12:00:00+00:00',
+                'data_limite': '2026-02-01'}
+    resposta = _enviar(client, 'tarefas', _ndjson(registro), 'tarefas.ndjson')
+    assert resposta.get_json()['inseridos'] == 1
+    with portal.app.app_context():
+        tarefa = portal.Tarefa.query.filter_by(titulo='Importada via NDJSON').one()
+        assert tarefa.responsavel.login == 'usuario2' and tarefa.status == 'PENDENTE'
+        # 12:00 UTC gravado no horário local da aplicação (UTC-3), sem fuso
+        assert tarefa.data_criacao == datetime(2026, 1, 10, 9, 0)
+
+
+def test_erros_relatados_por_linha_sem_interromper_o_arquivo(client):
+    incidentes = _ndjson(
+        {'codigo_projeto': 'P0002', 'titulo': 'Válido', 'descricao': 'd', 'prioridade': 'BAIXA'},
+        {'codigo_projeto': 'NAOEXISTE', 'titulo': 'Projeto inexistente', 'descricao': 'd', 'prioridade': 'BAIXA'},
+        {'codigo_projeto': 'P0002', 'titulo': ['lista'], 'descricao': 'd', 'prioridade': 'BAIXA'},
+    ) + b'\n{nao e json\n'
+    relatorio = _enviar(client, 'incidentes', incidentes, 'incidentes.ndjson').get_json()
+    assert relatorio['linhas'] == 4 and relatorio['inseridos'] == 1
+    assert [e['linha'] for e in relatorio['erros']] == [2, 3, 4]
+    assert 'projeto inexistente: NAOEXISTE' in relatorio['erros'][0]['erro']
+    assert 'titulo' in relatorio['erros'][1]['erro'] and 'JSON inválido' in relatorio['erros'][2]['erro']
+
+    tarefas = _ndjson({'id_projeto': 2, 'login_responsavel': 'ninguem', 'titulo': 't', 'descricao': 'd',
+                       'prioridade': 'ALTA'})
+    relatorio = _enviar(client, 'tarefas', tarefas, 'tarefas.ndjson').get_json()
+    assert relatorio['erros'] == [{'linha': 1, 'erro': 'usuário inexistente: ninguem'}]
+
+    projetos = ('codigo_projeto,nome_projeto,controle_economico,numero_iniciativa,situacao_projeto\n'
+                'P0003,Já existe,CE,INI,ATIVO\n'
+                'DUP01,Primeiro,CE,INI,ATIVO\n'
+                'DUP01,Repetido no arquivo,CE,INI,ATIVO\n').encode()
+    relatorio = _enviar(client, 'projetos', projetos, 'projetos.csv').get_json()
+    # Números das linhas físicas do CSV (a 1 é o cabeçalho)
+    assert relatorio['erros'] == [{'linha': 2, 'erro': 'código de projeto já existe: P0003'},
+                                  {'linha': 4, 'erro': 'código de projeto já existe: DUP01'}]
+    assert relatorio['inseridos'] == 1 and _projetos('DUP01') == 1
+
+
+def test_comando_grava_um_lote_por_transacao(app, tmp_path, monkeypatch):
+    arquivo = tmp_path / 'projetos.ndjson'
+    arquivo.write_bytes(_ndjson(*({'codigo_projeto': f'LOT{i:02d}', 'nome_projeto': f'Lote {i}',
+                                   'controle_economico': 'CE', 'numero_iniciativa': 'INI',
+                                   'situacao_projeto': 'CONCLUIDO'} for i in range(5))))
+    commits = []
+    commit = portal.db.session.commit
+    monkeypatch.setattr(portal.db.session, 'commit', lambda: commits.append(_projetos('LOT')) or commit())
+
+    resultado = app.test_cli_runner().invoke(args=['importar', 'projetos', str(arquivo), '--lote', '2'])
+    assert resultado.exit_code == 0, resultado.output
+    assert '5 de 5 registro(s) importado(s)' in resultado.output
+    # Cada commit encerra um lote: o anterior já está gravado quando o seguinte começa
+    assert commits == [0, 2, 4]
+    assert _projetos('LOT') == 5
+
+
+def test_arquivo_fora_de_utf8_recusado_antes_de_gravar(app, client, tmp_path):
+    linhas = ['codigo_projeto,nome_projeto,controle_economico,numero_iniciativa,situacao_projeto']
+    linhas += [f'ENC{i:02d},Projeto {i},CE,INI,ATIVO' for i in range(3)] + ['ENC99,Gestão de contratos,CE,INI,ATIVO']
+    conteudo = '\n'.join(linhas).encode('latin-1')
+
+    resposta = _enviar(client, 'projetos', conteudo, 'projetos.csv', lote='1')
+    assert resposta.status_code == 400 and 'UTF-8 (linha 5)' in resposta.get_json()['erro']
+
+    arquivo = tmp_path / 'projetos.csv'
+    arquivo.write_bytes(conteudo)
+    resultado = app.test_cli_runner().invoke(args=['importar', 'projetos', str(arquivo), '--lote', '1'])
+    assert resultado.exit_code == 1 and 'UTF-8' in resultado.output
+    assert _projetos('ENC') == 0
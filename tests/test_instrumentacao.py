@@ -0,0 +1,12 @@
+"""Instrumentação por amostragem: os testes optam por medir todas as requisições."""
+import app as portal
+
+
+def test_requisicao_amostrada_publica_server_timing(client):
+    assert portal.app.config['INSTRUMENTACAO_AMOSTRAGEM'] == 1.0
+    assert 'sql;' in client.get('/projetos').headers.get('Server-Timing', '')
+
+
+def test_fora_da_amostra_sem_server_timing(client, monkeypatch):
+    monkeypatch.setitem(portal.app.config, 'INSTRUMENTACAO_AMOSTRAGEM', 0.0)
+    assert 'Server-Timing' not in client.get('/projetos').headers
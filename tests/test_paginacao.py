@@ -0,0 +1,36 @@
+"""Cursores da paginação keyset vêm do cliente: tokens forjados nunca causam erro 500.
+
+As listagens ignoram o cursor inválido (primeira página); a API responde 400.
+"""
+import pytest
+
+import app as portal
+
+# As listagens ordenam por (data, id): cada valor abaixo tem o tipo errado para alguma das colunas
+VALORES_FORJADOS = [
+    [123, 'abc'],
+    [None, None],
+    ['2026-01-01T00:00:00', 'abc'],
+    ['2026-01-01T00:00:00', 10**30],
+    ['2026-01-01T00:00:00', True],
+    [{'a': 1}, [1]],
+    ['não é data', 1],
+]
+
+
+@pytest.mark.parametrize('url, esperado', [
+    ('/tarefas', 200), ('/projetos', 200), ('/incidentes', 200), ('/projetos?search=integração', 200),
+    ('/api/projetos', 400),
+])
+@pytest.mark.parametrize('valores', VALORES_FORJADOS)
+def test_cursor_forjado_nao_causa_erro(client, url, esperado, valores):
+    token = portal._codificar_cursor('apos', valores)
+    separador = '&' if '?' in url else '?'
+    assert client.get(f'{url}{separador}cursor={token}').status_code == esperado
+
+
+def test_cursor_valido_continua_aceito(client):
+    with portal.app.app_context():
+        ordenacao = [(portal.Tarefa.data_criacao, True), (portal.Tarefa.id_tarefa, True)]
+        token = portal._codificar_cursor('apos', [portal.datetime(2026, 1, 1), 5])
+        assert portal._decodificar_cursor(token, ordenacao) == ('apos', [portal.datetime(2026, 1, 1), 5])
@@ -0,0 +1,140 @@
+"""Garante que nenhuma consulta das rotas de leitura faça varredura completa de tabela.
+
+Cada rota é chamada pelo cliente de teste; todos os SELECTs executados são capturados e
+passados por EXPLAIN QUERY PLAN. Sem ANALYZE, o planejador do SQLite supõe tabelas grandes,
+então o plano obtido aqui é o mesmo que seria escolhido em produção.
+"""
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import app as portal
+
+# "SCAN Tarefas" (ou "SCAN TABLE Tarefas" em versões antigas) sem "USING ... INDEX"
+VARREDURA_COMPLETA = re.compile(r'^SCAN (TABLE )?(?P<tabela>\w+)( AS \w+)?$')
+
+
+@contextmanager
+def capturar_selects():
+    comandos = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            comandos.append((statement, parameters))
+
+    event.listen(Engine, 'before_cursor_execute', registrar)
+    try:
+        yield comandos
+    finally:
+        event.remove(Engine, 'before_cursor_execute', registrar)
+
+
+def varreduras(statement, parameters):
+    with portal.db.engine.connect() as conn:
+        plano = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    encontradas = (VARREDURA_COMPLETA.match(linha[-1]) for linha in plano)
+    # Tabelas internas do SQLite (ex.: verificação do índice de busca em sqlite_master) ficam de fora
+    return [v.group(0) for v in encontradas if v and not v.group('tabela').startswith('sqlite_')]
+
+
+def carregar_tudo(statement):
+    # Listas completas (ex.: projetos do filtro) não têm como evitar a leitura da tabela inteira
+    sql = statement.upper()
+    return ' WHERE ' not in sql and ' ORDER BY ' not in sql and ' LIMIT ' not in sql
+
+
+def verificar_rota(client, url):
+    with capturar_selects() as comandos:
+        resposta = client.get(url)
+        corpo = resposta.get_data()
+    assert resposta.status_code == 200, url
+    assert comandos, f'{url} não executou nenhuma consulta'
+    problemas = []
+    with portal.app.app_context():
+        for statement, parameters in comandos:
+            if carregar_tudo(statement):
+                continue
+            for detalhe in varreduras(statement, parameters):
+                problemas.append(f'{detalhe}\n    {" ".join(statement.split())}')
+    assert not problemas, f'Varredura completa em {url}:\n' + '\n'.join(problemas)
+    return corpo.decode('utf-8')
+
+
+ROTAS = [
+    '/projetos',
+    '/projetos?situacao=ATIVO',
+    '/projetos?search=integração',
+    '/projetos?situacao=ATIVO&search=integração',
+    '/projetos/1',
+    '/incidentes',
+    '/incidentes?status=ABERTO',
+    '/incidentes?prioridade=ALTA',
+    '/incidentes?status=ABERTO&prioridade=ALTA',
+    '/incidentes?busca=processamento',
+    '/tarefas',
+    '/tarefas?status=PENDENTE',
+    '/tarefas?prioridade=ALTA',
+    '/tarefas?projeto=3',
+    '/tarefas?responsavel=2',
+    '/tarefas?status=PENDENTE&prioridade=ALTA&projeto=3&responsavel=4',
+    '/tarefas?search=documentação',
+    '/usuarios',
+    '/usuarios?status=ATIVO',
+    '/usuarios?perfil=2',
+    '/api/projetos',
+    '/api/projetos?fields=codigo_projeto,situacao_projeto&situacao=ATIVO',
+    '/api/projetos?search=integração&limite=5',
+    '/api/busca/projetos?q=prj',
+    '/api/busca/usuarios?q=silva',
+    '/tarefas/novo?projeto=3',
+    '/tarefas/1/editar',
+    '/incidentes/1/editar',
+    '/api/dashboard/stats',
+    '/exportar/projetos?situacao=ATIVO',
+    '/exportar/incidentes?status=ABERTO',
+    '/exportar/tarefas?responsavel=2',
+]
+
+
+@pytest.mark.parametrize('url', ROTAS)
+def test_rota_sem_varredura_completa(client, url):
+    verificar_rota(client, url)
+
+
+@pytest.mark.parametrize('url', ['/projetos?situacao=ATIVO', '/incidentes?status=ABERTO', '/tarefas?status=PENDENTE'])
+def test_pagina_seguinte_sem_varredura_completa(client, url):
+    # Segunda página da paginação por cursor: filtro de keyset sobre o mesmo índice
+    html = verificar_rota(client, url)
+    cursor = re.search(r'cursor=([\w%=-]+)', html)
+    assert cursor, f'{url} não gerou link para a próxima página'
+    verificar_rota(client, f'{url}&cursor={cursor.group(1)}')
+
+
+def test_sublistas_do_projeto_sem_varredura_completa(client, monkeypatch):
+    # Tarefas e incidentes do detalhe do projeto paginam por cursores independentes
+    monkeypatch.setattr(portal, 'POR_PAGINA_SUBLISTA', 1)
+    html = verificar_rota(client, '/projetos/1')
+    for parametro in ('tarefas_cursor', 'incidentes_cursor'):
+        cursor = re.search(parametro + r'=([\w%=-]+)', html)
+        assert cursor, f'/projetos/1 não gerou link para a próxima página de {parametro}'
+        verificar_rota(client, f'/projetos/1?{parametro}={cursor.group(1)}')
+
+
+def test_api_projetos_pagina_seguinte_e_validadores(client):
+    # Próxima página pelo cabeçalho Link; a mesma URL com o ETag recebido responde 304
+    url = '/api/projetos?situacao=ATIVO&limite=5'
+    resposta = client.get(url)
+    proxima = re.search(r'<([^>]+)>; rel="next"', resposta.headers['Link'])
+    assert proxima, 'a API não gerou link para a próxima página'
+    verificar_rota(client, proxima.group(1))
+    assert client.get(url, headers={'If-None-Match': resposta.headers['ETag']}).status_code == 304
+
+
+@pytest.mark.parametrize('url', ['/projetos?situacao=ATIVO', '/incidentes?status=ABERTO&prioridade=ALTA',
+                                 '/tarefas?status=PENDENTE', '/usuarios?status=ATIVO'])
+def test_paginacao_por_offset_sem_varredura_completa(client, url, monkeypatch):
+    monkeypatch.setitem(portal.app.config, 'PAGINACAO_CURSOR', '')
+    verificar_rota(client, url)
@@ -0,0 +1,15 @@
+"""QUERY_BUDGET: nos testes, uma rota acima do limite de comandos SQL falha em vez de só registrar aviso."""
+import pytest
+
+import app as portal
+
+
+def test_rota_dentro_do_limite(client):
+    assert portal.app.config['QUERY_BUDGET'], 'conftest deve definir QUERY_BUDGET'
+    assert client.get('/projetos/1').status_code == 200
+
+
+def test_rota_acima_do_limite_falha(client, monkeypatch):
+    monkeypatch.setitem(portal.app.config, 'QUERY_BUDGET', 1)
+    with pytest.raises(portal.QueryBudgetExceeded, match='/projetos/1'):
+        client.get('/projetos/1')
@@ -0,0 +1,35 @@
+"""Dados de referência: tuplas em cache por processo, recarregadas quando a versão gravada no banco muda."""
+import app as portal
+
+
+def _dados(nome):
+    # Um contexto por chamada, como uma requisição nova (a versão é lida uma vez por requisição)
+    with portal.app.app_context():
+        return portal.dados_referencia(nome)
+
+
+def _incrementar_versao(nome):
+    # Como faria outro worker: só a linha de versão muda, nenhuma invalidação explícita do cache local
+    with portal.app.app_context(), portal.db.engine.begin() as conexao:
+        portal.aplicar_deltas_contadores(conexao, {('versao', nome): 1})
+
+
+def test_recarregados_apos_mudanca_de_versao(client):
+    projetos = _dados('projetos')
+    assert _dados('projetos') is projetos
+
+    with portal.app.app_context():
+        projeto = portal.db.session.get(portal.Projeto, 2)
+        dados = {'codigo_projeto': projeto.codigo_projeto, 'nome_projeto': 'Referência renomeada',
+                 'controle_economico': projeto.controle_economico, 'numero_iniciativa': projeto.numero_iniciativa,
+                 'situacao_projeto': projeto.situacao_projeto}
+    assert client.post('/projetos/2/editar', data=dados).status_code == 302
+    recarregados = _dados('projetos')
+    assert recarregados is not projetos
+    assert portal.ProjetoRef(2, dados['codigo_projeto'], 'Referência renomeada') in recarregados
+
+    perfis = _dados('perfis')
+    _incrementar_versao('perfis')
+    assert _dados('perfis') is not perfis and _dados('perfis') == perfis
+    # As outras listas continuam no cache
+    assert _dados('projetos') is recarregados
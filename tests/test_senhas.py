@@ -0,0 +1,26 @@
+"""Hash de senhas com concorrência limitada: fila cheia responde 503 em vez de segurar a thread."""
+import threading
+
+import pytest
+from werkzeug.exceptions import ServiceUnavailable
+
+import app as portal
+
+
+def test_hash_calculado_e_vaga_devolvida(app):
+    with app.app_context():
+        hash_senha = portal.gerar_hash_senha('segredo')
+        assert portal.verificar_senha(hash_senha, 'segredo')
+    # Todas as vagas voltaram: dá para ocupar a fila inteira sem bloquear
+    limite = app.config['SENHA_HASH_THREADS'] + app.config['SENHA_HASH_FILA']
+    assert all(portal._vagas_senhas.acquire(blocking=False) for _ in range(limite))
+    for _ in range(limite):
+        portal._vagas_senhas.release()
+
+
+def test_fila_cheia_recusa_com_503(app, monkeypatch):
+    vagas = threading.BoundedSemaphore(1)
+    vagas.acquire()
+    monkeypatch.setattr(portal, '_vagas_senhas', vagas)
+    with app.app_context(), pytest.raises(ServiceUnavailable):
+        portal.gerar_hash_senha('segredo')
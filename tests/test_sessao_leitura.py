@@ -0,0 +1,25 @@
+"""Roteamento de sessão: as rotas somente leitura consultam um engine SQLite aberto com mode=ro."""
+import pytest
+from flask import g
+from sqlalchemy.exc import OperationalError
+
+import app as portal
+
+
+def test_escrita_em_rota_somente_leitura_falha_no_engine_ro(app):
+    with app.test_request_context('/projetos'):
+        app.preprocess_request()
+        assert g.somente_leitura
+        engine = portal.db.session.get_bind()
+        assert engine is portal.engine_leitura() and 'mode=ro' in str(engine.url)
+        with pytest.raises(OperationalError, match='readonly'):
+            portal.db.session.execute(portal.db.text(
+                'UPDATE "Projetos" SET nome_projeto = nome_projeto WHERE id_projeto = 1'))
+        portal.db.session.rollback()
+
+
+def test_post_na_mesma_rota_usa_o_engine_de_escrita(app):
+    with app.test_request_context('/projetos', method='POST'):
+        app.preprocess_request()
+        assert not g.somente_leitura
+        assert portal.db.session.get_bind() is portal.db.engine